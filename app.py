@@ -1,23 +1,26 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Literal, Optional
 import uvicorn
+import asyncio
 import logging
-from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain.text_splitter import CharacterTextSplitter
-from langchain.docstore.document import Document
 
 import os
 import getpass
 
 from rag_agent import (
     ChatHistory,
+    ChatItem,
+    SessionManager,
     get_initial_message_chain,
     get_reranking_model_answer_chain,
-    compare_model_answers,
+    agenerate_reranked_answers,
+    aselect_best_model_answer,
+    ascore_answer,
+    aggregate_turn_scores,
+    gather_with_limit,
     PersonaService,
     vectorstore,
     load_vectorstore_from_company_infos,
@@ -25,7 +28,10 @@ from rag_agent import (
     parse_file_to_text,
     init_local_data,
 )
-from rag_agent.chains.interview_graph import GraphAgent, event_stream
+from rag_agent.chains.chunking import preload_tokenizer
+from rag_agent.chains.search import SEARCH_PROVIDER
+from rag_agent.chains.interview_graph import ASSESSMENT_ROUTES, GraphAgent, draw_graph_mermaid, draw_graph_png
+from rag_agent.events.EventBus import EventBus, format_sse
 from rag_agent.persona.Persona import Persona, PersonaType
 from rag_agent.persona.PersonaService import PersonaInput
 
@@ -40,7 +46,7 @@ logger = logging.getLogger(__name__)
 app = FastAPI(title="AI Interview Simulator")
 dist_path = os.path.join(os.path.dirname(__file__), "frontend/dist")
 
-if not os.environ.get("TAVILY_API_KEY"):
+if SEARCH_PROVIDER == "tavily" and not os.environ.get("TAVILY_API_KEY"):
     os.environ["TAVILY_API_KEY"] = getpass.getpass("Tavily API key:\n")
 
 # 메모리 컨텍스트 저장 변수
@@ -52,21 +58,51 @@ init_message_chain = None
 model_answer_chain = None
 base_chain_inputs: Optional[dict] = None
 
-chat_history = ChatHistory.get_instance()
+session_manager = SessionManager.get_instance()
 
 persona_service = PersonaService.get_instance()
-print(ChatHistory.get_instance(), PersonaService.get_instance())
+
+event_bus = EventBus.get_instance()
+
+SESSION_COOKIE_NAME = "session_id"
+SESSION_HEADER_NAME = "X-Session-Id"
+
+
+def get_session(request: Request, response: Response) -> ChatHistory:
+    """요청의 세션 ID(헤더 또는 쿠키)에 해당하는 ChatHistory를 반환합니다."""
+    session_id = request.headers.get(SESSION_HEADER_NAME) or request.cookies.get(
+        SESSION_COOKIE_NAME
+    )
+    chat_history = session_manager.get_session(session_id)
+    _set_session_cookie(response, chat_history)
+    return chat_history
+
+
+def _set_session_cookie(response: Response, chat_history: ChatHistory):
+    # 요청한 세션이 없으면 새로 발급된 ID로 바뀌므로 헤더를 쓰는 클라이언트에도 알려줍니다.
+    response.headers[SESSION_HEADER_NAME] = chat_history.session_id
+    response.set_cookie(
+        SESSION_COOKIE_NAME, chat_history.session_id, httponly=True, samesite="lax"
+    )
 
 
 @app.get("/events")
-async def sse():
-    return StreamingResponse(event_stream(), media_type="text/event-stream")
+async def sse(request: Request, chat_history: ChatHistory = Depends(get_session)):
+    """현재 세션의 진행 상황(progress) 및 노드 실행 시간(node) 이벤트를 SSE로 전달합니다."""
+    streaming_response = StreamingResponse(
+        event_bus.stream(chat_history.session_id, request.is_disconnected),
+        media_type="text/event-stream",
+    )
+    _set_session_cookie(streaming_response, chat_history)
+    return streaming_response
 
 
 @app.on_event("startup")
 async def load_local_data():
+    # 대화 내역 토큰 수 계산(요약 메모리)이 요청 중에 인코딩을 내려받지 않도록 미리 불러옴
+    await asyncio.to_thread(preload_tokenizer)
     await init_local_data()
-    global stored_resume, stored_jd, stored_company_info, base_chain_inputs, chat_history, model_answer_chain, init_message_chain, reranking_model_answer_chain, agent
+    global stored_resume, stored_jd, stored_company_info, base_chain_inputs, model_answer_chain, init_message_chain, reranking_model_answer_chain, agent
     base_dir = os.path.join(os.path.dirname(__file__), "data")
 
     # 이력서 로딩
@@ -127,7 +163,17 @@ def search_query_by_vector(query: str) -> str:
 
 
 @app.get("/chatHistory")
-async def get_chat_history():
+async def get_chat_history(
+    request: Request,
+    response: Response,
+    after: Optional[str] = None,
+    chat_history: ChatHistory = Depends(get_session),
+):
+    """
+    대화 내역을 반환합니다.
+    after(ChatItem id)를 주면 그 이후 항목만 반환하고,
+    If-None-Match가 현재 ETag와 같으면 본문 없이 304를 반환합니다.
+    """
     if not chat_history.history:
         try:
             if init_message_chain is None:
@@ -135,23 +181,28 @@ async def get_chat_history():
                     status_code=500, detail="Initial message chain not initialized."
                 )
             logger.info("No chat history found. Generating initial message...")
-            response = init_message_chain.invoke({})
+            result = await init_message_chain.ainvoke({})
             logger.info("Chain invocation completed")
 
-            chat_history.add(
-                type="question", speaker="agent", content=response["result"]
-            )
-            return chat_history.get_all_history()
+            chat_history.add(type="question", speaker="agent", content=result["result"])
         except Exception as e:
             logger.error(f"Error in question generation: {str(e)}")
-    return chat_history.get_all_history()
+
+    etag = chat_history.get_etag(after)
+    if request.headers.get("if-none-match") == etag:
+        not_modified = Response(status_code=304, headers={"ETag": etag})
+        _set_session_cookie(not_modified, chat_history)
+        return not_modified
+
+    response.headers["ETag"] = etag
+    return chat_history.get_history_after(after)
 
 
 RequestType = Literal["question", "followup", "modelAnswer", "answer", "other"]
 
 
 @app.get("/assessment")
-async def get_assessment():
+async def get_assessment(chat_history: ChatHistory = Depends(get_session)):
     """
     interface AssessmentResultDTO {
       logicScore: number;
@@ -161,19 +212,29 @@ async def get_assessment():
       averageScore: number;
       overallEvaluation: string;
     }"""
-    content = "그동안 진행한 지원자의 면접 답변을 평가해주세요"
-    response = agent.run(content)
-    print(response)
-    return {
-        "logicScore": 4,
-        "jobFitScore": 6,
-        "coreValueFitScore": 5,
-        "communicationScore": 5,
-        "averageScore": 5,
-        "overallEvaluation": """이 지원자는 해당 면접에 적합하지 않습니다. 논리성에서 낮은 점수를 받았고, 직무적합도는 높은 점수를 받았습니다. 하지만 핵심가치와 커뮤니케이션에서는 중간 점수를 받았습니다.
-        결과적으로 해당 지원자는 면접결과 애매한 점수를 기록하여 합격하기에 적합하지 않습니다.
-        """,
-    }
+    turns = chat_history.get_answer_turns()
+
+    # 답변 시점에 점수가 저장되지 않은 턴만 새로 평가
+    unscored = [(answer, question) for answer, question in turns if not answer.scores]
+    if unscored:
+        logger.info(f"Scoring {len(unscored)} unscored answers for assessment")
+        results = await gather_with_limit(
+            ascore_answer(
+                resume=stored_resume,
+                jd=stored_jd,
+                company=stored_company_info,
+                question=question.content if question else "",
+                answer=answer.content,
+            )
+            for answer, question in unscored
+        )
+        for (answer, _), scores in zip(unscored, results):
+            if scores is not None:
+                chat_history.set_scores(answer.id, scores)
+
+    return aggregate_turn_scores(
+        [answer.scores for answer, _ in turns if answer.scores]
+    )
 
 
 class RequestInput(BaseModel):
@@ -182,96 +243,189 @@ class RequestInput(BaseModel):
     related_chatting_id: Optional[str] = None
 
 
-@app.post("/")
-async def analyze_input(request: RequestInput):
-    type = request.type
-    content = request.content
-    related_chatting_id = request.related_chatting_id
-    chat_history.add(type=type, speaker="user", content=content)
-    try:
-        resume = base_chain_inputs["resume"]
-        jd = base_chain_inputs["jd"]
-        company = base_chain_inputs["company_infos"]
-        last_question = chat_history.get_question_by_id(
-            chat_history.get_latest_question_id()
+async def _select_persona_info(content: str, chat_history: ChatHistory) -> str:
+    persona_id = await persona_service.ainvoke_agent(
+        resume=base_chain_inputs["resume"],
+        jd=base_chain_inputs["jd"],
+        applicant_answer=content,
+        chat_history=chat_history,
+    )
+
+    persona_info = ""
+    if "null" not in persona_id:
+        persona_info = persona_service.get_persona_str_by_id(persona_id)
+    return persona_info
+
+
+def _start_reranking_candidates(chat_history: ChatHistory) -> asyncio.Task:
+    """modelAnswer reranking 후보 생성을 백그라운드 태스크로 시작합니다."""
+    last_question = chat_history.get_question_by_id(
+        chat_history.get_latest_question_id()
+    )
+
+    # 이전 질문/답변 쌍들 가져오기
+    prev_pairs = []
+    for item in chat_history.history:
+        if item.type == "question" and item.related_chatting_id:
+            answer = next(
+                (
+                    a
+                    for a in chat_history.history
+                    if a.id == item.related_chatting_id
+                ),
+                None,
+            )
+            if answer:
+                prev_pairs.append({"question": item.content, "answer": answer.content})
+
+    return asyncio.create_task(
+        agenerate_reranked_answers(
+            reranking_model_answer_chain,
+            {
+                **base_chain_inputs,
+                "question": last_question.content if last_question else "",
+                "prev_question_answer_pairs": prev_pairs,
+            },
         )
-        recent_history = chat_history.get_all_history_as_string()
+    )
+
 
-        persona_id = persona_service.invoke_agent(
-            resume=resume, jd=jd, applicant_answer=content
+async def _save_agent_answer(
+    request: RequestInput,
+    chat_history: ChatHistory,
+    user_item_id: str,
+    response: dict,
+    persona_info: str,
+    candidates_task: Optional[asyncio.Task],
+) -> ChatItem:
+    """그래프 결과를 대화 내역에 저장하고 저장된 ChatItem을 반환합니다."""
+    original_answer = response.get("answer", "")
+
+    # 평가 노드를 거친 입력만 답변으로 표시하고, 계산된 점수는 사용자 답변 항목에 저장 (/assessment에서 재사용)
+    if response.get("route_type") in ASSESSMENT_ROUTES:
+        chat_history.mark_assessed(user_item_id, response.get("scores"))
+
+    # 클라이언트가 type을 modelAnswer로 보내지 않아도 (예: 자유 입력 "모범답변 해줘")
+    # 그래프가 모범답변으로 분류했다면 같은 reranking을 거친다. 이 경우 후보 생성은 지금 시작한다.
+    if candidates_task is None and response.get("route_type") == "modelAnswer":
+        candidates_task = _start_reranking_candidates(chat_history)
+
+    # modelAnswer일 때만 reranking 수행
+    if candidates_task is not None:
+        reranked_responses = await candidates_task
+
+        # 각 답변을 원본과 비교하여 가장 점수가 높은 답변 선택
+        best_answer = await aselect_best_model_answer(
+            original_answer, reranked_responses
         )
 
-        persona_info = ""
-        if "null" not in persona_id:
-            persona_info = persona_service.get_persona_str_by_id(persona_id)
-
-        response = agent.run(content)
-
-        # modelAnswer 타입일 때만 reranking 수행
-        if type == "modelAnswer":
-            original_answer = response.get("answer", "")
-
-            # 이전 질문/답변 쌍들 가져오기
-            prev_pairs = []
-            for item in chat_history.history:
-                if item.type == "question" and item.related_chatting_id:
-                    answer = next(
-                        (
-                            a
-                            for a in chat_history.history
-                            if a.id == item.related_chatting_id
-                        ),
-                        None,
-                    )
-                    if answer:
-                        prev_pairs.append(
-                            {"question": item.content, "answer": answer.content}
-                        )
-
-            # reranking 답변 3개 생성
-            reranked_responses = []
-            for _ in range(3):
-                reranked_response = reranking_model_answer_chain.invoke(
-                    {
-                        **base_chain_inputs,
-                        "question": last_question.content if last_question else "",
-                        "prev_question_answer_pairs": prev_pairs,
-                    }
-                )
-                reranked_responses.append(reranked_response["result"])
-
-            # 각 답변을 원본과 비교하여 점수 계산
-            best_score = -1
-            best_answer = original_answer
-            for answer in reranked_responses:
-                comparison = compare_model_answers(original_answer, answer)
-                score = comparison["overall"]["reranked_total"]
-                if score > best_score:
-                    best_score = score
-                    best_answer = answer
-
-            # 최종 답변 저장
-            chat_history.add(
-                type="modelAnswer",
-                speaker="agent",
-                content=best_answer,
-                related_chatting_id=related_chatting_id,
-                persona_info=persona_info,
-            )
-        else:
-            # reranking이 필요없는 경우 원본 응답 저장
-            chat_history.add(
-                type="question",
-                speaker="agent",
-                content=response.get("answer", ""),
-                persona_info=persona_info,
-            )
+        # 최종 답변 저장
+        chat_history.add(
+            type="modelAnswer",
+            speaker="agent",
+            content=best_answer,
+            related_chatting_id=request.related_chatting_id,
+            persona_info=persona_info,
+        )
+    else:
+        # reranking이 필요없는 경우 원본 응답 저장
+        chat_history.add(
+            type="question",
+            speaker="agent",
+            content=original_answer,
+            persona_info=persona_info,
+        )
+    # 최근 턴 밖으로 밀려난 대화를 다음 턴 전에 요약에 반영 (응답은 기다리지 않음)
+    chat_history.memory.schedule_update()
+    return chat_history.history[-1]
 
-        return chat_history.get_all_history()
+
+@app.post("/")
+async def analyze_input(
+    request: RequestInput,
+    after: Optional[str] = None,
+    chat_history: ChatHistory = Depends(get_session),
+):
+    """
+    사용자 입력을 처리하고 대화 내역을 반환합니다.
+    after(ChatItem id)를 주면 그 이후 항목만 반환합니다.
+    """
+    user_item_id = chat_history.add(
+        type=request.type, speaker="user", content=request.content
+    )
+    candidates_task = None
+    try:
+        persona_info = await _select_persona_info(request.content, chat_history)
+
+        # 원본 답변(그래프)과 reranking 후보 답변들은 서로 독립적이므로 동시에 생성
+        if request.type == "modelAnswer":
+            candidates_task = _start_reranking_candidates(chat_history)
+        response = await agent.arun(request.content, chat_history, request.type)
+
+        await _save_agent_answer(
+            request, chat_history, user_item_id, response, persona_info, candidates_task
+        )
+        return chat_history.get_history_after(after)
     except Exception as e:
+        if candidates_task is not None:
+            candidates_task.cancel()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/stream")
+async def analyze_input_stream(
+    request: RequestInput, chat_history: ChatHistory = Depends(get_session)
+):
+    """
+    POST /와 같은 처리를 하되, 답변 노드의 LLM 토큰을 SSE로 바로 전달합니다.
+
+    이벤트 형식:
+      event: token -> {"node": 노드 이름, "content": 토큰}
+      event: item  -> 저장된 최종 ChatItem
+      event: error -> {"detail": 오류 메시지}
+    """
+    user_item_id = chat_history.add(
+        type=request.type, speaker="user", content=request.content
+    )
+
+    async def token_stream():
+        candidates_task = None
+        try:
+            persona_info = await _select_persona_info(request.content, chat_history)
+            if request.type == "modelAnswer":
+                candidates_task = _start_reranking_candidates(chat_history)
+
+            response = {}
+            async for kind, data in agent.astream(
+                request.content, chat_history, request.type
+            ):
+                if kind == "token":
+                    yield format_sse(data, event="token")
+                else:
+                    response = data
+
+            item = await _save_agent_answer(
+                request,
+                chat_history,
+                user_item_id,
+                response,
+                persona_info,
+                candidates_task,
+            )
+            yield format_sse(item.model_dump(mode="json"), event="item")
+        except Exception as e:
+            if candidates_task is not None:
+                candidates_task.cancel()
+            logger.error(f"Error in streaming answer: {str(e)}")
+            yield format_sse({"detail": str(e)}, event="error")
+
+    streaming_response = StreamingResponse(
+        token_stream(), media_type="text/event-stream"
+    )
+    _set_session_cookie(streaming_response, chat_history)
+    return streaming_response
+
+
 @app.get("/persona/list")
 async def get_persona_list():
     return persona_service.get_all_persona_info()
@@ -295,6 +449,23 @@ async def delete_persona(persona_id: str):
     return None
 
 
+if os.getenv("GRAPH_DEBUG_ENDPOINT", "false").lower() == "true":
+
+    @app.get("/debug/graph")
+    async def get_graph_image(format: Literal["png", "mermaid"] = "png"):
+        """
+        에이전트 그래프 구조를 반환합니다. (GRAPH_DEBUG_ENDPOINT=true일 때만 등록)
+        png는 Mermaid 렌더링 서비스를 호출하므로 네트워크가 필요하고, mermaid는 로컬에서 생성합니다.
+        """
+        if format == "mermaid":
+            return PlainTextResponse(draw_graph_mermaid())
+        try:
+            png = await asyncio.to_thread(draw_graph_png)
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Graph rendering failed: {e}")
+        return Response(content=png, media_type="image/png")
+
+
 app.mount("/", StaticFiles(directory=dist_path, html=True), name="frontend")
 
 if __name__ == "__main__":
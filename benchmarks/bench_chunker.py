@@ -0,0 +1,107 @@
+"""
+CharacterTextSplitter(512, 50)와 TokenChunker를 비교하는 벤치마크.
+
+청크 수, 청크당 토큰 수 분포, 검색 1회(k=3)에 프롬프트로 들어가는 토큰 수, 분할+임베딩 시간을 측정한다.
+임베딩은 네트워크 없이 비교할 수 있도록 로컬 HashingEmbeddings를 사용한다.
+
+    python benchmarks/bench_chunker.py [파일 또는 디렉토리 ...] --repeat 20
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+SAMPLE_SENTENCES = [
+    "우리 회사는 고객의 문제를 데이터로 해결하는 플랫폼 기업입니다.",
+    "인재상은 도전, 협업, 성장이며 구성원 모두가 주도적으로 일합니다.",
+    "지난해 매출은 전년 대비 35.2% 증가했고 해외 법인을 3곳 신설했습니다.",
+    "백엔드 팀은 Python과 Kotlin으로 대규모 트래픽을 처리하는 서비스를 운영합니다.",
+    "신입 사원은 6개월간 멘토링 프로그램에 참여합니다!",
+    "왜 우리 회사에 지원했나요? 면접에서는 이 질문을 꼭 받게 됩니다.",
+]
+
+
+def load_texts(paths: list[str]) -> list[str]:
+    from rag_agent.chains.parsing import parse_file_to_text
+
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            files.append(path)
+    if files:
+        return [parse_file_to_text(file_path) for file_path in files]
+    rng = random.Random(0)
+    return [
+        "\n\n".join(
+            " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(1, 8)))
+            for _ in range(40)
+        )
+        for _ in range(30)
+    ]
+
+
+def measure(name, splitter, texts, count_tokens, embeddings, repeat, k=3):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        chunks = [chunk for text in texts for chunk in splitter.split_text(text)]
+    split_time = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    embeddings.embed_documents(chunks)
+    embed_time = time.perf_counter() - started
+
+    tokens = sorted(count_tokens(chunk) for chunk in chunks)
+    rng = random.Random(1)
+    retrieval = [sum(rng.sample(tokens, min(k, len(tokens)))) for _ in range(1000)]
+    print(f"[{name}]")
+    print(f"  chunks               : {len(chunks)}")
+    print(
+        f"  tokens/chunk         : mean {statistics.mean(tokens):.1f}, "
+        f"stdev {statistics.pstdev(tokens):.1f}, "
+        f"p95 {tokens[int(len(tokens) * 0.95) - 1]}, max {tokens[-1]}"
+    )
+    print(
+        f"  tokens/retrieval(k={k}): mean {statistics.mean(retrieval):.1f}, "
+        f"max {max(retrieval)}"
+    )
+    print(f"  split time           : {split_time * 1000:.1f} ms")
+    print(f"  index time (local)   : {(split_time + embed_time) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="*")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from langchain.text_splitter import CharacterTextSplitter
+    from rag_agent.chains.chunking import TokenChunker
+    from rag_agent.chains.embeddings import HashingEmbeddings
+
+    texts = load_texts(args.paths)
+    token_chunker = TokenChunker()
+    # 두 분할기 모두 같은 토크나이저로 토큰 수를 센다.
+    count_tokens = token_chunker.count_tokens
+    embeddings = HashingEmbeddings()
+    print(f"documents: {len(texts)}, characters: {sum(len(t) for t in texts)}")
+    print(f"tokenizer: {token_chunker.signature}")
+    measure(
+        "CharacterTextSplitter(512, 50)",
+        CharacterTextSplitter(chunk_size=512, chunk_overlap=50),
+        texts, count_tokens, embeddings, args.repeat,
+    )
+    measure(
+        f"TokenChunker({token_chunker.chunk_tokens}, {token_chunker.overlap_tokens})",
+        token_chunker, texts, count_tokens, embeddings, args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
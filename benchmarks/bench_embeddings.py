@@ -0,0 +1,79 @@
+"""
+로컬 임베딩(EMBEDDING_PROVIDER=local)으로 인덱싱/검색 성능을 측정하는 벤치마크.
+
+네트워크 없이 실행할 수 있도록 합성 회사 문서를 임시 디렉토리에 만들고,
+store.load_vectorstore_from_company_infos와 similarity_search를 그대로 사용한다.
+
+    python benchmarks/bench_embeddings.py --files 50 --paragraphs 40 --queries 200
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+WORDS = [
+    "백엔드", "프론트엔드", "데이터", "플랫폼", "클라우드", "서비스", "고객", "성장",
+    "협업", "문화", "인재상", "비전", "채용", "개발자", "파이썬", "자바", "쿠버네티스",
+    "추천", "검색", "결제", "물류", "보안", "인프라", "모바일", "글로벌", "혁신",
+]
+
+
+def make_corpus(directory: str, files: int, paragraphs: int, seed: int = 0):
+    rng = random.Random(seed)
+    for i in range(files):
+        body = "\n\n".join(
+            " ".join(rng.choice(WORDS) for _ in range(60)) for _ in range(paragraphs)
+        )
+        with open(os.path.join(directory, f"company_{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_embeddings_")
+    os.environ.setdefault("EMBEDDING_PROVIDER", "local")
+    os.environ.setdefault("TOKENIZER_ENCODING", "approx")
+    os.environ["CHROMA_DB_PATH"] = os.path.join(workdir, "chroma_db")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from rag_agent.chains import store
+
+    store.COMPANY_INFO_DIR = os.path.join(workdir, "company_infos")
+    os.makedirs(store.COMPANY_INFO_DIR)
+    make_corpus(store.COMPANY_INFO_DIR, args.files, args.paragraphs)
+
+    started = time.perf_counter()
+    vectorstore = store.load_vectorstore_from_company_infos()
+    cold = time.perf_counter() - started
+    chunks = len(vectorstore.get()["ids"])
+
+    started = time.perf_counter()
+    store.load_vectorstore_from_company_infos()
+    warm = time.perf_counter() - started
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.choice(WORDS) for _ in range(8)) for _ in range(args.queries)]
+    started = time.perf_counter()
+    for query in queries:
+        vectorstore.similarity_search(query, k=3)
+    query_time = time.perf_counter() - started
+
+    print(f"provider         : {os.environ['EMBEDDING_PROVIDER']}")
+    print(f"chunks           : {chunks}")
+    print(f"index (cold)     : {cold:.3f}s ({chunks / cold:.1f} chunks/s)")
+    print(f"index (unchanged): {warm:.3f}s")
+    print(f"query            : {query_time / len(queries) * 1000:.2f} ms/query")
+    print(f"workdir          : {workdir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+대화가 길어질 때 노드 프롬프트에 들어가는 대화 내역 토큰 수를 비교하는 벤치마크.
+
+전체 내역(get_all_history_as_string)과 요약 메모리(HistoryMemory.render)의 턴별 토큰 수와 생성 시간을 출력한다.
+기본값은 네트워크 없이 돌도록 요약 LLM 대신 밀려난 대화의 앞부분을 요약 길이만큼 잘라 요약으로 사용한다.
+--llm을 주면 실제 요약 LLM(MEMORY_SUMMARY_MODEL)을 호출한다.
+
+    python benchmarks/bench_history.py --turns 40 --node evaluate [--llm]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+SAMPLE_ANSWERS = [
+    "저는 이전 프로젝트에서 결제 API의 응답 시간을 800ms에서 200ms로 줄였습니다. 캐시와 비동기 처리를 도입했습니다.",
+    "팀원과 일정 문제로 갈등이 있었을 때, 작업을 다시 나누고 매일 짧게 진행 상황을 공유해 해결했습니다.",
+    "장애가 났을 때 로그와 메트릭으로 원인을 좁혔고, 재발 방지를 위해 알림과 테스트를 추가했습니다.",
+    "데이터 파이프라인을 설계하면서 중복 처리를 막기 위해 멱등성 키를 사용했습니다.",
+]
+SAMPLE_QUESTIONS = [
+    "그 과정에서 가장 어려웠던 점은 무엇이었나요?",
+    "성과를 어떻게 측정하셨나요?",
+    "다시 한다면 어떤 부분을 다르게 하시겠어요?",
+    "우리 회사의 서비스에 그 경험을 어떻게 적용할 수 있을까요?",
+]
+
+
+def _stand_in_summary(memory, max_tokens: int):
+    """LLM 없이 요약 갱신을 흉내낸다: 기존 요약 + 새로 밀려난 대화의 앞부분을 max_tokens 글자 정도로 자른다."""
+    job = memory._begin_update()
+    if job is None:
+        return
+    summary, end, items = job
+    text = (summary + " " + " ".join(item.content for item in items)).strip()
+    memory._finish_update(text[: max_tokens], end)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--node", default="evaluate")
+    parser.add_argument("--every", type=int, default=5, help="출력 간격 (턴)")
+    parser.add_argument("--llm", action="store_true", help="실제 요약 LLM 호출 (OPENAI_API_KEY 필요)")
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    from rag_agent.chat_history.ChatHistory import ChatHistory
+    from rag_agent.chat_history.HistoryMemory import HISTORY_TOKEN_BUDGETS, MEMORY_SUMMARY_MAX_TOKENS
+    from rag_agent.chains.chunking import count_tokens
+
+    budget = HISTORY_TOKEN_BUDGETS.get(args.node)
+    rng = random.Random(0)
+    history = ChatHistory()
+    memory = history.memory
+    history.add(type="question", speaker="agent", content="자기소개와 함께 가장 자신 있는 프로젝트를 설명해 주세요.")
+    print(f"node: {args.node}, budget: {budget} tokens, recent turns: {memory.recent_turns}")
+    print(f"{'turn':>4} | {'full tokens':>11} | {'memory tokens':>13} | {'render ms':>9} | summarized items")
+    for turn in range(1, args.turns + 1):
+        history.add(type="answer", speaker="user", content=rng.choice(SAMPLE_ANSWERS))
+        history.add(type="question", speaker="agent", content=rng.choice(SAMPLE_QUESTIONS))
+        if args.llm:
+            memory.update_summary()
+        else:
+            _stand_in_summary(memory, MEMORY_SUMMARY_MAX_TOKENS)
+
+        started = time.perf_counter()
+        rendered = memory.render(budget)
+        render_ms = (time.perf_counter() - started) * 1000
+        if turn % args.every == 0 or turn == 1:
+            print(
+                f"{turn:>4} | {count_tokens(history.get_all_history_as_string()):>11} | "
+                f"{count_tokens(rendered):>13} | {render_ms:>9.3f} | {memory.summarized_upto}"
+            )
+    print(memory.stats())
+
+
+if __name__ == "__main__":
+    main()
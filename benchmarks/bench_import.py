@@ -0,0 +1,117 @@
+"""
+콜드 import 시간과 서버 첫 응답까지의 시간을 측정하는 회귀 벤치마크.
+
+매 측정마다 새 파이썬 프로세스를 띄워 캐시되지 않은 import 비용을 잰다.
+- import rag_agent / from rag_agent import ChatHistory / import app
+- 프로세스 시작부터 첫 GET /chatHistory 응답까지 (startup 이벤트 포함, data/resume과 data/jd 필요)
+--importtime을 주면 `python -X importtime -c "import app"`의 누적 시간 상위 모듈을 출력한다.
+
+네트워크 없이 돌 수 있도록 로컬 임베딩/로컬 검색/근사 토크나이저를 기본값으로 사용한다.
+
+    python benchmarks/bench_import.py --repeat 5 [--importtime]
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+CASES = {
+    "import rag_agent": "import rag_agent",
+    "from rag_agent import ChatHistory": "from rag_agent import ChatHistory",
+    "import app": "import app",
+}
+
+FIRST_RESPONSE = """
+import time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+import app
+with TestClient(app.app) as client:
+    response = client.get("/chatHistory")
+    assert response.status_code == 200, response.text
+print(time.perf_counter() - started)
+"""
+
+TIMED = """
+import time
+started = time.perf_counter()
+{statement}
+print(time.perf_counter() - started)
+"""
+
+
+def _env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    env.setdefault("EMBEDDING_PROVIDER", "local")
+    env.setdefault("SEARCH_PROVIDER", "local")
+    env.setdefault("TOKENIZER_ENCODING", "approx")
+    env.setdefault("CHROMA_DB_PATH", os.path.join(workdir, "db"))
+    env.setdefault("EMBEDDING_CACHE_PATH", os.path.join(workdir, "embedding_cache.sqlite3"))
+    env.setdefault("SEARCH_CACHE_PATH", os.path.join(workdir, "search_cache.sqlite3"))
+    env.setdefault("INTENT_LOG_PATH", os.path.join(workdir, "intent_labels.jsonl"))
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def _run(code: str, env: dict) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def _report(name: str, timings: list[float]):
+    print(
+        f"{name:36} median {statistics.median(timings) * 1000:8.1f} ms, "
+        f"min {min(timings) * 1000:8.1f} ms"
+    )
+
+
+def _importtime(env: dict, top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        parts = line.removeprefix("import time:").split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), int(parts[0]), parts[2].rstrip()))
+    print(f"\ntop {top} modules by cumulative import time (import app):")
+    for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms (self {self_us / 1000:6.1f} ms) {module}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        env = _env(workdir)
+        for name, statement in CASES.items():
+            _report(name, [_run(TIMED.format(statement=statement), env) for _ in range(args.repeat)])
+        if all(os.path.isdir(os.path.join(ROOT, "data", name)) for name in ("resume", "jd")):
+            _report(
+                "first GET /chatHistory (cold)",
+                [_run(FIRST_RESPONSE, env) for _ in range(args.repeat)],
+            )
+        else:
+            # startup 이벤트가 data/resume, data/jd의 파일을 읽으므로 없으면 측정할 수 없다.
+            print(f"{'first GET /chatHistory (cold)':36} skipped (data/resume, data/jd not found)")
+        if args.importtime:
+            _importtime(env, args.top)
+
+
+if __name__ == "__main__":
+    main()
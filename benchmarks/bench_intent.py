@@ -0,0 +1,144 @@
+"""
+로컬 의도 분류기(IntentClassifier)의 정확도와 LLM 호출 절감률을 측정하는 벤치마크.
+
+LLM이 분류한 기록(INTENT_LOG_PATH의 JSONL)을 학습/평가용으로 나눈 뒤,
+threshold별로 로컬에서 처리되는 비율(coverage), 그 중 LLM 라벨과 일치하는 비율(accuracy),
+분류 1회 지연 시간을 출력한다. 기록이 부족하면 아래 SAMPLE_QUERIES로 평가한다.
+
+마지막으로 그래프의 classify_input 노드를 UI가 보내는 요청 유형으로 실행해,
+답변 입력창의 자유 입력("answer")은 LLM보다 먼저 IntentClassifier.predict를 거치고
+버튼 요청(question/followup/modelAnswer)은 분류를 건너뛰는지 확인한다. (LLM 호출은 기록만 하고 "other"를 반환)
+
+    python benchmarks/bench_intent.py [--log intent_labels.jsonl] --test-ratio 0.2
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# 기록이 없을 때 사용하는 평가용 입력 (SEED_EXAMPLES와 겹치지 않는 표현)
+SAMPLE_QUERIES = {
+    "question": ["질문 주세요", "다른 질문도 해주세요", "면접 질문 하나 만들어줘", "다음 면접 질문이요"],
+    "followup": ["꼬리 질문 부탁해요", "제 답변에 이어서 질문해 주세요", "방금 말한 것에 추가 질문 해줘"],
+    "modelAnswer": ["모범 답변 보여주세요", "이 질문 모범답안 알려줘", "예시 답안 좀 보여줄래요?"],
+    "evaluate": ["답변 평가 부탁해요", "제 답변 점수 매겨주세요", "지금까지 한 답변 피드백 주세요"],
+    "response": [
+        "저는 인턴 기간 동안 데이터 파이프라인을 구축하며 처리 시간을 30% 단축했습니다.",
+        "갈등 상황에서는 먼저 상대방의 입장을 듣고 공통의 목표를 확인하려고 노력했습니다.",
+        "해당 프로젝트에서 저는 프론트엔드 개발을 맡아 사용자 만족도를 높였습니다.",
+    ],
+    "other": ["배고프다", "지금 몇 시야?", "반가워요", "주말에 뭐 하지"],
+}
+
+
+def check_graph_order(queries: list[str]) -> bool:
+    """classify_input에서 로컬 분류기가 LLM보다 먼저 호출되는지 확인하고 결과를 출력한다."""
+    from langchain_core.runnables import RunnableLambda
+    from rag_agent.chains import interview_graph
+
+    calls = []
+    classifier = interview_graph.IntentClassifier.get_instance()
+    predict = classifier.predict
+    classifier.predict = lambda query: calls.append("predict") or predict(query)
+    interview_graph.get_llm = lambda *args, **kwargs: RunnableLambda(
+        lambda _: calls.append("llm") or "other"
+    )
+
+    ok = True
+    local, escalated = 0, 0
+    for query in queries:
+        calls.clear()
+        asyncio.run(interview_graph.classify_input({"query": query, "request_type": "answer"}))
+        if not calls or calls[0] != "predict":
+            ok = False
+            print(f"  answer {query!r}: IntentClassifier.predict was not the first call ({calls})")
+        if "llm" in calls:
+            escalated += 1
+        else:
+            local += 1
+    for request_type in interview_graph.CLIENT_ROUTES:
+        calls.clear()
+        asyncio.run(interview_graph.classify_input({"query": "버튼", "request_type": request_type}))
+        if calls:
+            ok = False
+            print(f"  button {request_type!r}: expected no classification, got {calls}")
+
+    print(
+        f"graph classify_input (answer box): {len(queries)} inputs, {local} local, "
+        f"{escalated} escalated to LLM, predict before LLM: {'ok' if ok else 'FAILED'}"
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--log", default=None, help="LLM 분류 기록 JSONL (기본: INTENT_LOG_PATH)")
+    parser.add_argument("--test-ratio", type=float, default=0.2)
+    parser.add_argument("--min-records", type=int, default=30)
+    parser.add_argument("--thresholds", default="0,0.02,0.04,0.06,0.08,0.1,0.15")
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("SEARCH_PROVIDER", "local")
+
+    from rag_agent.chains.embeddings import HashingEmbeddings
+    from rag_agent.chains.intent import (
+        INTENT_LOG_PATH,
+        SEED_EXAMPLES,
+        NearestCentroidClassifier,
+        load_intent_log,
+    )
+
+    records = load_intent_log(args.log or INTENT_LOG_PATH)
+    if len(records) >= args.min_records:
+        rng = random.Random(0)
+        rng.shuffle(records)
+        split = int(len(records) * (1 - args.test_ratio))
+        train, test = records[:split], records[split:]
+        print(f"log records: {len(records)} (train {len(train)}, test {len(test)})")
+    else:
+        train = []
+        test = [(text, label) for label, texts in SAMPLE_QUERIES.items() for text in texts]
+        print(f"log records: {len(records)} < {args.min_records}, evaluating on sample queries ({len(test)})")
+
+    model = NearestCentroidClassifier(list(SEED_EXAMPLES), HashingEmbeddings())
+    examples = [(text, label) for label, texts in SEED_EXAMPLES.items() for text in texts] + train
+    model.add([text for text, _ in examples], [label for _, label in examples])
+
+    predictions = []
+    latencies = []
+    for text, label in test:
+        started = time.perf_counter()
+        predicted, confidence = model.predict(text)
+        latencies.append(time.perf_counter() - started)
+        predictions.append((predicted == label, confidence))
+
+    latencies.sort()
+    print(
+        f"latency/classify: mean {statistics.mean(latencies) * 1000:.2f} ms, "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.2f} ms"
+    )
+    print(f"{'threshold':>9} | {'coverage':>8} | {'accuracy':>8} | {'LLM calls avoided':>17}")
+    for threshold in [float(t) for t in args.thresholds.split(",")]:
+        covered = [correct for correct, confidence in predictions if confidence >= threshold]
+        accuracy = sum(covered) / len(covered) if covered else 0.0
+        print(
+            f"{threshold:>9.2f} | {len(covered) / len(test):>8.1%} | {accuracy:>8.1%} | "
+            f"{len(covered):>8} / {len(test)}"
+        )
+
+    # 그래프 확인에서 LLM 분류 기록이 실제 로그에 남지 않도록 임시 파일을 사용
+    from rag_agent.chains.intent import IntentClassifier
+
+    IntentClassifier.get_instance(log_path=os.path.join(tempfile.mkdtemp(), "intent_labels.jsonl"))
+    if not check_graph_order([text for text, _ in test]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+서버 시작/세션 생성 비용을 측정하는 벤치마크.
+
+interview_graph 모듈 import 시간, 첫 GraphAgent 생성(그래프 컴파일 포함) 시간,
+이후 GraphAgent 생성(컴파일된 그래프 재사용) 시간, 매번 그래프를 새로 컴파일할 때의 시간을 비교한다.
+그래프 PNG 렌더링은 네트워크가 필요하므로 --render를 줄 때만 측정한다.
+
+    python benchmarks/bench_startup.py --repeat 100 [--render]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--render", action="store_true", help="Mermaid PNG 렌더링 시간도 측정 (네트워크 필요)")
+    args = parser.parse_args()
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+    started = time.perf_counter()
+    from rag_agent.chains import interview_graph
+    print(f"import interview_graph      : {_ms(time.perf_counter() - started)}")
+
+    started = time.perf_counter()
+    interview_graph.GraphAgent(resume="", jd="", company="")
+    print(f"first GraphAgent (compile)  : {_ms(time.perf_counter() - started)}")
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        interview_graph.GraphAgent(resume="", jd="", company="")
+        timings.append(time.perf_counter() - started)
+    print(f"GraphAgent (cached graph)   : mean {_ms(statistics.mean(timings))}, max {_ms(max(timings))}")
+
+    timings = []
+    for _ in range(min(args.repeat, 20)):
+        started = time.perf_counter()
+        interview_graph.build_graph()
+        timings.append(time.perf_counter() - started)
+    print(f"build_graph (no reuse)      : mean {_ms(statistics.mean(timings))}, max {_ms(max(timings))}")
+
+    if args.render:
+        started = time.perf_counter()
+        try:
+            interview_graph.draw_graph_png()
+            print(f"draw_graph_png (remote)     : {_ms(time.perf_counter() - started)}")
+        except Exception as e:
+            print(f"draw_graph_png failed after {_ms(time.perf_counter() - started)}: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,115 @@
-from .chat_history.ChatHistory import (
-    ChatHistory,
-    ChatItem,
-    ContentType,
-    SpeakerType,
-)
-from .chains.interview_chain import (
-    get_initial_message_chain,
-    get_reranking_model_answer_chain,
-    compare_model_answers,
-    agent_executor,
-    classify_input,
-)
-from .chains.interview_graph import GraphAgent
-from .chains.store import vectorstore, get_vectorstore_retriever, parse_file_to_text, load_vectorstore_from_company_infos, init_local_data, reset_vectorstore
-from .persona.Persona import Persona, PersonaType
-from .persona.PersonaService import PersonaService, PersonaInput
-
-__all__ = [
-    "ChatHistory",
-    "ChatItem",
-    "ContentType",
-    "SpeakerType",
-    "get_initial_message_chain",
-    "get_reranking_model_answer_chain",
-    "compare_model_answers",
-    "agent_executor",
-    "classify_input",
-    "PersonaService",
-    "Persona",
-    "PersonaType",
-    "PersonaInput",
-    "GraphAgent",
-    "vectorstore",
-    "get_vectorstore_retriever",
-    "parse_file_to_text",
-    "load_vectorstore_from_company_infos",
-    "init_local_data",
-    "reset_vectorstore"
-]
+"""
+rag_agent 패키지.
+
+공개 이름은 처음 접근할 때 해당 모듈을 import 합니다 (PEP 562).
+`from rag_agent import ChatHistory`는 ChatHistory 모듈만 읽고,
+LLM 체인/그래프/벡터스토어 모듈은 실제로 사용할 때 읽습니다.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+# 공개 이름 -> 정의된 모듈
+_LAZY_ATTRS = {
+    "ChatHistory": ".chat_history.ChatHistory",
+    "ChatItem": ".chat_history.ChatHistory",
+    "ContentType": ".chat_history.ChatHistory",
+    "SpeakerType": ".chat_history.ChatHistory",
+    "SessionManager": ".chat_history.SessionManager",
+    "HistoryMemory": ".chat_history.HistoryMemory",
+    "get_initial_message_chain": ".chains.interview_chain",
+    "get_reranking_model_answer_chain": ".chains.interview_chain",
+    "compare_model_answers": ".chains.interview_chain",
+    "acompare_model_answers": ".chains.interview_chain",
+    "agenerate_reranked_answers": ".chains.interview_chain",
+    "aselect_best_model_answer": ".chains.interview_chain",
+    "ajudge_model_answers_listwise": ".chains.interview_chain",
+    "gather_with_limit": ".chains.interview_chain",
+    "score_answer": ".chains.interview_chain",
+    "ascore_answer": ".chains.interview_chain",
+    "aggregate_turn_scores": ".chains.interview_chain",
+    "agent_executor": ".chains.interview_chain",
+    "classify_input": ".chains.interview_chain",
+    "PersonaService": ".persona.PersonaService",
+    "PersonaInput": ".persona.PersonaService",
+    "Persona": ".persona.Persona",
+    "PersonaType": ".persona.Persona",
+    "GraphAgent": ".chains.interview_graph",
+    "vectorstore": ".chains.store",
+    "get_vectorstore_retriever": ".chains.store",
+    "parse_file_to_text": ".chains.store",
+    "load_vectorstore_from_company_infos": ".chains.store",
+    "init_local_data": ".chains.store",
+    "reset_vectorstore": ".chains.store",
+    "get_corpus_version": ".chains.store",
+    "hybrid_search": ".chains.store",
+    "ahybrid_search": ".chains.store",
+    "CachedEmbeddings": ".chains.embeddings",
+    "HashingEmbeddings": ".chains.embeddings",
+    "create_embeddings": ".chains.embeddings",
+    "FaissVectorStore": ".chains.faiss_store",
+    "BM25Index": ".chains.bm25",
+    "TokenChunker": ".chains.chunking",
+    "get_chunker": ".chains.chunking",
+    "CompanyContextCache": ".chains.company_context",
+    "SearchProvider": ".chains.search",
+    "TavilySearchProvider": ".chains.search",
+    "LocalFileSearchProvider": ".chains.search",
+    "CachedSearchProvider": ".chains.search",
+    "create_search_provider": ".chains.search",
+    "IntentClassifier": ".chains.intent",
+    "get_prompt": ".prompts",
+    "get_llm": ".chains.llm",
+}
+
+# 모듈에서 다시 대입되는 전역 변수는 캐시하지 않고 매번 모듈에서 읽는다.
+_UNCACHED_ATTRS = {"vectorstore", "agent_executor"}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    if name not in _UNCACHED_ATTRS:
+        globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .chat_history.ChatHistory import ChatHistory, ChatItem, ContentType, SpeakerType
+    from .chat_history.SessionManager import SessionManager
+    from .chat_history.HistoryMemory import HistoryMemory
+    from .chains.interview_chain import (
+        get_initial_message_chain,
+        get_reranking_model_answer_chain,
+        compare_model_answers,
+        acompare_model_answers,
+        agenerate_reranked_answers,
+        aselect_best_model_answer,
+        ajudge_model_answers_listwise,
+        gather_with_limit,
+        score_answer,
+        ascore_answer,
+        aggregate_turn_scores,
+        agent_executor,
+        classify_input,
+    )
+    from .chains.interview_graph import GraphAgent
+    from .chains.embeddings import CachedEmbeddings, HashingEmbeddings, create_embeddings
+    from .chains.faiss_store import FaissVectorStore
+    from .chains.store import vectorstore, get_vectorstore_retriever, parse_file_to_text, load_vectorstore_from_company_infos, init_local_data, reset_vectorstore, get_corpus_version, hybrid_search, ahybrid_search
+    from .chains.bm25 import BM25Index
+    from .chains.chunking import TokenChunker, get_chunker
+    from .chains.company_context import CompanyContextCache
+    from .chains.search import SearchProvider, TavilySearchProvider, LocalFileSearchProvider, CachedSearchProvider, create_search_provider
+    from .chains.intent import IntentClassifier
+    from .chains.llm import get_llm
+    from .prompts import get_prompt
+    from .persona.Persona import Persona, PersonaType
+    from .persona.PersonaService import PersonaService, PersonaInput
@@ -0,0 +1,109 @@
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from typing import Optional
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    한국어용 토큰화: 단어(공백/문장부호 기준)와 단어 안의 문자 2-gram을 함께 사용한다.
+    조사가 붙은 "인재상은"도 "인재", "재상" 2-gram으로 "인재상"과 매칭된다.
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class BM25Index:
+    """
+    벡터 스토어와 같은 청크 위에 만드는 메모리 역색인입니다 (Okapi BM25).
+    검색 시 질의 토큰의 posting만 NumPy로 누적하므로 청크 수가 많아도 빠르게 동작합니다.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents: list[Document] = []
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.idf: dict[str, float] = {}
+        self.doc_lengths = np.zeros(0, dtype=np.float32)
+        self.avg_doc_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def build(self, ids: list[str], texts: list[str], metadatas: Optional[list[dict]] = None):
+        metadatas = metadatas or [{} for _ in texts]
+        self.documents = [
+            Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(ids, texts, metadatas)
+        ]
+
+        postings = defaultdict(lambda: ([], []))
+        lengths = []
+        for index, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term][0].append(index)
+                postings[term][1].append(tf)
+
+        count = len(texts)
+        self.postings = {
+            term: (np.array(doc_ids, dtype=np.int64), np.array(tfs, dtype=np.float32))
+            for term, (doc_ids, tfs) in postings.items()
+        }
+        self.idf = {
+            term: math.log(1 + (count - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            for term, (doc_ids, _) in self.postings.items()
+        }
+        self.doc_lengths = np.array(lengths, dtype=np.float32)
+        self.avg_doc_length = float(self.doc_lengths.mean()) if count else 0.0
+        logger.info(f"BM25 index built: {count} chunks, {len(self.postings)} terms")
+        return self
+
+    def search(self, query: str, k: int = 3) -> list[tuple[Document, float]]:
+        if not self.documents:
+            return []
+        scores = np.zeros(len(self.documents), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.avg_doc_length, 1e-9))
+        for term in set(tokenize(query)):
+            if term not in self.postings:
+                continue
+            doc_ids, tfs = self.postings[term]
+            scores[doc_ids] += self.idf[term] * tfs * (self.k1 + 1) / (tfs + norm[doc_ids])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) == 0:
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:k]]
+        return [(self.documents[i], float(scores[i])) for i in top]
+
+
+def reciprocal_rank_fusion(
+    result_lists: list[list[Document]], k: int = 3, rrf_k: int = 60
+) -> list[Document]:
+    """
+    여러 검색 결과를 순위만으로 합친다: score(d) = Σ 1 / (rrf_k + rank).
+    Chroma 검색 결과에는 id가 없을 수 있어 청크 본문으로 같은 문서를 판별한다.
+    """
+    scores: dict[str, float] = defaultdict(float)
+    documents: dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, start=1):
+            key = doc.page_content
+            scores[key] += 1.0 / (rrf_k + rank)
+            documents.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [documents[key] for key in ranked[:k]]
@@ -0,0 +1,196 @@
+import os
+import re
+import logging
+from functools import lru_cache
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 청크 분할 설정
+CHUNKER = os.getenv("CHUNKER", "token")  # token 또는 character (기존 CharacterTextSplitter)
+CHUNK_TOKENS = int(os.getenv("CHUNK_TOKENS", "256"))  # 청크당 목표 토큰 수
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))  # 앞 청크와 겹치는 토큰 수
+# 토큰 수 계산 인코딩: gpt-4o 계열 "o200k_base" 또는 근사치 "approx" (tiktoken 불필요)
+# tiktoken 인코딩은 처음 사용할 때 내려받으므로, 오프라인 배포에서는 TIKTOKEN_CACHE_DIR에 미리 받아둔 파일을 둔다.
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "o200k_base")
+APPROX_ENCODING = "approx"
+
+# 문장부호(뒤에 공백이 오는 경우만, "3.5" 같은 숫자는 제외)나 줄바꿈에서 자른다.
+_SENTENCE_PATTERN = re.compile(r".+?(?:[.!?。！？]+[\"'”’)\]]*(?=\s|$)|(?=\n)|$)")
+_WORD_PATTERN = re.compile(r"[가-힣ㄱ-ㅎㅏ-ㅣ一-龥ぁ-ヿ]|[A-Za-z0-9_]+|[^\sA-Za-z0-9_가-힣]")
+
+
+def split_sentences(text: str) -> list[str]:
+    sentences = []
+    for match in _SENTENCE_PATTERN.finditer(text):
+        sentence = match.group().strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def _approximate_token_count(text: str) -> int:
+    """tiktoken 인코딩을 받을 수 없는 환경(오프라인)용 근사치: 한글/한자 1자, 영숫자 4자당 1토큰."""
+    count = 0
+    for token in _WORD_PATTERN.findall(text):
+        count += (len(token) + 3) // 4 if token[0].isascii() and token[0].isalnum() else 1
+    return count
+
+
+@lru_cache(maxsize=4)
+def load_encoding(name: Optional[str] = None):
+    """
+    tiktoken 인코딩을 불러온다. "approx"이면 None (근사치 사용).
+    설정한 인코딩을 불러올 수 없으면 근사치로 바꾸지 않고 오류를 낸다. (청크 결과가 조용히 바뀌지 않도록)
+    """
+    name = name or TOKENIZER_ENCODING
+    if name == APPROX_ENCODING:
+        return None
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as e:
+        raise RuntimeError(
+            f"tiktoken encoding '{name}' could not be loaded ({e}). "
+            f"Provide it via TIKTOKEN_CACHE_DIR or set TOKENIZER_ENCODING={APPROX_ENCODING}."
+        ) from e
+
+
+_unavailable_encodings: set[str] = set()
+
+
+def count_tokens(text: str, encoding_name: Optional[str] = None) -> int:
+    """
+    TOKENIZER_ENCODING 기준 토큰 수. 프롬프트 예산 계산용이므로
+    인코딩을 불러올 수 없으면 한 번만 경고하고 이후로는 근사치를 반환한다.
+    """
+    name = encoding_name or TOKENIZER_ENCODING
+    encoding = None
+    if name not in _unavailable_encodings:
+        try:
+            encoding = load_encoding(name)
+        except RuntimeError as e:
+            _unavailable_encodings.add(name)
+            logger.warning(f"{e} Using approximate token counts.")
+    if encoding is None:
+        return _approximate_token_count(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def preload_tokenizer():
+    """
+    토큰 수 계산용 인코딩을 미리 불러온다.
+    처음 사용할 때 내려받는 tiktoken 인코딩을 요청 처리 중(이벤트 루프)에 받지 않도록 서버 시작 시 호출한다.
+    """
+    count_tokens("")
+
+
+class TokenChunker:
+    """
+    토큰 수 기준으로 청크를 만드는 분할기입니다.
+
+    문장 단위로 자른 뒤 chunk_tokens를 넘지 않도록 문장을 이어 붙이고,
+    앞 청크의 마지막 문장들을 overlap_tokens만큼 다음 청크 앞에 다시 넣습니다.
+    문장별 토큰 수는 캐시하므로 같은 문장이 반복되는 문서도 한 번만 토큰화합니다.
+    """
+
+    def __init__(
+        self,
+        chunk_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        encoding_name: Optional[str] = None,
+    ):
+        self.chunk_tokens = chunk_tokens or CHUNK_TOKENS
+        self.overlap_tokens = overlap_tokens if overlap_tokens is not None else CHUNK_OVERLAP_TOKENS
+        self.encoding_name = encoding_name or TOKENIZER_ENCODING
+        self.encoding = load_encoding(self.encoding_name)
+        self.count_tokens: Callable[[str], int] = lru_cache(maxsize=65536)(self._count_tokens)
+
+    @property
+    def signature(self) -> str:
+        """청크 결과에 영향을 주는 설정. 바뀌면 인덱스를 다시 만들어야 한다."""
+        return f"token:{self.encoding_name}:{self.chunk_tokens}:{self.overlap_tokens}"
+
+    def _count_tokens(self, text: str) -> int:
+        if self.encoding is None:
+            return _approximate_token_count(text)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def _split_long_sentence(self, sentence: str) -> list[str]:
+        """한 문장이 chunk_tokens보다 길면 토큰(또는 글자) 단위로 자른다."""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(sentence, disallowed_special=())
+            return [
+                self.encoding.decode(tokens[i:i + self.chunk_tokens])
+                for i in range(0, len(tokens), self.chunk_tokens)
+            ]
+        pieces, start, end, count = [], 0, 0, 0
+        for match in _WORD_PATTERN.finditer(sentence):
+            tokens = _approximate_token_count(match.group())
+            if count and count + tokens > self.chunk_tokens:
+                pieces.append(sentence[start:end].strip())
+                start, count = match.start(), 0
+            end = match.end()
+            count += tokens
+        if sentence[start:].strip():
+            pieces.append(sentence[start:].strip())
+        return pieces
+
+    def split_text(self, text: str) -> list[str]:
+        sentences = []
+        for sentence in split_sentences(text):
+            if self.count_tokens(sentence) > self.chunk_tokens:
+                sentences.extend(self._split_long_sentence(sentence))
+            else:
+                sentences.append(sentence)
+
+        chunks = []
+        current: list[str] = []
+        current_tokens = 0
+        for sentence in sentences:
+            tokens = self.count_tokens(sentence)
+            if current and current_tokens + tokens > self.chunk_tokens:
+                chunks.append(" ".join(current))
+                # 다음 청크 앞에 겹칠 문장들 (overlap_tokens 이내)
+                overlap: list[str] = []
+                overlap_tokens = 0
+                for previous in reversed(current):
+                    previous_tokens = self.count_tokens(previous)
+                    if overlap_tokens + previous_tokens > self.overlap_tokens:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_tokens += previous_tokens
+                if overlap_tokens + tokens > self.chunk_tokens:
+                    overlap, overlap_tokens = [], 0
+                current, current_tokens = overlap, overlap_tokens
+            current.append(sentence)
+            current_tokens += tokens
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
+
+class _CharacterChunker:
+    """기존 CharacterTextSplitter(512, 50) 분할 방식."""
+
+    signature = "character:512:50"
+
+    def __init__(self):
+        from langchain.text_splitter import CharacterTextSplitter
+
+        self.splitter = CharacterTextSplitter(chunk_size=512, chunk_overlap=50)
+
+    def split_text(self, text: str) -> list[str]:
+        return self.splitter.split_text(text)
+
+
+_chunker = None
+
+
+def get_chunker():
+    """CHUNKER 설정에 맞는 분할기를 프로세스마다 한 번만 만들어 재사용한다."""
+    global _chunker
+    if _chunker is None:
+        _chunker = _CharacterChunker() if CHUNKER == "character" else TokenChunker()
+    return _chunker
@@ -0,0 +1,96 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Optional
+
+from ..chat_history.Singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+
+class CompanyContextCache(Singleton):
+    """
+    JD별로 확정된 회사 정보(벡터 검색 + 관련성 평가, 또는 웹 검색 결과)를 보관하는 캐시입니다.
+
+    키는 (JD 해시, 코퍼스 버전)이므로 company_infos가 다시 인덱싱되면 자동으로 새로 조회합니다.
+    - ttl_seconds: 저장 후 이 시간이 지나면 다시 조회 (웹 검색 결과가 오래되지 않도록)
+    - max_entries: 최대 보관 개수 (초과 시 가장 오래 사용하지 않은 항목부터 제거)
+    - resolving(key): 같은 키를 동시에 조회하는 요청은 먼저 들어온 요청의 결과를 기다립니다.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None, max_entries: Optional[int] = None):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+        self.ttl_seconds = ttl_seconds or float(os.getenv("COMPANY_CONTEXT_TTL_SECONDS", "3600"))
+        self.max_entries = max_entries or int(os.getenv("COMPANY_CONTEXT_CACHE_SIZE", "128"))
+        self.entries: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # 조회 중인 키별 asyncio.Lock과 대기 중인 요청 수 (이벤트 루프마다 따로 관리)
+        self._inflight: dict[tuple, list] = {}
+        self.coalesced = 0
+
+    @staticmethod
+    def make_key(jd: str, corpus_version: Optional[str]) -> tuple:
+        return (hashlib.sha256(jd.encode("utf-8")).hexdigest(), corpus_version)
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self.entries[key]
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: tuple, company: Any):
+        with self._lock:
+            self.entries[key] = (time.monotonic(), company)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    @asynccontextmanager
+    async def resolving(self, key: tuple):
+        """
+        같은 키의 조회를 한 번에 하나만 실행한다.
+
+        먼저 들어온 요청이 조회를 마칠 때까지 나머지는 기다렸다가, 들어간 뒤 get으로 캐시를 다시 확인하면 된다.
+        """
+        inflight_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            entry = self._inflight.setdefault(inflight_key, [asyncio.Lock(), 0])
+            entry[1] += 1
+            if entry[0].locked():
+                self.coalesced += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._inflight[inflight_key]
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "ttl_seconds": self.ttl_seconds,
+        }
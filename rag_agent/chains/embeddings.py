@@ -0,0 +1,331 @@
+import os
+import hashlib
+import logging
+import random
+import sqlite3
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 캐시 파일 경로 (reset_vectorstore로 인덱스를 지워도 캐시는 유지되도록 chroma_db 밖에 둔다)
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "../vectorstore/embedding_cache.sqlite3"),
+)
+
+# 임베딩 제공자: "openai" (기본) 또는 네트워크 없이 동작하는 "local"
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+LOCAL_EMBEDDING_DIMENSIONS = int(os.getenv("LOCAL_EMBEDDING_DIMENSIONS", "512"))
+
+# 대량 임베딩 설정
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "100"))  # 요청 1회당 텍스트 수
+EMBEDDING_MAX_IN_FLIGHT = int(os.getenv("EMBEDDING_MAX_IN_FLIGHT", "4"))  # 동시에 보내는 요청 수
+EMBEDDING_MAX_RETRIES = int(os.getenv("EMBEDDING_MAX_RETRIES", "5"))  # rate limit 시 재시도 횟수
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector: list[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> list[float]:
+    vector = array("f")
+    vector.frombytes(blob)
+    return vector.tolist()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 결과를 SQLite에 저장해 두는 래퍼입니다.
+
+    (model, dimensions, text hash)를 키로 float32 blob을 저장하며,
+    embed_documents / embed_query 모두 캐시를 먼저 조회하고 없는 텍스트만 원본 임베딩으로 요청합니다.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache_path: Optional[str] = None,
+        model: Optional[str] = None,
+        dimensions: Optional[int] = None,
+    ):
+        self.embeddings = embeddings
+        self.cache_path = cache_path or EMBEDDING_CACHE_PATH
+        self.model = model or getattr(embeddings, "model", None) or type(embeddings).__name__
+        # dimensions가 없는 모델은 0으로 저장 (모델 기본 차원)
+        self.dimensions = dimensions or getattr(embeddings, "dimensions", None) or 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        cache_dir = os.path.dirname(os.path.abspath(self.cache_path))
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                PRIMARY KEY (model, dimensions, text_hash)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def _lookup(self, hashes: list[str]) -> dict[str, list[float]]:
+        found = {}
+        # SQLite 변수 개수 제한을 넘지 않도록 나눠서 조회
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" for _ in chunk)
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings "
+                    f"WHERE model = ? AND dimensions = ? AND text_hash IN ({placeholders})",
+                    [self.model, self.dimensions, *chunk],
+                ).fetchall()
+            for text_hash, blob in rows:
+                found[text_hash] = _from_blob(blob)
+        return found
+
+    def _store(self, items: list[tuple[str, list[float]]]):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, dimensions, text_hash, vector) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (self.model, self.dimensions, text_hash, _to_blob(vector))
+                    for text_hash, vector in items
+                ],
+            )
+            self._conn.commit()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        hashes = [_text_hash(text) for text in texts]
+        cached = self._lookup(list(set(hashes)))
+
+        # 캐시에 없는 텍스트만 중복 없이 모아서 요청
+        missing = {}
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in cached and text_hash not in missing:
+                missing[text_hash] = text
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            with self._lock:
+                self.misses += len(missing)
+            # 캐시 적중 여부와 관계없이 같은 값을 돌려주도록 float32로 맞춘다.
+            new_items = [
+                (text_hash, _from_blob(_to_blob(vector)))
+                for text_hash, vector in zip(missing.keys(), vectors)
+            ]
+            self._store(new_items)
+            cached.update(new_items)
+
+        return [cached[text_hash] for text_hash in hashes]
+
+    def embed_query(self, text: str) -> list[float]:
+        text_hash = _text_hash(text)
+        cached = self._lookup([text_hash])
+        if text_hash in cached:
+            with self._lock:
+                self.hits += 1
+            return cached[text_hash]
+
+        vector = _from_blob(_to_blob(self.embeddings.embed_query(text)))
+        with self._lock:
+            self.misses += 1
+        self._store([(text_hash, vector)])
+        return vector
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        with self._lock:
+            entries = self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model = ? AND dimensions = ?",
+                (self.model, self.dimensions),
+            ).fetchone()[0]
+        return {
+            "model": self.model,
+            "dimensions": self.dimensions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    네트워크 없이 동작하는 결정적 임베딩입니다.
+
+    문자 n-gram을 해시하여 고정 차원에 부호와 함께 더한 뒤 L2 정규화합니다 (feature hashing).
+    한국어는 띄어쓰기가 일정하지 않아 단어 대신 문자 n-gram을 사용합니다.
+    같은 텍스트는 항상 같은 벡터가 되므로 테스트, 벤치마크, 폐쇄망 환경에서 OpenAI 대신 사용할 수 있습니다.
+    """
+
+    model = "local-hashing-ngram"
+
+    def __init__(self, dimensions: Optional[int] = None, ngram_range: tuple[int, int] = (1, 3)):
+        self.dimensions = dimensions or LOCAL_EMBEDDING_DIMENSIONS
+        self.ngram_range = ngram_range
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        codepoints = np.frombuffer(
+            self._normalize(text).encode("utf-32-le"), dtype=np.uint32
+        ).astype(np.uint64)
+        mask = np.uint64(0xFFFFFFFF)
+        for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+            if len(codepoints) < n:
+                break
+            # n-gram 해시를 위치별로 한 번에 계산 (다항식 해시 + 섞기)
+            h = np.full(len(codepoints) - n + 1, n * 0x9E3779B1, dtype=np.uint64)
+            for k in range(n):
+                h = ((h * np.uint64(0x01000193)) ^ codepoints[k:len(codepoints) - n + 1 + k]) & mask
+            h = ((h ^ (h >> np.uint64(16))) * np.uint64(0x45D9F3B)) & mask
+            h = h ^ (h >> np.uint64(16))
+            index = (h % np.uint64(self.dimensions)).astype(np.int64)
+            sign = np.where((h >> np.uint64(31)) & np.uint64(1), -1.0, 1.0).astype(np.float32)
+            vector += np.bincount(index, weights=sign, minlength=self.dimensions).astype(np.float32)
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._embed(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed(text).tolist()
+
+
+def create_embeddings(provider: Optional[str] = None) -> Embeddings:
+    """
+    EMBEDDING_PROVIDER 환경 변수에 따라 임베딩 모델을 만든다.
+    - openai: OpenAIEmbeddings를 디스크 캐시(CachedEmbeddings)로 감싸서 반환
+    - local: HashingEmbeddings (계산 비용이 작아 캐시하지 않음)
+    """
+    provider = (provider or EMBEDDING_PROVIDER).lower()
+    if provider == "local":
+        return HashingEmbeddings()
+    if provider == "openai":
+        from langchain_community.embeddings import OpenAIEmbeddings
+
+        return CachedEmbeddings(OpenAIEmbeddings(model=EMBEDDING_MODEL))
+    raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider}")
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    if type(error).__name__ == "RateLimitError":
+        return True
+    if getattr(error, "status_code", None) == 429:
+        return True
+    return "rate limit" in str(error).lower()
+
+
+class _Backoff:
+    """모든 워커가 공유하는 대기 시간. rate limit이 나면 늘리고, 성공하면 줄인다."""
+
+    def __init__(self, base: float = 1.0, maximum: float = 60.0):
+        self.base = base
+        self.maximum = maximum
+        self.delay = 0.0
+        self.resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            remaining = self.resume_at - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def on_rate_limit(self) -> float:
+        with self._lock:
+            self.delay = min(self.maximum, max(self.base, self.delay * 2))
+            # 여러 워커가 동시에 재시도하지 않도록 jitter를 준다.
+            delay = self.delay * (0.5 + random.random())
+            self.resume_at = max(self.resume_at, time.monotonic() + delay)
+            return delay
+
+    def on_success(self):
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.base else 0.0
+
+
+def embed_in_batches(
+    embeddings: Embeddings,
+    texts: list[str],
+    batch_size: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    max_retries: Optional[int] = None,
+) -> list[list[float]]:
+    """
+    텍스트를 batch_size 단위로 나눠 최대 max_in_flight개의 요청을 동시에 보내 임베딩한다.
+    rate limit 오류는 공유 backoff로 대기한 뒤 재시도하고, 진행 상황을 로그로 남긴다.
+    결과는 입력 순서와 같다.
+    """
+    batch_size = batch_size or EMBEDDING_BATCH_SIZE
+    max_in_flight = max_in_flight or EMBEDDING_MAX_IN_FLIGHT
+    max_retries = max_retries if max_retries is not None else EMBEDDING_MAX_RETRIES
+    if not texts:
+        return []
+
+    batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    backoff = _Backoff()
+
+    def embed_batch(batch: list[str]) -> list[list[float]]:
+        for attempt in range(max_retries + 1):
+            backoff.wait()
+            try:
+                vectors = embeddings.embed_documents(batch)
+                backoff.on_success()
+                return vectors
+            except Exception as e:
+                if not _is_rate_limit_error(e) or attempt == max_retries:
+                    raise
+                delay = backoff.on_rate_limit()
+                logger.warning(
+                    f"Embedding rate limited, retrying in {delay:.1f}s "
+                    f"({attempt + 1}/{max_retries})"
+                )
+
+    results: list[Optional[list[list[float]]]] = [None] * len(batches)
+    started = time.perf_counter()
+    done_texts = 0
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        futures = {
+            executor.submit(embed_batch, batch): index
+            for index, batch in enumerate(batches)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            index = futures[future]
+            results[index] = future.result()
+            done_texts += len(batches[index])
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"Embedded {done_texts}/{len(texts)} texts "
+                f"({done}/{len(batches)} batches, {done_texts / elapsed:.1f} texts/s)"
+            )
+
+    return [vector for batch_vectors in results for vector in batch_vectors]
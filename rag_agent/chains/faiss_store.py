@@ -0,0 +1,317 @@
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Iterable, Optional
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+logger = logging.getLogger(__name__)
+
+# FAISS 인덱스 설정
+FAISS_INDEX_TYPE = os.getenv("FAISS_INDEX_TYPE", "flat")  # flat 또는 ivf
+FAISS_NLIST = int(os.getenv("FAISS_NLIST", "256"))  # IVF 클러스터 수
+FAISS_NPROBE = int(os.getenv("FAISS_NPROBE", "8"))  # IVF 검색 시 탐색할 클러스터 수
+
+INDEX_FILENAME = "index.faiss"
+DOCSTORE_FILENAME = "docstore.sqlite3"
+META_FILENAME = "meta.json"
+# 한 쿼리에 바인딩하는 id 수 (SQLite 변수 개수 제한보다 작게, 구버전 기본값 999)
+SQLITE_MAX_VARIABLES = 900
+
+
+def _to_faiss_id(doc_id: str) -> int:
+    """문자열 id를 FAISS가 사용하는 양의 int64 id로 변환한다."""
+    return int.from_bytes(hashlib.sha256(doc_id.encode("utf-8")).digest()[:8], "big") >> 1
+
+
+def _batched(items: list, size: int = SQLITE_MAX_VARIABLES) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _mmap_flag(index_type: str) -> int:
+    # flat 인덱스는 벡터 코드 자체를, IVF 인덱스는 inverted list를 mmap한다.
+    if index_type == "flat" and hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        return faiss.IO_FLAG_MMAP_IFC
+    return faiss.IO_FLAG_MMAP
+
+
+class FaissVectorStore(VectorStore):
+    """
+    디스크에 저장되는 FAISS 벡터 스토어입니다.
+
+    - 인덱스(index.faiss)는 시작할 때 mmap으로 열어 전체를 메모리에 올리지 않습니다.
+    - 문서 본문과 메타데이터는 SQLite(docstore.sqlite3)에 두고 검색 결과만 조회합니다.
+    - add_texts / delete처럼 인덱스를 수정해야 할 때만 인덱스를 메모리로 읽어오고, persist()로 다시 씁니다.
+    - docstore 변경은 persist()에서 인덱스를 쓴 뒤 함께 커밋하므로, 저장 전에 중단되면 둘 다 이전 상태로 남습니다.
+    - 벡터는 내적(inner product)으로 비교하므로 정규화된 임베딩을 전제로 합니다.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str,
+        embedding_function: Embeddings,
+        index_type: Optional[str] = None,
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None,
+    ):
+        self.persist_directory = persist_directory
+        self.embedding_function = embedding_function
+        self.nlist = nlist or FAISS_NLIST
+        self.nprobe = nprobe or FAISS_NPROBE
+        self._lock = threading.RLock()
+        self._dirty = False
+        os.makedirs(persist_directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            os.path.join(persist_directory, DOCSTORE_FILENAME), check_same_thread=False
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                faiss_id INTEGER PRIMARY KEY,
+                doc_id TEXT NOT NULL UNIQUE,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+        meta = self._load_meta()
+        # 이미 저장된 인덱스가 있으면 그 종류를 따른다.
+        self.index_type = meta.get("index_type") or index_type or FAISS_INDEX_TYPE
+        self.index: Optional[faiss.Index] = None
+        self._mmapped = False
+        if os.path.exists(self._index_path):
+            self.index = faiss.read_index(self._index_path, _mmap_flag(self.index_type))
+            self._mmapped = True
+            logger.info(
+                f"FAISS index memory-mapped: {self.index.ntotal} vectors ({self.index_type})"
+            )
+
+    @property
+    def embeddings(self) -> Optional[Embeddings]:
+        return self.embedding_function
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.persist_directory, INDEX_FILENAME)
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.persist_directory, META_FILENAME)
+
+    def _load_meta(self) -> dict:
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _ensure_writable(self):
+        """mmap으로 연 인덱스는 수정할 수 없으므로 수정 전에 메모리로 전체를 읽어온다."""
+        if self._mmapped:
+            self.index = faiss.read_index(self._index_path)
+            self._mmapped = False
+
+    def _create_index(self, vectors: np.ndarray) -> faiss.Index:
+        dim = vectors.shape[1]
+        # IVF는 학습 데이터가 충분할 때만 사용하고, 부족하면 flat으로 시작한다.
+        if self.index_type == "ivf" and len(vectors) >= self.nlist * 39:
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFFlat(quantizer, dim, self.nlist, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            return index
+        if self.index_type == "ivf":
+            logger.info(
+                f"Not enough vectors to train IVF ({len(vectors)} < {self.nlist * 39}), using flat index."
+            )
+            self.index_type = "flat"
+        return faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[list[dict]] = None,
+        ids: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self.embedding_function.embed_documents(texts)
+        return self.add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=ids)
+
+    def add_embeddings(
+        self,
+        text_embeddings: Iterable[tuple[str, list[float]]],
+        metadatas: Optional[list[dict]] = None,
+        ids: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> list[str]:
+        """이미 계산된 (텍스트, 벡터) 쌍을 추가합니다. 임베딩 모델을 다시 호출하지 않습니다."""
+        text_embeddings = list(text_embeddings)
+        if not text_embeddings:
+            return []
+        texts = [text for text, _ in text_embeddings]
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [hashlib.sha256(text.encode("utf-8")).hexdigest()[:32] for text in texts]
+        vectors = np.asarray([vector for _, vector in text_embeddings], dtype=np.float32)
+
+        with self._lock:
+            # 같은 id가 이미 있으면 교체 (upsert)
+            self.delete(ids=ids)
+            self._ensure_writable()
+            if self.index is None:
+                self.index = self._create_index(vectors)
+            faiss_ids = np.array([_to_faiss_id(doc_id) for doc_id in ids], dtype=np.int64)
+            self.index.add_with_ids(vectors, faiss_ids)
+            self._conn.executemany(
+                "INSERT INTO documents (faiss_id, doc_id, text, metadata) VALUES (?, ?, ?, ?)",
+                [
+                    (int(faiss_id), doc_id, text, json.dumps(metadata, ensure_ascii=False))
+                    for faiss_id, doc_id, text, metadata in zip(faiss_ids, ids, texts, metadatas)
+                ],
+            )
+            self._dirty = True
+        return ids
+
+    def delete(self, ids: Optional[list[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            faiss_ids = []
+            for batch in _batched(ids):
+                placeholders = ",".join("?" for _ in batch)
+                faiss_ids.extend(
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT faiss_id FROM documents WHERE doc_id IN ({placeholders})", batch
+                    )
+                )
+            if not faiss_ids:
+                return False
+            self._ensure_writable()
+            self.index.remove_ids(np.array(faiss_ids, dtype=np.int64))
+            for batch in _batched(ids):
+                placeholders = ",".join("?" for _ in batch)
+                self._conn.execute(f"DELETE FROM documents WHERE doc_id IN ({placeholders})", batch)
+            self._dirty = True
+        return True
+
+    def get(self, ids: Optional[list[str]] = None, **kwargs: Any) -> dict:
+        """Chroma.get과 같은 형태로 저장된 문서를 반환한다."""
+        # 공유 SQLite 연결은 쓰기와 동시에 사용할 수 없으므로 읽기도 잠금 안에서 한다.
+        with self._lock:
+            if ids:
+                rows = []
+                for batch in _batched(ids):
+                    placeholders = ",".join("?" for _ in batch)
+                    rows.extend(
+                        self._conn.execute(
+                            f"SELECT doc_id, text, metadata FROM documents WHERE doc_id IN ({placeholders})",
+                            batch,
+                        )
+                    )
+            else:
+                rows = self._conn.execute("SELECT doc_id, text, metadata FROM documents").fetchall()
+        return {
+            "ids": [row[0] for row in rows],
+            "documents": [row[1] for row in rows],
+            "metadatas": [json.loads(row[2]) for row in rows],
+        }
+
+    def persist(self):
+        """수정된 인덱스를 디스크에 쓰고 docstore 변경을 함께 커밋한 뒤, 다시 mmap으로 사용한다."""
+        with self._lock:
+            if not self._dirty or self.index is None:
+                return
+            tmp_path = self._index_path + ".tmp"
+            faiss.write_index(self.index, tmp_path)
+            os.replace(tmp_path, self._index_path)
+            with open(self._meta_path, "w", encoding="utf-8") as f:
+                json.dump({"index_type": self.index_type}, f)
+            # 인덱스 파일이 바뀐 뒤에 커밋하므로, 그 전에 중단되면 docstore도 이전 상태로 남는다.
+            self._conn.commit()
+            self.index = faiss.read_index(self._index_path, _mmap_flag(self.index_type))
+            self._mmapped = True
+            self._dirty = False
+
+    def similarity_search_by_vector_with_score(
+        self, embedding: list[float], k: int = 4
+    ) -> list[tuple[Document, float]]:
+        with self._lock:
+            if self.index is None or self.index.ntotal == 0:
+                return []
+            if self.index_type == "ivf":
+                faiss.extract_index_ivf(self.index).nprobe = self.nprobe
+            scores, faiss_ids = self.index.search(
+                np.asarray([embedding], dtype=np.float32), k
+            )
+            hits = [(int(i), float(s)) for i, s in zip(faiss_ids[0], scores[0]) if i != -1]
+            if not hits:
+                return []
+            # 인덱스와 docstore를 같은 시점에서 읽도록 조회도 잠금 안에서 한다.
+            rows = []
+            for batch in _batched(hits):
+                placeholders = ",".join("?" for _ in batch)
+                rows.extend(
+                    self._conn.execute(
+                        f"SELECT faiss_id, doc_id, text, metadata FROM documents WHERE faiss_id IN ({placeholders})",
+                        [faiss_id for faiss_id, _ in batch],
+                    )
+                )
+        by_id = {row[0]: row for row in rows}
+        results = []
+        for faiss_id, score in hits:
+            row = by_id.get(faiss_id)
+            if row is None:
+                continue
+            results.append(
+                (Document(id=row[1], page_content=row[2], metadata=json.loads(row[3])), score)
+            )
+        return results
+
+    def similarity_search_with_score(
+        self, query: str, k: int = 4, **kwargs: Any
+    ) -> list[tuple[Document, float]]:
+        return self.similarity_search_by_vector_with_score(
+            self.embedding_function.embed_query(query), k
+        )
+
+    def similarity_search_by_vector(
+        self, embedding: list[float], k: int = 4, **kwargs: Any
+    ) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_by_vector_with_score(embedding, k)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> list[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # 정규화된 벡터의 내적(-1~1)을 0~1 범위로 변환
+        return lambda score: (score + 1.0) / 2.0
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: list[str],
+        embedding: Embeddings,
+        metadatas: Optional[list[dict]] = None,
+        ids: Optional[list[str]] = None,
+        persist_directory: Optional[str] = None,
+        **kwargs: Any,
+    ) -> "FaissVectorStore":
+        if persist_directory is None:
+            raise ValueError("persist_directory is required for FaissVectorStore.")
+        store = cls(persist_directory=persist_directory, embedding_function=embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        store.persist()
+        return store
@@ -0,0 +1,184 @@
+import os
+import json
+import time
+import logging
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .embeddings import HashingEmbeddings
+from ..chat_history.Singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+# 로컬 의도 분류 설정
+INTENT_LOG_PATH = os.getenv(
+    "INTENT_LOG_PATH",
+    os.path.join(os.path.dirname(__file__), "../vectorstore/intent_labels.jsonl"),
+)
+# 1위와 2위 라벨의 유사도 차이가 이 값 이상일 때만 로컬 결과를 사용
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.08"))
+
+# 로그가 쌓이기 전에 사용하는 라벨별 예시 입력
+SEED_EXAMPLES = {
+    "question": [
+        "면접 질문 해주세요",
+        "다음 질문 주세요",
+        "질문 하나 더 해주세요",
+        "새로운 면접 질문을 생성해줘",
+        "면접 시작할게요",
+    ],
+    "followup": [
+        "꼬리질문 해주세요",
+        "방금 답변에 대해 더 물어봐 주세요",
+        "추가 질문 부탁드립니다",
+        "이어서 꼬리 질문 해줘",
+        "후속 질문 주세요",
+    ],
+    "modelAnswer": [
+        "모범답변 알려주세요",
+        "이 질문에 대한 모범 답안을 보여줘",
+        "예시 답변 부탁드려요",
+        "어떻게 답하면 좋을지 모범답변 보여주세요",
+        "정답 예시를 알려줘",
+    ],
+    "evaluate": [
+        "제 답변 평가해주세요",
+        "지금까지 답변 점수 알려줘",
+        "피드백 부탁드립니다",
+        "제 답변을 채점해 주세요",
+        "면접 결과를 평가해줘",
+    ],
+    "response": [
+        "저는 이전 프로젝트에서 백엔드 API 성능을 개선한 경험이 있습니다. 캐시를 도입해 응답 시간을 절반으로 줄였습니다.",
+        "팀원과 의견 충돌이 있었을 때 데이터를 근거로 대화하며 합의를 이끌어냈습니다.",
+        "제가 이 회사에 지원한 이유는 고객 중심의 서비스를 만드는 문화에 공감했기 때문입니다.",
+        "대학 시절 동아리 회장을 맡아 20명의 팀을 이끌며 행사를 성공적으로 마쳤습니다.",
+        "그 당시 저는 문제의 원인을 로그 분석으로 찾았고, 재발 방지를 위해 모니터링을 추가했습니다.",
+    ],
+    "other": [
+        "오늘 날씨 어때?",
+        "점심 메뉴 추천해줘",
+        "안녕하세요",
+        "고마워요",
+        "너는 누구야?",
+    ],
+}
+
+
+class NearestCentroidClassifier:
+    """라벨별 임베딩 평균(centroid)과의 코사인 유사도로 분류합니다."""
+
+    def __init__(self, labels: list[str], embeddings: HashingEmbeddings):
+        self.labels = list(labels)
+        self.embeddings = embeddings
+        self._sums = np.zeros((len(self.labels), embeddings.dimensions), dtype=np.float32)
+        self.counts = np.zeros(len(self.labels), dtype=np.int64)
+        self._centroids = self._sums.copy()
+
+    def add(self, texts: list[str], labels: list[str]):
+        if not texts:
+            return
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        for vector, label in zip(vectors, labels):
+            index = self.labels.index(label)
+            self._sums[index] += vector
+            self.counts[index] += 1
+        norms = np.linalg.norm(self._sums, axis=1, keepdims=True)
+        self._centroids = self._sums / np.maximum(norms, 1e-9)
+
+    def predict(self, text: str) -> tuple[str, float]:
+        """가장 가까운 라벨과 confidence(1위와 2위 유사도 차이)를 반환합니다."""
+        vector = np.asarray(self.embeddings.embed_query(text), dtype=np.float32)
+        similarities = self._centroids @ vector
+        top, second = np.argsort(-similarities)[:2]
+        return self.labels[top], float(similarities[top] - similarities[second])
+
+
+class IntentClassifier(Singleton):
+    """
+    임베딩 nearest-centroid 방식의 로컬 입력 분류기입니다.
+
+    라벨별 예시 입력(SEED_EXAMPLES + LLM이 분류한 기록)의 centroid와 비교하며,
+    1위와 2위의 유사도 차이(confidence)가 threshold보다 작으면 None을 반환해 LLM 분류로 넘깁니다.
+    LLM 분류 결과는 record()로 JSONL 로그에 쌓이고 즉시 centroid에 반영됩니다.
+    """
+
+    def __init__(
+        self,
+        log_path: Optional[str] = None,
+        threshold: Optional[float] = None,
+        embeddings: Optional[HashingEmbeddings] = None,
+    ):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+        self.log_path = log_path or INTENT_LOG_PATH
+        self.threshold = INTENT_CONFIDENCE_THRESHOLD if threshold is None else threshold
+        self.model = NearestCentroidClassifier(list(SEED_EXAMPLES), embeddings or HashingEmbeddings())
+        self.local_hits = 0
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+        examples = [(text, label) for label, texts in SEED_EXAMPLES.items() for text in texts]
+        examples += load_intent_log(self.log_path)
+        self.model.add([text for text, _ in examples], [label for _, label in examples])
+
+    def predict(self, query: str) -> tuple[str, float]:
+        return self.model.predict(query)
+
+    def classify(self, query: str) -> Optional[str]:
+        """confidence가 threshold 이상이면 라벨을, 아니면 None(LLM으로 위임)을 반환합니다."""
+        label, confidence = self.predict(query)
+        with self._lock:
+            if confidence >= self.threshold:
+                self.local_hits += 1
+                return label
+            self.escalations += 1
+        return None
+
+    def record(self, query: str, label: str):
+        """LLM이 분류한 결과를 로그에 남기고 centroid에 반영합니다."""
+        if label not in self.model.labels or not query:
+            return
+        with self._lock:
+            self.model.add([query], [label])
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(
+                        json.dumps(
+                            {"query": query, "label": label, "ts": time.time()},
+                            ensure_ascii=False,
+                        )
+                        + "\n"
+                    )
+            except OSError as e:
+                logger.warning(f"Failed to write intent log: {e}")
+
+    def stats(self) -> dict:
+        total = self.local_hits + self.escalations
+        return {
+            "local_hits": self.local_hits,
+            "escalations": self.escalations,
+            "local_rate": self.local_hits / total if total else 0.0,
+            "examples": dict(zip(self.model.labels, self.model.counts.tolist())),
+        }
+
+
+def load_intent_log(log_path: str) -> list[tuple[str, str]]:
+    """LLM 분류 기록(JSONL)을 (입력, 라벨) 목록으로 읽습니다."""
+    examples = []
+    try:
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("label") in SEED_EXAMPLES and record.get("query"):
+                    examples.append((record["query"], record["label"]))
+    except FileNotFoundError:
+        pass
+    return examples
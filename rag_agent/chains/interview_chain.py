@@ -1,8 +1,5 @@
-from pydantic import BaseModel
-from langchain.chains import LLMChain
-from langchain.prompts import PromptTemplate, ChatPromptTemplate
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_react_agent
+from pydantic import BaseModel, Field, ValidationError
+from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.messages import (
     AIMessage,
     HumanMessage,
@@ -12,14 +9,19 @@ from langchain_core.messages import (
 )
 from langchain_core.tools import tool
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from langchain import hub
-from typing import Literal
+from typing import Awaitable, Iterable, Literal, Optional
+import asyncio
 import os
+import re
 import logging
 import json
+from functools import lru_cache
 
 from dotenv import load_dotenv
 
+from ..prompts import get_prompt
+from .llm import get_llm
+
 # .env 파일 로드
 load_dotenv()
 # 로깅 설정
@@ -31,11 +33,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# LLM 초기화
-logger.info("Starting interview chain initialization...")
-llm = ChatOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"), temperature=0.7, model_name="gpt-4o-mini"
-)
+# 이 모듈의 체인이 사용하는 LLM (클라이언트는 처음 호출할 때 생성)
+LLM_MODEL = "gpt-4o"
 
 @tool
 def classify_input(input_data: str) -> str:
@@ -66,7 +65,7 @@ def classify_input(input_data: str) -> str:
         형식: resume, question, followup, modelAnswer, answer, other 중 하나로만 답하세요.
         """
     )
-    chain = classify_prompt | llm | StrOutputParser()
+    chain = classify_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
     return chain.invoke({"request": request, "chat_history": chat_history})
 
 @tool
@@ -113,7 +112,7 @@ def generate_question_reasoning(data: str) -> str:
         """
     )
 
-    chain = reasoning_prompt | llm | StrOutputParser()
+    chain = reasoning_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
     return chain.invoke({
         "resume": resume, 
         "jd": jd, 
@@ -137,7 +136,7 @@ def generate_question_acting(reasoning: str) -> str:
         """
     )
 
-    chain = acting_prompt | llm | StrOutputParser()
+    chain = acting_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
     return chain.invoke({"reasoning": reasoning})
 
 @tool
@@ -166,7 +165,7 @@ def generate_followup_reasoning(input_data: str) -> str:
         """
     )
 
-    chain = reasoning_prompt | llm | StrOutputParser()
+    chain = reasoning_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
     return chain.invoke({
         "chat_history": chat_history,
         "input_text": input_text
@@ -194,7 +193,7 @@ def generate_followup_acting(input_data: str) -> str:
         """
     )
 
-    chain = prompt | llm | StrOutputParser()
+    chain = prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
     return chain.invoke({"reasoning": reasoning, "input_text": input_text})
 
 
@@ -206,6 +205,116 @@ class AssessmentResult(BaseModel):
     averageScore: float
 
 
+# 답변 1개(턴)에 대한 구조화된 점수 항목
+SCORE_KEYS = ["logicScore", "jobFitScore", "coreValueFitScore", "communicationScore"]
+
+
+class TurnScores(BaseModel):
+    """지원자 답변 1개에 대한 항목별 점수 (0~10점)"""
+
+    logicScore: int = Field(ge=0, le=10)
+    jobFitScore: int = Field(ge=0, le=10)
+    coreValueFitScore: int = Field(ge=0, le=10)
+    communicationScore: int = Field(ge=0, le=10)
+
+
+turn_score_prompt = PromptTemplate.from_template(
+    """
+역할: 면접관으로서 지원자의 답변 1개를 평가합니다.
+
+직무 설명:
+{jd}
+
+이력서:
+{resume}
+
+회사 정보:
+{company}
+
+질문:
+{question}
+
+지원자의 답변:
+{answer}
+
+다음 4개 항목을 0-10점으로 평가하세요:
+1. 논리성 (logicScore): 답변의 논리적 일관성과 구조
+2. 직무적합성 (jobFitScore): JD 요구사항과의 부합도
+3. 핵심가치 부합성 (coreValueFitScore): 회사 가치와의 일치도
+4. 커뮤니케이션 능력 (communicationScore): 의사소통 명확성
+"""
+)
+
+
+def _turn_score_inputs(resume, jd, company, question, answer) -> dict:
+    return {
+        "resume": resume,
+        "jd": jd,
+        "company": company,
+        "question": question,
+        "answer": answer,
+    }
+
+
+def score_answer(resume: str, jd: str, company, question: str, answer: str) -> dict:
+    """지원자 답변 1개를 구조화된 점수(TurnScores)로 평가합니다."""
+    chain = turn_score_prompt | get_llm(LLM_MODEL, verbose=True).with_structured_output(TurnScores)
+    result = chain.invoke(_turn_score_inputs(resume, jd, company, question, answer))
+    return result.model_dump()
+
+
+async def ascore_answer(resume: str, jd: str, company, question: str, answer: str) -> dict:
+    """score_answer의 비동기 버전입니다."""
+    chain = turn_score_prompt | get_llm(LLM_MODEL, verbose=True).with_structured_output(TurnScores)
+    result = await chain.ainvoke(
+        _turn_score_inputs(resume, jd, company, question, answer)
+    )
+    return result.model_dump()
+
+
+SCORE_LABELS = {
+    "logicScore": "논리성",
+    "jobFitScore": "직무적합성",
+    "coreValueFitScore": "핵심가치 부합성",
+    "communicationScore": "커뮤니케이션 능력",
+}
+
+
+def aggregate_turn_scores(turn_scores: list[dict]) -> dict:
+    """
+    턴별 점수를 항목별 평균으로 합산합니다. LLM을 호출하지 않으며 O(턴 수)입니다.
+    AssessmentResultDTO 형식(logicScore, ..., averageScore, overallEvaluation)을 반환합니다.
+    """
+    if not turn_scores:
+        return {
+            **{key: 0 for key in SCORE_KEYS},
+            "averageScore": 0,
+            "overallEvaluation": "아직 평가할 수 있는 답변이 없습니다.",
+        }
+
+    averages = {
+        key: round(sum(scores[key] for scores in turn_scores) / len(turn_scores), 1)
+        for key in SCORE_KEYS
+    }
+    average_score = round(sum(averages.values()) / len(SCORE_KEYS), 1)
+    best = max(SCORE_KEYS, key=lambda key: averages[key])
+    worst = min(SCORE_KEYS, key=lambda key: averages[key])
+
+    if average_score >= 7:
+        verdict = "전반적으로 우수한 답변을 보여주었습니다."
+    elif average_score >= 5:
+        verdict = "전반적으로 무난하지만 일부 항목은 보완이 필요합니다."
+    else:
+        verdict = "답변의 구체성과 논리 전개를 전반적으로 보완할 필요가 있습니다."
+
+    overall_evaluation = (
+        f"총 {len(turn_scores)}개의 답변을 평가한 평균 점수는 {average_score}점입니다. "
+        f"가장 강점을 보인 항목은 {SCORE_LABELS[best]}({averages[best]}점)이고, "
+        f"보완이 필요한 항목은 {SCORE_LABELS[worst]}({averages[worst]}점)입니다. "
+        f"{verdict}"
+    )
+    return {**averages, "averageScore": average_score, "overallEvaluation": overall_evaluation}
+
 @tool
 def evaluate_answer(data):
     """지원자 답변을 평가"""
@@ -257,7 +366,7 @@ def evaluate_answer(data):
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
 
-    chain = assessment_prompt | llm | parser
+    chain = assessment_prompt | get_llm(LLM_MODEL, verbose=True) | parser
     
     try:
         result = chain.invoke({
@@ -294,60 +403,34 @@ def parse_role_from_message(message: BaseMessage) -> Literal["assistant", "human
         return "unknown"
 
 
-# ReAct 프롬프트 (langchain hub에서 가져오기)
-try:
-    # LangChain Hub에서 표준 ReAct 프롬프트 가져오기
-    prompt = hub.pull("hwchase17/react")
-except:
-    # Hub를 사용할 수 없는 경우 커스텀 프롬프트 사용
-    prompt = PromptTemplate.from_template(
-        """
-        당신은 전문 면접관입니다. 다음 도구들을 사용하여 효과적인 면접을 진행하세요:
-
-        {tools}
+@lru_cache(maxsize=1)
+def get_agent_executor():
+    """ReAct 면접관 Agent를 처음 사용할 때 만든다. (hwchase17/react 프롬프트)"""
+    from langchain.agents import AgentExecutor, create_react_agent
 
-        다음 형식을 사용하세요:
+    logger.info("Starting interview chain initialization...")
+    agent = create_react_agent(get_llm(LLM_MODEL, verbose=True), tools, get_prompt("hwchase17/react"))
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True,
+        max_iterations=3,  # 최대 반복 횟수 제한
+        handle_parsing_errors=True  # 파싱 오류 처리
+    )
 
-        Question: 답변해야 할 입력 질문
-        Thought: 무엇을 해야 할지 생각하세요
-        Action: 수행할 작업, 다음 중 하나여야 합니다: [{tool_names}]
-        Action Input: 작업에 대한 입력
-        Observation: 작업의 결과
-        ... (이 Thought/Action/Action Input/Observation은 N번 반복될 수 있습니다)
-        Thought: 이제 최종 답변을 알았습니다
-        Final Answer: 원래 입력 질문에 대한 최종 답변
 
-        시작!
+def __getattr__(name: str):
+    # 기존 코드의 `from .interview_chain import agent_executor` 호환
+    if name == "agent_executor":
+        return get_agent_executor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-Question: {input}
-Thought: {agent_scratchpad}
-"""
-)
-
-# LLM 초기화
-logger.info("Starting interview chain initialization...")
-llm = ChatOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"),
-    temperature=0.7,
-    model_name="gpt-4o",
-    verbose=True,
-)
-
-# memory = MemorySaver()
-agent = create_react_agent(llm, tools, prompt)
-agent_executor = AgentExecutor(
-    agent=agent, 
-    tools=tools, 
-    verbose=True,
-    max_iterations=3,  # 최대 반복 횟수 제한
-    handle_parsing_errors=True  # 파싱 오류 처리
-)
 
 class InterviewAgent:
     """면접관 Agent 클래스"""
     
     def __init__(self):
-        self.agent_executor = agent_executor
+        self.agent_executor = get_agent_executor()
         self.logger = logger
     
     def run_interview(self, input_data: dict) -> str:
@@ -407,7 +490,7 @@ class InterviewAgent:
 
 
 def run_interview_question_pipeline(resume: str, jd: str, company: str) -> str:
-    return agent_executor.invoke(
+    return get_agent_executor().invoke(
         f"generate_interview_question(resume='{resume}', jd='{jd}', company='{company}')"
     )
 
@@ -441,7 +524,9 @@ def get_initial_message_chain():
         입력하신 내용을 바탕으로 면접 질문을 생성하고 면접을 시작해보겠습니다. 🔥
         """
     )
-    initial_chain = LLMChain(llm=llm, prompt=initial_prompt, output_key="result")
+    from langchain.chains import LLMChain
+
+    initial_chain = LLMChain(llm=get_llm(LLM_MODEL, verbose=True), prompt=initial_prompt, output_key="result")
     return initial_chain
 
 
@@ -501,17 +586,17 @@ def get_reranking_model_answer_chain():
             """,
     )
 
-    reranking_chain = LLMChain(llm=llm, prompt=reranking_prompt, output_key="result")
+    from langchain.chains import LLMChain
+
+    reranking_chain = LLMChain(llm=get_llm(LLM_MODEL, verbose=True), prompt=reranking_prompt, output_key="result")
     return reranking_chain
 
 
-def compare_model_answers(original_answer: str, reranked_answer: str) -> dict:
-    """두 모델 답변을 비교하는 함수"""
-    comparison_prompt = ChatPromptTemplate.from_messages(
-        [
-            (
-                "system",
-                """
+comparison_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
 당신은 두 개의 면접 답변을 평가하는 인사 전문가입니다.
 다음 기준에 따라 두 답변을 비교하세요:
 1. 구체성: 예시와 경험이 얼마나 구체적으로 제시되었는가?
@@ -566,36 +651,279 @@ def compare_model_answers(original_answer: str, reranked_answer: str) -> dict:
 }}
 모든 설명과 결과는 반드시 한국어로 작성하세요.
 """,
-            ),
-            (
-                "user",
-                """다음 두 답변을 비교하세요:
+        ),
+        (
+            "user",
+            """다음 두 답변을 비교하세요:
 
 원본 답변:
 {original_answer}
 
 Reranking 답변:
 {reranked_answer}""",
-            ),
-        ]
-    )
+        ),
+    ]
+)
+
+
+def _parse_comparison_result(result: str) -> dict:
+    # 코드블록 등 제거
+    result_str = result.strip()
+    # ```json ... ``` 또는 ``` ... ``` 제거
+    result_str = re.sub(
+        r"^```(?:json)?|```$", "", result_str, flags=re.MULTILINE
+    ).strip()
+    return json.loads(result_str)
 
-    chain = comparison_prompt | llm | StrOutputParser()
+
+def compare_model_answers(original_answer: str, reranked_answer: str) -> dict:
+    """두 모델 답변을 비교하는 함수"""
+    chain = comparison_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
 
     try:
         result = chain.invoke(
             {"original_answer": original_answer, "reranked_answer": reranked_answer}
         )
-        # 코드블록 등 제거
-        import re
-
-        result_str = result.strip()
-        # ```json ... ``` 또는 ``` ... ``` 제거
-        result_str = re.sub(
-            r"^```(?:json)?|```$", "", result_str, flags=re.MULTILINE
-        ).strip()
-        comparison_result = json.loads(result_str)
-        return comparison_result
+        return _parse_comparison_result(result)
+    except Exception as e:
+        logger.error(f"Error in comparing answers: {str(e)}")
+        raise Exception(f"Failed to compare answers: {str(e)}")
+
+
+async def acompare_model_answers(original_answer: str, reranked_answer: str) -> dict:
+    """compare_model_answers의 비동기 버전입니다."""
+    chain = comparison_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
+
+    try:
+        result = await chain.ainvoke(
+            {"original_answer": original_answer, "reranked_answer": reranked_answer}
+        )
+        return _parse_comparison_result(result)
     except Exception as e:
         logger.error(f"Error in comparing answers: {str(e)}")
         raise Exception(f"Failed to compare answers: {str(e)}")
+
+
+class CriterionScores(BaseModel):
+    """listwise 평가에서 답변 1개의 기준별 점수"""
+
+    specificity: int = Field(ge=1, le=10)
+    relevance: int = Field(ge=1, le=10)
+    structure: int = Field(ge=1, le=10)
+    company_fit: int = Field(ge=1, le=10)
+    expertise: int = Field(ge=1, le=10)
+
+    @property
+    def total(self) -> int:
+        return (
+            self.specificity
+            + self.relevance
+            + self.structure
+            + self.company_fit
+            + self.expertise
+        )
+
+
+class ListwiseJudgement(BaseModel):
+    """원본 답변과 후보 답변 N개를 한 번에 평가한 결과"""
+
+    original: CriterionScores
+    candidates: list[CriterionScores]
+    winner: int  # 0이면 원본, 1..N이면 해당 후보
+    summary: str = ""
+
+
+listwise_comparison_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
+당신은 여러 개의 면접 답변을 한 번에 평가하는 인사 전문가입니다.
+원본 답변과 후보 답변들을 다음 기준에 따라 각각 1~10점으로 평가하세요:
+1. 구체성 (specificity): 예시와 경험이 얼마나 구체적으로 제시되었는가?
+2. 관련성 (relevance): 답변이 질문과 직무 요구사항에 얼마나 부합하는가?
+3. 구조화 (structure): 답변이 얼마나 논리적이고 명확하게 구성되어 있는가?
+4. 회사 적합성 (company_fit): 답변이 회사의 가치관과 문화에 얼마나 부합하는가?
+5. 전문성 (expertise): 답변이 직무 관련 지식과 역량을 얼마나 잘 보여주는가?
+
+모든 답변을 서로 비교한 뒤 가장 좋은 답변을 winner로 고르세요.
+winner는 원본이면 0, 후보 답변이면 해당 후보 번호(1부터 시작)입니다.
+
+아래와 같은 JSON 형식으로만 결과를 반환하세요(추가 설명, 코드블록 등 금지):
+{{
+    "original": {{"specificity": number, "relevance": number, "structure": number, "company_fit": number, "expertise": number}},
+    "candidates": [
+        {{"specificity": number, "relevance": number, "structure": number, "company_fit": number, "expertise": number}}
+    ],
+    "winner": number,
+    "summary": string
+}}
+candidates 배열에는 후보 답변 순서대로 정확히 {candidate_count}개의 항목이 있어야 합니다.
+summary는 반드시 한국어로 작성하세요.
+""",
+        ),
+        (
+            "user",
+            """다음 답변들을 평가하세요:
+
+원본 답변:
+{original_answer}
+
+후보 답변:
+{candidate_answers}""",
+        ),
+    ]
+)
+
+
+def _listwise_inputs(original_answer: str, candidates: list[str]) -> dict:
+    return {
+        "original_answer": original_answer,
+        "candidate_answers": "\n\n".join(
+            f"[후보 {i}]\n{answer}" for i, answer in enumerate(candidates, start=1)
+        ),
+        "candidate_count": len(candidates),
+    }
+
+
+def _validate_listwise_result(result: str, candidate_count: int) -> ListwiseJudgement:
+    judgement = ListwiseJudgement.model_validate(_parse_comparison_result(result))
+    if len(judgement.candidates) != candidate_count:
+        raise ValueError(
+            f"expected {candidate_count} candidate scores, got {len(judgement.candidates)}"
+        )
+    if not 0 <= judgement.winner <= candidate_count:
+        raise ValueError(f"winner index out of range: {judgement.winner}")
+    return judgement
+
+
+async def ajudge_model_answers_listwise(
+    original_answer: str, candidates: list[str]
+) -> ListwiseJudgement:
+    """
+    원본 답변과 후보 답변 전체를 한 번의 LLM 호출로 평가합니다.
+    출력이 형식 검증에 실패하면 ValueError(ValidationError 포함)를 발생시킵니다.
+    """
+    chain = listwise_comparison_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
+    result = await chain.ainvoke(_listwise_inputs(original_answer, candidates))
+    return _validate_listwise_result(result, len(candidates))
+
+
+def judge_model_answers_listwise(
+    original_answer: str, candidates: list[str]
+) -> ListwiseJudgement:
+    """ajudge_model_answers_listwise의 동기 버전입니다."""
+    chain = listwise_comparison_prompt | get_llm(LLM_MODEL, verbose=True) | StrOutputParser()
+    result = chain.invoke(_listwise_inputs(original_answer, candidates))
+    return _validate_listwise_result(result, len(candidates))
+
+
+# modelAnswer best-of-N reranking 설정
+MODEL_ANSWER_CANDIDATES = int(os.getenv("MODEL_ANSWER_CANDIDATES", "3"))  # 생성할 후보 수
+MODEL_ANSWER_FANOUT = int(os.getenv("MODEL_ANSWER_FANOUT", "3"))  # 동시에 실행할 LLM 호출 수
+MODEL_ANSWER_TIMEOUT = float(os.getenv("MODEL_ANSWER_TIMEOUT", "60"))  # 후보 1개당 제한 시간(초)
+# "listwise": 한 번의 호출로 전체 후보 평가 (검증 실패 시 pairwise로 대체), "pairwise": 후보별 1:1 비교
+MODEL_ANSWER_JUDGE_MODE = os.getenv("MODEL_ANSWER_JUDGE_MODE", "listwise")
+
+
+async def gather_with_limit(
+    coros: Iterable[Awaitable],
+    width: int = MODEL_ANSWER_FANOUT,
+    timeout: Optional[float] = MODEL_ANSWER_TIMEOUT,
+) -> list:
+    """
+    코루틴들을 최대 width개씩 동시에 실행합니다.
+    각 코루틴은 timeout 안에 끝나야 하며, 실패하거나 시간 초과된 항목은 None으로 채웁니다.
+    결과 순서는 입력 순서를 따릅니다.
+    """
+    semaphore = asyncio.Semaphore(max(1, width))
+
+    async def run(coro):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(coro, timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Candidate timed out after {timeout}s")
+            except Exception as e:
+                logger.error(f"Candidate failed: {str(e)}")
+            return None
+
+    return await asyncio.gather(*(run(coro) for coro in coros))
+
+
+async def agenerate_reranked_answers(
+    reranking_chain,
+    inputs: dict,
+    n: int = MODEL_ANSWER_CANDIDATES,
+    width: int = MODEL_ANSWER_FANOUT,
+    timeout: Optional[float] = MODEL_ANSWER_TIMEOUT,
+) -> list[str]:
+    """reranking 후보 답변 n개를 동시에 생성합니다. 실패한 후보는 제외됩니다."""
+    results = await gather_with_limit(
+        (reranking_chain.ainvoke(inputs) for _ in range(n)), width, timeout
+    )
+    return [result["result"] for result in results if result is not None]
+
+
+async def aselect_best_model_answer_pairwise(
+    original_answer: str,
+    candidates: list[str],
+    width: int = MODEL_ANSWER_FANOUT,
+    timeout: Optional[float] = MODEL_ANSWER_TIMEOUT,
+) -> str:
+    """각 후보를 원본과 동시에 비교하여 reranked_total 점수가 가장 높은 답변을 반환합니다."""
+    comparisons = await gather_with_limit(
+        (acompare_model_answers(original_answer, answer) for answer in candidates),
+        width,
+        timeout,
+    )
+
+    best_score = -1
+    best_answer = original_answer
+    for answer, comparison in zip(candidates, comparisons):
+        if comparison is None:
+            continue
+        score = comparison["overall"]["reranked_total"]
+        if score > best_score:
+            best_score = score
+            best_answer = answer
+    return best_answer
+
+
+async def aselect_best_model_answer(
+    original_answer: str,
+    candidates: list[str],
+    width: int = MODEL_ANSWER_FANOUT,
+    timeout: Optional[float] = MODEL_ANSWER_TIMEOUT,
+    judge_mode: str = MODEL_ANSWER_JUDGE_MODE,
+) -> str:
+    """
+    후보 답변 중 가장 좋은 답변을 고릅니다.
+    listwise 모드에서는 한 번의 호출로 평가하고, 출력 검증에 실패한 경우에만
+    후보별 pairwise 비교로 대체합니다.
+    """
+    if not candidates:
+        return original_answer
+
+    if judge_mode == "listwise":
+        try:
+            judgement = await asyncio.wait_for(
+                ajudge_model_answers_listwise(original_answer, candidates),
+                timeout=timeout,
+            )
+            if judgement.winner == 0:
+                return original_answer
+            return candidates[judgement.winner - 1]
+        except asyncio.TimeoutError:
+            logger.warning(f"Listwise judge timed out after {timeout}s")
+            return original_answer
+        except (ValidationError, ValueError) as e:
+            logger.warning(f"Listwise judge output invalid, falling back to pairwise: {e}")
+        except Exception as e:
+            # API/네트워크 오류로 이미 생성된 원본 답변을 버리지 않도록 원본을 반환
+            logger.error(f"Listwise judge failed: {str(e)}")
+            return original_answer
+
+    return await aselect_best_model_answer_pairwise(
+        original_answer, candidates, width, timeout
+    )
@@ -1,25 +1,33 @@
 import asyncio
+import logging
 import os
-from typing import Literal
+import time
+import threading
+from typing import AsyncIterator, Literal, Optional, get_args
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing_extensions import TypedDict
 
-from langchain.prompts import PromptTemplate, ChatPromptTemplate
+from langchain_core.prompts import PromptTemplate, ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
-from langchain_community.tools import TavilySearchResults
-from langgraph.prebuilt import create_react_agent
-from langchain_openai import ChatOpenAI
-from langchain import hub
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import START, END, StateGraph
 
 from rag_agent import ChatHistory
+from ..chat_history.HistoryMemory import HISTORY_TOKEN_BUDGETS
 from ..persona.PersonaService import PersonaService
-from rag_agent.chains.store import get_vectorstore_retriever, get_vectorstore
+from rag_agent.chains.store import get_vectorstore_retriever, get_vectorstore, get_corpus_version, ahybrid_search
+from .company_context import CompanyContextCache
+from .search import get_search_provider
+from .llm import get_llm
+from .intent import IntentClassifier
+from ..events.EventBus import EventBus
+from ..prompts import get_prompt
+from .interview_chain import ascore_answer
 
-from IPython.display import Image, display
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
 
 class Route(BaseModel):
@@ -32,6 +40,7 @@ class AgentState(TypedDict):
     query: str  # 사용자 답변
     answer: str  # Agent 답변
     input_type: str  # 사용자 답변 유형
+    request_type: str  # 클라이언트가 보낸 요청 유형 (RequestInput.type)
     persona_id: str  # 페르소나 ID
     selected_persona: str  # 페르소나 내용
     persona_list: list  # 가용 페르소나 리스트트
@@ -40,24 +49,17 @@ class AgentState(TypedDict):
     jd: str  # 채용공고
     company: str  # 회사정보 (인재상)
     company_query: str  # 회사정보 검색을 위한 질문
-    chat_history: ChatHistory  # 대화내역
+    chat_history: str  # 대화내역
+    session: ChatHistory  # 현재 세션의 대화내역 객체
     last_question: str  # 마지막 질문
+    scores: dict  # 이번 답변의 평가 점수 (logicScore, jobFitScore, ...)
 
 
-llm = ChatOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"), temperature=0.7, model_name="gpt-4o-mini"
-)
+# 그래프 노드가 사용하는 LLM (클라이언트는 처음 호출할 때 생성)
+LLM_MODEL = "gpt-4o-mini"
 
 
-def get_company_info(query):
-    # if vectorstore is None:
-    #     raise HTTPException(
-    #         status_code=400,
-    #         detail="Company documents not uploaded. Please upload docs first.",
-    #     )
-    # 회사 자료 검색
-    vectorstore = get_vectorstore()
-    retrieved = vectorstore.similarity_search(query, k=3)
+def _trim_company_info(retrieved) -> str:
     company_info = "\n".join([doc.page_content for doc in retrieved])
     # Trim company_info to avoid exceeding model context window
     max_company_info_length = 2000
@@ -66,113 +68,42 @@ def get_company_info(query):
     return company_info
 
 
-doc_relevance_prompt = hub.pull("langchain-ai/rag-document-relevance")
-
-tavily_search_tool = TavilySearchResults(
-    max_results=3,
-    search_depth="advanced",
-    include_answer=True,
-    include_raw_content=True,
-    include_images=False,
-)
-
-sse_queue = []
-
-
-async def event_stream():
-    while True:
-        if sse_queue:
-            data = sse_queue.pop(0)
-            yield f"data: {data}\n\n"
-        else:
-            await asyncio.sleep(0.1)  # 큐가 비어있으면 잠시 대기
-
-
-def retrieve(state: AgentState) -> AgentState:
-    """
-    사용자의 질문에 기반하여 벡터 스토어에서 관련 문서를 검색합니다.
-
-    Args:
-        state (AgentState): 사용자의 질문을 포함한 에이전트의 현재 state.
-
-    Returns:
-        AgentState: 검색된 문서가 추가된 state를 반환합니다.
-    """
-    jd = state.get("jd", "")
-    company = state.get("company", "")
-    print("^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^")
-    print(company)
-
-    if not company or company is None:
-        docs = get_company_info(jd)
-        if docs is not None:
-            doc_relevance_chain = doc_relevance_prompt | llm
-            response = doc_relevance_chain.invoke({"question": jd, "documents": docs})
-            print("doc_relevance_chain >", response["Score"])
-
-            if response["Score"] == 1:
-                return {"company": docs}
-
-        rewrite_prompt = PromptTemplate.from_template(
-            """사용자의 입력은 채용공고입니다. 내용을 확인하고 해당 기업의 회사정보, 인재상에 대한 웹 검색이 용이하도록 사용자의 질문을 50자 이내 자연어로 작성해주세요.
-
-조건:
-- 해당 기업 공식사이트에서 정확한 정보를 가져올 수 있도록 유도
-- 물음표(?)로 끝나는 질문이 아닌 검색이 용이한 키워드 형태로 출력
-- 예시: "삼성 채용 사이트에서 인재상" 또는 "네이버 인재상 site:recruit.navercorp.com"
-
-질문: 
-{query}"""
-        )
-        sse_queue.append("온라인에서 정보를 수집중입니다.")
-        rewrite_chain = rewrite_prompt | llm | StrOutputParser()
-
-        company_query = rewrite_chain.invoke({"query": jd})
-        print("web_search query > ", company_query)
-        results = tavily_search_tool.invoke({"query": company_query})
-        contents = [item.get("content", "") for item in results]
-        print("***********************************************************************")
-        print(contents)
-        return {"company": contents}
-    else:
-        return {"company": company}
-
+async def get_company_info(query):
+    # if vectorstore is None:
+    #     raise HTTPException(
+    #         status_code=400,
+    #         detail="Company documents not uploaded. Please upload docs first.",
+    #     )
+    # 회사 자료 검색
+    retrieved = await ahybrid_search(query, k=3)
+    return _trim_company_info(retrieved)
 
-def check_doc_relevance(state: AgentState) -> Literal["relevant", "irrelvant"]:
-    """
-    주어진 state를 기반으로 문서의 관련성을 판단합니다.
 
-    Args:
-        state (AgentState): 사용자의 질문과 문맥을 포함한 에이전트의 현재 state.
+# 문서 관련성 평가 프롬프트 (Score/Explanation 구조화 출력, rag_agent/prompts에 포함)
+DOC_RELEVANCE_PROMPT = "langchain-ai/rag-document-relevance"
 
-    Returns:
-        Literal['relevant', 'irrelevant']: 문서가 관련성이 높으면 'relevant', 그렇지 않으면 'irrelevant'를 반환합니다.
-    """
-    query = state.get("jd", "")
-    context = state.get("company", "")
+event_bus = EventBus.get_instance()
+company_context_cache = CompanyContextCache.get_instance()
 
-    doc_relevance_chain = doc_relevance_prompt | llm
-    response = doc_relevance_chain.invoke({"question": query, "documents": context})
-    print("doc_relevance_chain >", response["Score"])
 
-    if response["Score"] == 1:
-        return "relevant"
+def _history_for(state: AgentState, node: str) -> str:
+    """노드별 토큰 예산 안에서 최근 대화 + 이전 대화 요약으로 만든 대화 내역을 반환합니다."""
+    session = state.get("session")
+    if session is None:
+        return state.get("chat_history", "")
+    return session.memory.render(HISTORY_TOKEN_BUDGETS.get(node))
 
-    return "irrelvant"
 
+def publish_progress(state: AgentState, message: str):
+    """현재 세션의 /events 구독자에게 진행 상황 메시지를 보냅니다."""
+    session = state.get("session")
+    event_bus.publish(session.session_id if session else None, message)
 
-def rewrite(state: AgentState) -> AgentState:
-    """
-    사용자의 질문을 사전을 참고하여 변경합니다.
 
-    Args:
-        state (AgentState): 사용자의 질문을 포함한 에이전트의 현재 state.
+# 노드에서 사용하는 프롬프트
+rewrite_prompt = PromptTemplate.from_template(
+    """사용자의 입력은 채용공고입니다. 내용을 확인하고 해당 기업의 회사정보, 인재상에 대한 웹 검색이 용이하도록 사용자의 질문을 50자 이내 자연어로 작성해주세요.
 
-    Returns:
-        AgentState: 변경된 질문을 포함하는 state를 반환합니다.
-    """
-    rewrite_prompt = PromptTemplate.from_template(
-        """사용자의 입력은 채용공고입니다. 내용을 확인하고 해당 기업의 회사정보, 인재상에 대한 웹 검색이 용이하도록 사용자의 질문을 50자 이내 자연어로 작성해주세요.
 조건:
 - 해당 기업 공식사이트에서 정확한 정보를 가져올 수 있도록 유도
 - 물음표(?)로 끝나는 질문이 아닌 검색이 용이한 키워드 형태로 출력
@@ -180,62 +111,10 @@ def rewrite(state: AgentState) -> AgentState:
 
 질문: 
 {query}"""
-    )
-
-    query = state.get("jd", "")
-    rewrite_chain = rewrite_prompt | llm | StrOutputParser()
-
-    response = rewrite_chain.invoke({"query": query})
-    return {"company_query": response}
-
-
-def web_search(state: AgentState) -> AgentState:
-    """
-    주어진 state를 기반으로 웹 검색을 수행합니다.
-
-    Args:
-        state (AgentState): 사용자의 질문을 포함한 에이전트의 현재 state.
-
-    Returns:
-        AgentState: 웹 검색 결과가 추가된 state를 반환합니다.
-    """
-    try:
-        query = state.get("company_query", "")
-        print("web_search query > ", query)
-        results = tavily_search_tool.invoke({"query": query})
-        contents = [item.get("content", "") for item in results]
-        print("***********************************************************************")
-        print(contents)
-        return {"company": contents}
-    except Exception as e:
-        print(str(e))
-        return {
-            "error": f"web_search 노드에서 오류 발생: {str(e)}",
-            "status": "error",
-            "messages": state.get("messages", [])
-            + [{"role": "system", "content": f"오류: {str(e)}"}],
-        }
-
-
-def classify_input(state: AgentState) -> AgentState:
-    """
-    사용자 입력과, 이전 대화내용을 바탕으로 현재 입력이 어떤 형식인지 분류하고,
-    결과를 router node로 전달합니다.
-
-    Args:
-      state (AgentState): 현재 메시지 상태를 나타내는 객체입니다.
+)
 
-    Returns:
-      Command: router node로 이동하기 위한 명령을 반환합니다.
+classify_prompt = PromptTemplate.from_template(
     """
-
-    query = state.get("query", "")
-    chat_history = state.get("chat_history", "")
-    print("classify_input > query >", query)
-    # sse_queue.append("입력을 분류중입니다.")
-
-    classify_prompt = PromptTemplate.from_template(
-        """
 주어진 입력과 대화 내역을 바탕으로 입력이 어떤 유형인지 판단하세요: 
 - 면접질문 요청 (question)
 - 꼬리질문 요청 (followup)
@@ -252,65 +131,9 @@ def classify_input(state: AgentState) -> AgentState:
 {chat_history}
 
 형식: question, followup, modelAnswer, response, evaluate, other 중 하나로만 답하세요."""
-    )
-
-    router_chain = classify_prompt | llm | StrOutputParser()
-    result = router_chain.invoke({"query": query, "chat_history": chat_history})
-
-    print("classify_input > result >", result)
-
-    # 결과 메시지를 업데이트하고 router node로 이동합니다.
-    return {"input_type": result}
-
-
-persona_service = PersonaService.get_instance()
-chat_history = ChatHistory.get_instance()
-
-
-def assign_persona_node(state: AgentState) -> AgentState:
-    """페르소나 할당 node입니다. 주어진 state를 기반으로 assign_persona 에이전트를 호출하고,
-    결과를 router node로 전달합니다.
-
-    Args:
-        state (AgentState): 현재 메시지 상태 객체.
-
-    Returns:
-        Command: router node로 이동 명령을 반환."""
-
-    resume = state.get("resume", "")
-    jd = state.get("jd", "")
-    company = state.get("company", "")
-    query = state.get("query", "")
-    last_question = state.get("last_question", "")
-    persona_id = persona_service.invoke_agent(resume, jd, company, query, last_question)
-    print("assign_persona_node > persona_id >", persona_id)
-    # sse_queue.append("페르소나를 할당중입니다.")
-
-    if persona_id:
-        persona_info = persona_service.get_persona_str_by_id(persona_id)
-
-    persona_list = persona_service.get_all_persona_info()
-
-    return {
-        "persona_id": persona_id,
-        "persona_list": persona_list,
-        "selected_persona": persona_info,
-    }
-
-
-def router(state: AgentState) -> AgentState:
-    """
-    주어진 state에서 input_type를 기반으로 적절한 경로를 결정합니다.
-
-    Args:
-        state (AgentState): 현재 에이전트의 state를 나타내는 객체입니다.
-
-    Returns:
-        Literal["question", "response", "evaluate", "modelAnswer", "followup", "other"]: 쿼리에 따라 선택된 경로를 반환합니다.
-    """
+)
 
-    query = state["input_type"]
-    router_system_prompt = """
+router_system_prompt = """
 You are an expert at routing a user's input type to one of the following:
 - 'question'
 - 'modelAnswer'
@@ -329,40 +152,12 @@ Instructions:
 
 Only return one of: 'question', 'response', 'evaluate', 'followup', 'modelAnswer', 'other'."""
 
-    router_prompt = ChatPromptTemplate.from_messages(
-        [("system", router_system_prompt), ("user", "{query}")]
-    )
-
-    structured_router_llm = llm.with_structured_output(Route)
-
-    router_chain = router_prompt | structured_router_llm
-    route = router_chain.invoke({"query": query})
-    print("router", route)
-
-    return {"route_type": route.target}
-
-
-def generation(state: AgentState) -> AgentState:
-    """
-    사용자 입력과, 이전 대화내용을 바탕으로 면접 질문을 생성하고,
-    결과를 전달합니다.
-
-    Args:
-        state (MessageState): 현재 메시지 상태를 나타내는 객체입니다.
-
-    Returns:
-        Command: 생성한 면접 질문을 반환합니다.
-    """
-    # sse_queue.append("면접 질문을 생성중입니다.")
-    try:
-        # 상태에서 필요한 정보 추출
-        resume = state.get("resume", "")
-        jd = state.get("jd", "")
-        company = state.get("company", "")
-        selected_persona = state.get("selected_persona", "")
+router_prompt = ChatPromptTemplate.from_messages(
+    [("system", router_system_prompt), ("user", "{query}")]
+)
 
-        generation_prompt = PromptTemplate.from_template(
-            """다음은 지원자의 자소서, JD(직무기술서), 회사 정보, 그리고 면접관 페르소나입니다:
+generation_prompt = PromptTemplate.from_template(
+    """다음은 지원자의 자소서, JD(직무기술서), 회사 정보, 그리고 면접관 페르소나입니다:
 
 자기소개서:
 {resume}
@@ -399,54 +194,10 @@ JD:
 출력 예시:
 복잡한 비즈니스 문제를 기술로 해결한 경험에 대해 말씀해 주시고, 그 과정에서 어떤 기술적 선택을 하셨는지, 결과에 어떤 영향을 미쳤는지 구체적으로 설명해 주시겠습니까?
 """
-        )
-
-        chain = generation_prompt | llm | StrOutputParser()
-        result = chain.invoke(
-            {
-                "resume": resume,
-                "jd": jd,
-                "company": company,
-                "selected_persona": selected_persona,
-            }
-        )
-        print("result", result)
-
-        # 결과를 상태에 업데이트
-        return {"answer": result}
-
-    except Exception as e:
-        return {
-            "error": f"Generation 노드에서 오류 발생: {str(e)}",
-            "status": "error",
-            "messages": state.get("messages", [])
-            + [{"role": "system", "content": f"오류: {str(e)}"}],
-        }
-
-
-def followup(state: AgentState) -> AgentState:
-    """
-    사용자 입력과, 이전 대화내용을 바탕으로 현재 입력에 대한 꼬리질문을 생성하고,
-    결과를 전달합니다.
-
-    Args:
-      state (MessageState): 현재 메시지 상태를 나타내는 객체입니다.
-
-    Returns:
-      Command: 생성한 꼬리 면접 질문을 반환합니다.
-    """
-    # sse_queue.append("꼬리 면접 질문을 생성중입니다.")
-    try:
-        # 상태에서 필요한 정보 추출
-        resume = state.get("resume", "")
-        jd = state.get("jd", "")
-        company = state.get("company", "")
-        persona = state.get("persona", "")
-        chat_history = state.get("chat_history", "")
-        query = state.get("query", "")
+)
 
-        followup_prompt = PromptTemplate.from_template(
-            """아래는 AI 면접 시스템에서 지금까지 진행된 대화입니다:
+followup_prompt = PromptTemplate.from_template(
+    """아래는 AI 면접 시스템에서 지금까지 진행된 대화입니다:
 
 대화 이력:
 {chat_history}
@@ -488,71 +239,19 @@ JD:
 출력 형식:
 [생성된 꼬리 면접 질문]
 """
-        )
-
-        chain = followup_prompt | llm | StrOutputParser()
-        result = chain.invoke(
-            {
-                "resume": resume,
-                "jd": jd,
-                "company": company,
-                "persona": persona,
-                "chat_history": chat_history,
-                "query": query,
-            }
-        )
-        print("result", result)
-
-        # 결과를 상태에 업데이트
-        return {"answer": result}
-
-    except Exception as e:
-        return {
-            "error": f"Followup 노드에서 오류 발생: {str(e)}",
-            "status": "error",
-            "messages": state.get("messages", [])
-            + [{"role": "system", "content": f"오류: {str(e)}"}],
-        }
-
-
-def evaluate(state: AgentState) -> AgentState:
-    """
-    지원자의 답변과 대화 이력, 페르소나 정보를 바탕으로
-    각 페르소나별 평가를 생성하고, 최종 평가 결과를 반환합니다.
-    """
-    # sse_queue.append("평가를 진행중입니다.")
-    try:
-        resume = state.get("resume", "")
-        jd = state.get("jd", "")
-        company = state.get("company", "")
-        chat_history = state.get("chat_history", "")
-        persona_list = state.get("persona_list", "")
-        last_question = state.get("last_question", "")
-        answer = state.get("query", "")
-
-        # 필수 정보 체크
-        if not all(
-            [resume, jd, company, chat_history, persona_list, last_question, answer]
-        ):
-            return {
-                "error": "평가에 필요한 정보가 부족합니다.",
-                "status": "error",
-                "messages": state.get("messages", [])
-                + [{"role": "system", "content": "평가에 필요한 정보가 부족합니다."}],
-            }
+)
 
-        # 평가 프롬프트
-        assessment_prompt = PromptTemplate(
-            input_variables=[
-                "resume",
-                "jd",
-                "company",
-                "question",
-                "answer",
-                "persona",
-                "chat_history",
-            ],
-            template="""
+evaluate_prompt = PromptTemplate(
+    input_variables=[
+        "resume",
+        "jd",
+        "company",
+        "question",
+        "answer",
+        "persona",
+        "chat_history",
+    ],
+    template="""
 역할: 주어진 페르소나 리스트의 면접관들이 지원자의 답변을 평가하고, 그 결과를 합산합니다.
 
 직무 설명:
@@ -594,60 +293,11 @@ def evaluate(state: AgentState) -> AgentState:
     - 개선점을 말해주세요.
     - 답변은 실제 면접관이 답변을 이어가는 형식으로 생성해야 한다.
 """,
-        )
-
-        # 평가 실행
-        parser = JsonOutputParser()
-        chain = assessment_prompt | llm | StrOutputParser()
-        result = chain.invoke(
-            {
-                "resume": resume,
-                "jd": jd,
-                "company": company,
-                "question": last_question,
-                "answer": answer,
-                "persona": persona_list,
-                "chat_history": chat_history,
-            }
-        )
-        return {"answer": result}
-
-    except Exception as e:
-        return {
-            "error": f"Evaluate 노드에서 오류 발생: {str(e)}",
-            "status": "error",
-            "messages": state.get("messages", [])
-            + [{"role": "system", "content": f"오류: {str(e)}"}],
-        }
-
-def response(state: AgentState) -> AgentState:
-    """
-    지원자의 답변과 대화 이력, 페르소나 정보를 바탕으로
-    각 페르소나별 평가를 생성하고, 최종 평가 결과를 반환합니다.
-    """
-    try:
-        resume = state.get("resume", "")
-        jd = state.get("jd", "")
-        company = state.get("company", "")
-        chat_history = state.get("chat_history", "")
-        persona_list = state.get("persona_list", "")
-        last_question = state.get("last_question", "")
-        answer = state.get("query", "")
-
-        # 필수 정보 체크
-        if not all([resume, jd, company, chat_history, persona_list, last_question, answer]):
-            return {
-                "error": "평가에 필요한 정보가 부족합니다.",
-                "status": "error",
-                "messages": state.get("messages", []) + [
-                    {"role": "system", "content": "평가에 필요한 정보가 부족합니다."}
-                ],
-            }
+)
 
-        # 평가 프롬프트
-        assessment_prompt = PromptTemplate(
-            input_variables=["resume", "jd", "company", "question", "answer", "persona", "chat_history"],
-            template="""
+response_prompt = PromptTemplate(
+    input_variables=["resume", "jd", "company", "question", "answer", "persona", "chat_history"],
+    template="""
 역할: 주어진 페르소나 리스트의 면접관들이 지원자의 답변을 평가하고, 그 결과를 합산합니다.
 
 직무 설명:
@@ -690,50 +340,10 @@ def response(state: AgentState) -> AgentState:
     - 모든 페르소나 평가 결과를 점수를 제외하고 구어체 형식으로로 말해주세요.
     - 답변은 실제 면접관이 답변을 이어가는 형식으로 생성해야 한다.
 """
-        )
-
-        # 평가 실행
-        parser = JsonOutputParser()
-        chain = assessment_prompt | llm | StrOutputParser()
-        result = chain.invoke({
-            "resume": resume,
-            "jd": jd,
-            "company": company,
-            "question": last_question,
-            "answer": answer,
-            "persona": persona_list,
-            "chat_history": chat_history,
-        })
-        return {"answer": result}
-
-    except Exception as e:
-        return {
-            "error": f"Evaluate 노드에서 오류 발생: {str(e)}",
-            "status": "error",
-            "messages": state.get("messages", []) + [
-                {"role": "system", "content": f"오류: {str(e)}"}
-            ],
-        }
+)
 
-def modelAnswer(state: AgentState) -> AgentState:
+model_answer_prompt = PromptTemplate.from_template(
     """
-    STAR 기법 등 구조화된 최적의 모범 답변을 생성하는 LangGraph용 노드 함수.
-    이력서, JD, 회사정보, 이전 Q&A, 질문, 페르소나 등 context를 모두 반영.
-    """
-    # sse_queue.append("모범답변을 생성중입니다.")
-    try:
-        # 1. 상태에서 정보 추출
-        resume = state.get("resume", "")
-        jd = state.get("jd", "")
-        company_infos = state.get("company", "")
-        prev_question_answer_pairs = state.get("chat_history", "")
-        question = state.get("last_question", "")
-        persona = state.get("persona_id", "")
-        chat_history = state.get("chat_history", "")
-
-        # 2. 프롬프트 템플릿 정의
-        prompt = PromptTemplate.from_template(
-            """
 아래는 AI 면접 시스템에서 지금까지 진행된 대화입니다:
 
 상황:
@@ -798,36 +408,443 @@ def modelAnswer(state: AgentState) -> AgentState:
 [answer] 
 [생성된 모범답변]
 """
+)
+
+
+def _search_contents(results) -> list:
+    contents = [item.get("content", "") for item in results]
+    print("***********************************************************************")
+    print(contents)
+    return contents
+
+
+def _node_error(state: AgentState, message: str) -> dict:
+    return {
+        "error": message,
+        "status": "error",
+        "messages": state.get("messages", [])
+        + [{"role": "system", "content": message}],
+    }
+
+
+async def retrieve(state: AgentState) -> AgentState:
+    """
+    사용자의 질문에 기반하여 벡터 스토어에서 관련 문서를 검색합니다.
+
+    Args:
+        state (AgentState): 사용자의 질문을 포함한 에이전트의 현재 state.
+
+    Returns:
+        AgentState: 검색된 문서가 추가된 state를 반환합니다.
+    """
+    jd = state.get("jd", "")
+    company = state.get("company", "")
+    print("^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^")
+    print(company)
+
+    if not company or company is None:
+        # 같은 JD에 대해서는 첫 턴에 확정한 회사 정보를 재사용
+        cache_key = company_context_cache.make_key(jd, get_corpus_version())
+        cached = company_context_cache.get(cache_key)
+        if cached is not None:
+            return {"company": cached}
+        # 같은 JD로 동시에 들어온 요청은 먼저 조회한 결과를 기다렸다가 재사용
+        async with company_context_cache.resolving(cache_key):
+            cached = company_context_cache.get(cache_key)
+            if cached is not None:
+                return {"company": cached}
+            company = await _resolve_company_info(state, jd)
+            company_context_cache.set(cache_key, company)
+        return {"company": company}
+    else:
+        return {"company": company}
+
+
+async def _resolve_company_info(state: AgentState, jd: str):
+    docs = await get_company_info(jd)
+    if docs is not None:
+        doc_relevance_chain = get_prompt(DOC_RELEVANCE_PROMPT) | get_llm(LLM_MODEL)
+        response = await doc_relevance_chain.ainvoke(
+            {"question": jd, "documents": docs}
+        )
+        print("doc_relevance_chain >", response["Score"])
+
+        if response["Score"] == 1:
+            return docs
+
+    publish_progress(state, "온라인에서 정보를 수집중입니다.")
+    rewrite_chain = rewrite_prompt | get_llm(LLM_MODEL) | StrOutputParser()
+
+    company_query = await rewrite_chain.ainvoke({"query": jd})
+    print("web_search query > ", company_query)
+    results = await get_search_provider().asearch(company_query)
+    return _search_contents(results)
+
+
+async def check_doc_relevance(state: AgentState) -> Literal["relevant", "irrelvant"]:
+    """
+    주어진 state를 기반으로 문서의 관련성을 판단합니다.
+
+    Args:
+        state (AgentState): 사용자의 질문과 문맥을 포함한 에이전트의 현재 state.
+
+    Returns:
+        Literal['relevant', 'irrelevant']: 문서가 관련성이 높으면 'relevant', 그렇지 않으면 'irrelevant'를 반환합니다.
+    """
+    query = state.get("jd", "")
+    context = state.get("company", "")
+
+    doc_relevance_chain = get_prompt(DOC_RELEVANCE_PROMPT) | get_llm(LLM_MODEL)
+    response = await doc_relevance_chain.ainvoke(
+        {"question": query, "documents": context}
+    )
+    print("doc_relevance_chain >", response["Score"])
+
+    if response["Score"] == 1:
+        return "relevant"
+
+    return "irrelvant"
+
+
+async def rewrite(state: AgentState) -> AgentState:
+    """
+    사용자의 질문을 사전을 참고하여 변경합니다.
+
+    Args:
+        state (AgentState): 사용자의 질문을 포함한 에이전트의 현재 state.
+
+    Returns:
+        AgentState: 변경된 질문을 포함하는 state를 반환합니다.
+    """
+    query = state.get("jd", "")
+    rewrite_chain = rewrite_prompt | get_llm(LLM_MODEL) | StrOutputParser()
+
+    response = await rewrite_chain.ainvoke({"query": query})
+    return {"company_query": response}
+
+
+async def web_search(state: AgentState) -> AgentState:
+    """
+    주어진 state를 기반으로 웹 검색을 수행합니다.
+
+    Args:
+        state (AgentState): 사용자의 질문을 포함한 에이전트의 현재 state.
+
+    Returns:
+        AgentState: 웹 검색 결과가 추가된 state를 반환합니다.
+    """
+    try:
+        query = state.get("company_query", "")
+        print("web_search query > ", query)
+        results = await get_search_provider().asearch(query)
+        return {"company": _search_contents(results)}
+    except Exception as e:
+        print(str(e))
+        return _node_error(state, f"web_search 노드에서 오류 발생: {str(e)}")
+
+
+# 버튼으로만 보내는 클라이언트 요청 유형(RequestInput.type) -> 라우팅 라벨 (분류를 건너뜀)
+CLIENT_ROUTES = {
+    "question": "question",
+    "followup": "followup",
+    "modelAnswer": "modelAnswer",
+}
+# 자유 입력에 붙는 요청 유형은 분류를 거치고, 분류 결과가 라벨로 정해지지 않을 때만 기본값으로 사용
+CLIENT_HINTS = {
+    "answer": "response",
+}
+ROUTE_LABELS = {label.lower(): label for label in get_args(Route.model_fields["target"].annotation)}
+
+
+def _client_route(state: AgentState) -> Optional[str]:
+    """버튼 요청 유형을 라우팅 라벨로 바꿉니다. 자유 입력("answer", "other")이나 없으면 None."""
+    return CLIENT_ROUTES.get(state.get("request_type") or "")
+
+
+def match_route_label(text: Optional[str]) -> Optional[str]:
+    """
+    분류 결과 문자열이 알려진 라벨 하나로 정확히 대응되면 그 라벨을 반환합니다.
+    따옴표, 마침표, 대소문자 차이("Response.", "`followup`")는 무시합니다.
+    """
+    if not text:
+        return None
+    normalized = text.strip().strip("`'\".:,!* \n").lower()
+    return ROUTE_LABELS.get(normalized)
+
+
+def _record_intent(query: str, result: str):
+    """LLM 분류 결과가 알려진 라벨이면 로컬 분류기의 학습 데이터로 남깁니다."""
+    label = match_route_label(result)
+    if label:
+        IntentClassifier.get_instance().record(query, label)
+
+
+async def classify_input(state: AgentState) -> AgentState:
+    """
+    사용자 입력과, 이전 대화내용을 바탕으로 현재 입력이 어떤 형식인지 분류하고,
+    결과를 router node로 전달합니다.
+
+    Args:
+      state (AgentState): 현재 메시지 상태를 나타내는 객체입니다.
+
+    Returns:
+      Command: router node로 이동하기 위한 명령을 반환합니다.
+    """
+
+    client_route = _client_route(state)
+    if client_route:
+        # 클라이언트가 유형을 알려준 경우 LLM 분류를 건너뜁니다.
+        return {"input_type": client_route}
+
+    query = state.get("query", "")
+    chat_history = _history_for(state, "classify_input")
+    print("classify_input > query >", query)
+
+    # 로컬 분류기가 확신하는 경우 LLM 분류를 건너뜁니다.
+    local_label = IntentClassifier.get_instance().classify(query)
+    if local_label:
+        print("classify_input > local >", local_label)
+        return {"input_type": local_label}
+
+    publish_progress(state, "입력을 분류중입니다.")
+
+    router_chain = classify_prompt | get_llm(LLM_MODEL) | StrOutputParser()
+    result = await router_chain.ainvoke({"query": query, "chat_history": chat_history})
+
+    print("classify_input > result >", result)
+    _record_intent(query, result)
+
+    # 결과 메시지를 업데이트하고 router node로 이동합니다.
+    return {"input_type": result}
+
+
+persona_service = PersonaService.get_instance()
+
+
+async def assign_persona_node(state: AgentState) -> AgentState:
+    """페르소나 할당 node입니다. 주어진 state를 기반으로 assign_persona 에이전트를 호출하고,
+    결과를 router node로 전달합니다.
+
+    Args:
+        state (AgentState): 현재 메시지 상태 객체.
+
+    Returns:
+        Command: router node로 이동 명령을 반환."""
+
+    publish_progress(state, "페르소나를 할당중입니다.")
+    persona_id = await persona_service.ainvoke_agent(
+        state.get("resume", ""),
+        state.get("jd", ""),
+        state.get("company", ""),
+        state.get("query", ""),
+        state.get("last_question", ""),
+        chat_history=state.get("session"),
+    )
+    print("assign_persona_node > persona_id >", persona_id)
+
+    persona_info = None
+    if persona_id:
+        persona_info = persona_service.get_persona_str_by_id(persona_id)
+
+    persona_list = persona_service.get_all_persona_info()
+
+    return {
+        "persona_id": persona_id,
+        "persona_list": persona_list,
+        "selected_persona": persona_info,
+    }
+
+
+async def router(state: AgentState) -> AgentState:
+    """
+    주어진 state에서 input_type를 기반으로 적절한 경로를 결정합니다.
+
+    Args:
+        state (AgentState): 현재 에이전트의 state를 나타내는 객체입니다.
+
+    Returns:
+        Literal["question", "response", "evaluate", "modelAnswer", "followup", "other"]: 쿼리에 따라 선택된 경로를 반환합니다.
+    """
+
+    query = state["input_type"]
+    # 버튼 요청 유형이나 분류 결과가 이미 라벨이면 LLM 호출 없이 결정하고,
+    # 그렇지 않으면 클라이언트 유형의 기본값("answer" -> response)을 사용합니다.
+    label = (
+        _client_route(state)
+        or match_route_label(query)
+        or CLIENT_HINTS.get(state.get("request_type") or "")
+    )
+    if label:
+        print("router (fast path)", label)
+        return {"route_type": label}
+
+    structured_router_llm = get_llm(LLM_MODEL).with_structured_output(Route)
+
+    router_chain = router_prompt | structured_router_llm
+    route = await router_chain.ainvoke({"query": query})
+    print("router", route)
+
+    return {"route_type": route.target}
+
+
+async def generation(state: AgentState) -> AgentState:
+    """
+    사용자 입력과, 이전 대화내용을 바탕으로 면접 질문을 생성하고,
+    결과를 전달합니다.
+
+    Args:
+        state (MessageState): 현재 메시지 상태를 나타내는 객체입니다.
+
+    Returns:
+        Command: 생성한 면접 질문을 반환합니다.
+    """
+    publish_progress(state, "면접 질문을 생성중입니다.")
+    try:
+        chain = generation_prompt | get_llm(LLM_MODEL) | StrOutputParser()
+        result = await chain.ainvoke(
+            {
+                "resume": state.get("resume", ""),
+                "jd": state.get("jd", ""),
+                "company": state.get("company", ""),
+                "selected_persona": state.get("selected_persona", ""),
+            }
         )
+        print("result", result)
+
+        # 결과를 상태에 업데이트
+        return {"answer": result}
+
+    except Exception as e:
+        return _node_error(state, f"Generation 노드에서 오류 발생: {str(e)}")
+
+
+async def followup(state: AgentState) -> AgentState:
+    """
+    사용자 입력과, 이전 대화내용을 바탕으로 현재 입력에 대한 꼬리질문을 생성하고,
+    결과를 전달합니다.
 
-        # 3. LLM 체인 실행
-        chain = prompt | llm | StrOutputParser()
-        result = chain.invoke(
+    Args:
+      state (MessageState): 현재 메시지 상태를 나타내는 객체입니다.
+
+    Returns:
+      Command: 생성한 꼬리 면접 질문을 반환합니다.
+    """
+    publish_progress(state, "꼬리 면접 질문을 생성중입니다.")
+    try:
+        chain = followup_prompt | get_llm(LLM_MODEL) | StrOutputParser()
+        result = await chain.ainvoke(
             {
-                "resume": resume,
-                "jd": jd,
-                "company_infos": company_infos,
-                "prev_question_answer_pairs": prev_question_answer_pairs,
-                "question": question,
-                "persona": persona,
+                "resume": state.get("resume", ""),
+                "jd": state.get("jd", ""),
+                "company": state.get("company", ""),
+                "persona": state.get("persona", ""),
+                "chat_history": _history_for(state, "followup"),
+                "query": state.get("query", ""),
+            }
+        )
+        print("result", result)
+
+        # 결과를 상태에 업데이트
+        return {"answer": result}
+
+    except Exception as e:
+        return _node_error(state, f"Followup 노드에서 오류 발생: {str(e)}")
+
+
+def _assessment_inputs(state: AgentState, node: str) -> Optional[dict]:
+    """evaluate/response 노드의 입력을 만들고, 필수 정보가 없으면 None을 반환합니다."""
+    inputs = {
+        "resume": state.get("resume", ""),
+        "jd": state.get("jd", ""),
+        "company": state.get("company", ""),
+        "question": state.get("last_question", ""),
+        "answer": state.get("query", ""),
+        "persona": state.get("persona_list", ""),
+        "chat_history": _history_for(state, node),
+    }
+    # 필수 정보 체크
+    if not all(inputs.values()):
+        return None
+    return inputs
+
+
+async def _score_turn(inputs: dict) -> Optional[dict]:
+    """답변 점수를 매깁니다. 점수 계산 실패가 노드의 답변 생성을 막지 않도록 None을 반환합니다."""
+    question = inputs["question"]
+    try:
+        return await ascore_answer(
+            resume=inputs["resume"],
+            jd=inputs["jd"],
+            company=inputs["company"],
+            question=getattr(question, "content", question),
+            answer=inputs["answer"],
+        )
+    except Exception as e:
+        logger.error(f"답변 점수 계산 중 오류 발생: {e}")
+        return None
+
+
+async def _assess(state: AgentState, node: str, prompt: PromptTemplate) -> AgentState:
+    """서술형 평가(prompt)와 구조화된 점수 계산을 동시에 실행합니다. evaluate/response 노드가 공유합니다."""
+    try:
+        inputs = _assessment_inputs(state, node)
+        if inputs is None:
+            return _node_error(state, "평가에 필요한 정보가 부족합니다.")
+
+        chain = prompt | get_llm(LLM_MODEL) | StrOutputParser()
+        result, scores = await asyncio.gather(chain.ainvoke(inputs), _score_turn(inputs))
+        return {"answer": result, "scores": scores}
+
+    except Exception as e:
+        return _node_error(state, f"Evaluate 노드에서 오류 발생: {str(e)}")
+
+
+async def evaluate(state: AgentState) -> AgentState:
+    """
+    지원자의 답변과 대화 이력, 페르소나 정보를 바탕으로
+    각 페르소나별 평가를 생성하고, 최종 평가 결과를 반환합니다.
+    """
+    publish_progress(state, "평가를 진행중입니다.")
+    return await _assess(state, "evaluate", evaluate_prompt)
+
+
+async def response(state: AgentState) -> AgentState:
+    """
+    지원자의 답변과 대화 이력, 페르소나 정보를 바탕으로
+    각 페르소나별 평가를 생성하고, 최종 평가 결과를 반환합니다.
+    """
+    return await _assess(state, "response", response_prompt)
+
+
+async def modelAnswer(state: AgentState) -> AgentState:
+    """
+    STAR 기법 등 구조화된 최적의 모범 답변을 생성하는 LangGraph용 노드 함수.
+    이력서, JD, 회사정보, 이전 Q&A, 질문, 페르소나 등 context를 모두 반영.
+    """
+    publish_progress(state, "모범답변을 생성중입니다.")
+    try:
+        chat_history = _history_for(state, "modelAnswer")
+        chain = model_answer_prompt | get_llm(LLM_MODEL) | StrOutputParser()
+        result = await chain.ainvoke(
+            {
+                "resume": state.get("resume", ""),
+                "jd": state.get("jd", ""),
+                "company_infos": state.get("company", ""),
+                "prev_question_answer_pairs": chat_history,
+                "question": state.get("last_question", ""),
+                "persona": state.get("persona_id", ""),
                 "chat_history": chat_history,
             }
         )
 
-        # 4. 결과를 state에 업데이트
+        # 결과를 state에 업데이트
         return {**state, "answer": result}
 
     except Exception as e:
-        return {
-            **state,
-            "error": f"modelAnswer_node에서 오류 발생: {str(e)}",
-            "status": "error",
-            "messages": state.get("messages", [])
-            + [{"role": "system", "content": f"오류: {str(e)}"}],
-        }
+        return {**state, **_node_error(state, f"modelAnswer_node에서 오류 발생: {str(e)}")}
 
 
-def call_llm(state: AgentState) -> AgentState:
+async def call_llm(state: AgentState) -> AgentState:
     """
     주어진 state에서 쿼리를 LLM에 전달하여 응답을 얻습니다.
 
@@ -838,11 +855,15 @@ def call_llm(state: AgentState) -> AgentState:
         AgentState: 'answer' 키를 포함하는 새로운 state를 반환합니다.
     """
     query = state["query"]
-    llm_chain = llm | StrOutputParser()
-    llm_answer = llm_chain.invoke(query)
+    llm_chain = get_llm(LLM_MODEL) | StrOutputParser()
+    llm_answer = await llm_chain.ainvoke(query)
     return {"answer": llm_answer}
 
 
+# evaluate 노드로 가는 라우팅 라벨 (지원자 답변으로 평가되는 입력)
+ASSESSMENT_ROUTES = {"response", "evaluate"}
+
+
 def conditional_router(state: AgentState) -> str:
     """
     그래프의 조건부 엣지에서 사용할 라우팅 함수
@@ -870,6 +891,119 @@ def conditional_router(state: AgentState) -> str:
     return route_mapping.get(next_route, "llm")
 
 
+# 토큰 스트리밍 대상 노드 (최종 답변을 생성하는 노드)
+STREAMING_NODES = {"generation", "followup", "response", "evaluate", "modelAnswer", "llm"}
+
+
+def _node(name: str, afunc) -> RunnableLambda:
+    """
+    비동기 노드 함수를 그래프 노드로 만듭니다.
+    노드의 시작과 종료(소요 시간 포함)를 현재 세션의 이벤트 버스에 "node" 이벤트로 보냅니다.
+    """
+
+    def publish_timing(state: AgentState, status: str, started: Optional[float] = None):
+        session = state.get("session")
+        data = {"node": name, "status": status}
+        if started is not None:
+            data["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        event_bus.publish(session.session_id if session else None, data, event="node")
+
+    async def arun(state: AgentState) -> AgentState:
+        publish_timing(state, "start")
+        started = time.perf_counter()
+        try:
+            return await afunc(state)
+        finally:
+            publish_timing(state, "end", started)
+
+    return RunnableLambda(arun, name=name)
+
+
+def build_graph():
+    """면접 에이전트 그래프를 구성하고 컴파일합니다."""
+    graph_builder = StateGraph(AgentState)
+
+    # 노드 추가
+    graph_builder.add_node("retrieve", _node("retrieve", retrieve))
+    graph_builder.add_node("classify_input", _node("classify_input", classify_input))
+    graph_builder.add_node("assign_persona", _node("assign_persona", assign_persona_node))
+
+    graph_builder.add_node("router", _node("router", router))
+    graph_builder.add_node("generation", _node("generation", generation))
+    graph_builder.add_node("followup", _node("followup", followup))
+    graph_builder.add_node("response", _node("response", response))
+    graph_builder.add_node("evaluate", _node("evaluate", evaluate))
+    graph_builder.add_node("llm", _node("llm", call_llm))
+    graph_builder.add_node("modelAnswer", _node("modelAnswer", modelAnswer))
+
+    # 시작점에서 병렬 실행
+    graph_builder.add_edge(START, "retrieve")
+    graph_builder.add_edge(START, "classify_input")
+    graph_builder.add_edge(START, "assign_persona")
+
+    # 두 병렬 노드가 완료되면 라우터로
+    graph_builder.add_edge("retrieve", "router")
+    graph_builder.add_edge("classify_input", "router")
+    graph_builder.add_edge("assign_persona", "router")
+
+    # 생성 노드에서 종료
+    graph_builder.add_edge("generation", END)
+    graph_builder.add_edge("followup", END)
+    graph_builder.add_edge("response", END)
+    graph_builder.add_edge("evaluate", END)
+    graph_builder.add_edge("llm", END)
+    graph_builder.add_edge("modelAnswer", END)
+
+    graph_builder.add_conditional_edges(
+        "router",
+        conditional_router,
+        {
+            "generation": "generation",
+            "followup": "followup",
+            "llm": "llm",
+            "response": "response",
+            "evaluate": "evaluate",
+            "modelAnswer": "modelAnswer",
+        },
+    )
+
+    return graph_builder.compile()
+
+
+_compiled_graph = None
+_compiled_graph_lock = threading.Lock()
+
+
+def get_compiled_graph():
+    """
+    컴파일된 그래프를 프로세스에서 한 번만 만들어 재사용합니다.
+    이력서/JD/회사 정보는 그래프가 아니라 state로 전달되므로 모든 GraphAgent가 같은 그래프를 공유할 수 있습니다.
+    """
+    global _compiled_graph
+    if _compiled_graph is None:
+        with _compiled_graph_lock:
+            if _compiled_graph is None:
+                _compiled_graph = build_graph()
+    return _compiled_graph
+
+
+def draw_graph_mermaid() -> str:
+    """그래프 구조를 Mermaid 문법 문자열로 반환합니다. (네트워크 불필요)"""
+    return get_compiled_graph().get_graph().draw_mermaid()
+
+
+def draw_graph_png(output_path: Optional[str] = None) -> bytes:
+    """
+    그래프를 PNG로 렌더링합니다. Mermaid 렌더링 서비스(mermaid.ink)를 호출하므로 디버깅 용도로만 사용합니다.
+    output_path가 있으면 파일로도 저장합니다.
+    """
+    png = get_compiled_graph().get_graph().draw_mermaid_png()
+    if output_path:
+        with open(output_path, "wb") as f:
+            f.write(png)
+    return png
+
+
 class GraphAgent:
     def __init__(
         self,
@@ -880,67 +1014,84 @@ class GraphAgent:
         self.resume = resume
         self.jd = jd
         self.company = company
-        graph_builder = StateGraph(AgentState)
-
-        # 노드 추가
-        graph_builder.add_node("retrieve", retrieve)
-        graph_builder.add_node("classify_input", classify_input)
-        graph_builder.add_node("assign_persona", assign_persona_node)
-
-        graph_builder.add_node("router", router)
-        graph_builder.add_node("generation", generation)
-        graph_builder.add_node("followup", followup)
-        graph_builder.add_node("response", response)
-        graph_builder.add_node("evaluate", evaluate)
-        graph_builder.add_node("llm", call_llm)
-        graph_builder.add_node("modelAnswer", modelAnswer)
-
-        # 시작점에서 병렬 실행
-        graph_builder.add_edge(START, "retrieve")
-        graph_builder.add_edge(START, "classify_input")
-        graph_builder.add_edge(START, "assign_persona")
-
-        # 두 병렬 노드가 완료되면 라우터로
-        graph_builder.add_edge("retrieve", "router")
-        graph_builder.add_edge("classify_input", "router")
-        graph_builder.add_edge("assign_persona", "router")
-
-        # 생성 노드에서 종료
-        graph_builder.add_edge("generation", END)
-        graph_builder.add_edge("followup", END)
-        graph_builder.add_edge("response", END)
-        graph_builder.add_edge("evaluate", END)
-        graph_builder.add_edge("llm", END)
-        graph_builder.add_edge("modelAnswer", END)
-
-        graph_builder.add_conditional_edges(
-            "router",
-            conditional_router,
-            {
-                "generation": "generation",
-                "followup": "followup",
-                "llm": "llm",
-                "response": "response",
-                "evaluate": "evaluate",
-                "modelAnswer": "modelAnswer",
-            },
-        )
-
-        self.graph = graph_builder.compile()
-        display(Image(self.graph.get_graph().draw_mermaid_png()))
+        self.graph = get_compiled_graph()
 
-        with open("graph.png", "wb") as f:
-            f.write(self.graph.get_graph().draw_mermaid_png())
-
-    def run(self, query: str) -> str:
-        initial_state = {
+    def _initial_state(
+        self, query: str, chat_history: ChatHistory, request_type: Optional[str] = None
+    ) -> dict:
+        return {
             "query": query,
+            "request_type": request_type or "",
             "resume": self.resume,
             "jd": self.jd,
             "company": self.company,
-            "chat_history": chat_history.get_all_history_as_string(),
+            # 전체 내역 대신 요약 메모리 (노드는 _history_for로 노드별 예산에 맞춰 다시 만든다)
+            "chat_history": chat_history.memory.render(),
+            "session": chat_history,
             "last_question": chat_history.get_question_by_id(
                 chat_history.get_latest_question_id()
             ),
         }
-        return self.graph.invoke(initial_state)
+
+    def run(
+        self, query: str, chat_history: ChatHistory, request_type: Optional[str] = None
+    ) -> dict:
+        """이벤트 루프가 없는 곳(스크립트, 워커 스레드)에서 arun을 실행합니다."""
+        return asyncio.run(self._run_with_summary(query, chat_history, request_type))
+
+    async def _run_with_summary(
+        self, query: str, chat_history: ChatHistory, request_type: Optional[str] = None
+    ) -> dict:
+        # 동기 호출에서는 백그라운드 요약 태스크가 없으므로 필요할 때 요약을 먼저 갱신합니다.
+        await chat_history.memory.aupdate_summary()
+        return await self.arun(query, chat_history, request_type)
+
+    async def arun(
+        self, query: str, chat_history: ChatHistory, request_type: Optional[str] = None
+    ) -> dict:
+        """
+        그래프를 비동기로 실행합니다. 각 노드의 LLM 호출이 이벤트 루프를 막지 않습니다.
+        request_type이 버튼 요청 유형(question, followup, modelAnswer)이면 입력 분류/라우팅 LLM 호출을 건너뜁니다.
+        """
+        return await self.graph.ainvoke(
+            self._initial_state(query, chat_history, request_type)
+        )
+
+    async def astream(
+        self, query: str, chat_history: ChatHistory, request_type: Optional[str] = None
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        그래프를 실행하면서 답변 노드의 LLM 토큰을 생성되는 즉시 전달합니다.
+
+        Yields:
+            ("token", {"node": 노드 이름, "content": 토큰}) 형태의 이벤트와,
+            마지막으로 ("final", 최종 state)를 반환합니다.
+        """
+        final_state = {}
+        async for event in self.graph.astream_events(
+            self._initial_state(query, chat_history, request_type), version="v2"
+        ):
+            kind = event["event"]
+            node = event.get("metadata", {}).get("langgraph_node")
+            if kind == "on_chat_model_stream" and node in STREAMING_NODES:
+                content = event["data"]["chunk"].content
+                if content:
+                    yield "token", {"node": node, "content": content}
+            elif kind == "on_chain_end" and not event.get("parent_ids"):
+                # 루트 실행(그래프 전체)의 종료 이벤트에 최종 state가 담겨 있습니다.
+                final_state = event["data"].get("output") or {}
+        yield "final", final_state
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="면접 에이전트 그래프 시각화")
+    parser.add_argument("--output", default="graph.png", help="PNG 저장 경로")
+    parser.add_argument("--mermaid", action="store_true", help="PNG 대신 Mermaid 문법을 출력")
+    args = parser.parse_args()
+    if args.mermaid:
+        print(draw_graph_mermaid())
+    else:
+        draw_graph_png(args.output)
+        print(f"그래프를 {args.output}에 저장했습니다.")
@@ -0,0 +1,26 @@
+import os
+import threading
+from functools import lru_cache
+
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _create_llm(model_name: str, temperature: float, verbose: bool):
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        temperature=temperature,
+        model_name=model_name,
+        verbose=verbose,
+    )
+
+
+def get_llm(model_name: str = "gpt-4o-mini", temperature: float = 0.7, verbose: bool = False):
+    """
+    ChatOpenAI 클라이언트를 처음 사용할 때 만들고 같은 설정끼리 재사용한다.
+    모듈 import 시점에 클라이언트(HTTP 클라이언트, 인증서 로딩)를 만들지 않기 위해 사용한다.
+    """
+    with _lock:
+        return _create_llm(model_name, temperature, verbose)
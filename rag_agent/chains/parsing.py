@@ -0,0 +1,130 @@
+import os
+import codecs
+import logging
+import zipfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from .chunking import get_chunker
+
+logger = logging.getLogger(__name__)
+
+# 문서 파싱/청크 분할 설정
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", str(os.cpu_count() or 1)))  # 파싱 프로세스 수
+PARSE_BUFFER_CHARS = int(os.getenv("PARSE_BUFFER_CHARS", "65536"))  # 한 번에 분할할 최대 텍스트 길이
+TEXT_BLOCK_SIZE = 64 * 1024  # 텍스트 파일을 읽는 단위
+# 서버 시작 시점에는 이미 스레드(이벤트 버스, 임베딩 executor)와 SQLite 연결이 열려 있어
+# fork로 만든 프로세스가 잠긴 락을 물려받아 멈출 수 있으므로, 기본값으로 새 인터프리터(spawn)를 띄운다.
+PARSE_START_METHOD = os.getenv("PARSE_START_METHOD", "spawn")
+
+
+def sniff_format(file_path: str) -> str:
+    """확장자 대신 파일 앞부분의 magic bytes로 형식을 판별한다."""
+    with open(file_path, "rb") as f:
+        head = f.read(8)
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(file_path) as archive:
+                if "word/document.xml" in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        return "binary"
+    if head.startswith(b"\xd0\xcf\x11\xe0"):
+        # 구버전 .doc (OLE) 형식은 지원하지 않는다.
+        return "binary"
+    return "text"
+
+
+def _is_utf8(file_path: str) -> bool:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(TEXT_BLOCK_SIZE), b""):
+                decoder.decode(block)
+            decoder.decode(b"", final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _iter_text(file_path: str) -> Iterator[str]:
+    errors = "strict" if _is_utf8(file_path) else "ignore"
+    with open(file_path, "r", encoding="utf-8-sig", errors=errors) as f:
+        for block in iter(lambda: f.read(TEXT_BLOCK_SIZE), ""):
+            yield block
+
+
+def _iter_pdf_pages(file_path: str) -> Iterator[str]:
+    from PyPDF2 import PdfReader
+
+    with open(file_path, "rb") as f:
+        reader = PdfReader(f)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+def _iter_docx_paragraphs(file_path: str) -> Iterator[str]:
+    import docx
+
+    for paragraph in docx.Document(file_path).paragraphs:
+        yield paragraph.text
+
+
+def iter_file_text(file_path: str) -> Iterator[str]:
+    """
+    파일 내용을 조각(PDF는 페이지, DOCX는 문단, 텍스트는 블록) 단위로 순서대로 반환한다.
+    파일 전체를 한 번에 메모리에 올리지 않는다.
+    """
+    file_format = sniff_format(file_path)
+    if file_format == "pdf":
+        return _iter_pdf_pages(file_path)
+    if file_format == "docx":
+        return _iter_docx_paragraphs(file_path)
+    if file_format == "binary":
+        logger.warning(f"Unsupported binary file skipped: {file_path}")
+        return iter(())
+    return _iter_text(file_path)
+
+
+def parse_file_to_text(file_path: str) -> str:
+    separator = "" if sniff_format(file_path) == "text" else "\n"
+    return separator.join(iter_file_text(file_path))
+
+
+def iter_chunks(segments: Iterator[str], separator: str = "\n") -> Iterator[str]:
+    """
+    조각들을 PARSE_BUFFER_CHARS 정도씩 모아 분할한다.
+    마지막 청크는 다음 조각과 이어서 다시 분할하므로 조각 경계에서 문맥이 끊기지 않는다.
+    """
+    splitter = get_chunker()
+    buffer = ""
+    for segment in segments:
+        buffer = f"{buffer}{separator}{segment}" if buffer else segment
+        if len(buffer) >= PARSE_BUFFER_CHARS:
+            chunks = splitter.split_text(buffer)
+            yield from chunks[:-1]
+            buffer = chunks[-1] if chunks else ""
+    if buffer:
+        yield from splitter.split_text(buffer)
+
+
+def chunk_file(file_path: str) -> list[str]:
+    """파일 하나를 파싱하고 청크로 나눈다. 프로세스 풀에서 실행된다."""
+    separator = "" if sniff_format(file_path) == "text" else "\n"
+    return list(iter_chunks(iter_file_text(file_path), separator=separator))
+
+
+def chunk_files(file_paths: list[str], workers: Optional[int] = None) -> dict[str, list[str]]:
+    """여러 파일을 프로세스 풀에서 병렬로 파싱/분할한다. 파일이 하나뿐이면 현재 프로세스에서 처리한다."""
+    workers = min(workers or PARSE_WORKERS, len(file_paths))
+    if workers <= 1:
+        return {file_path: chunk_file(file_path) for file_path in file_paths}
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context(PARSE_START_METHOD)
+    ) as executor:
+        results = executor.map(chunk_file, file_paths, chunksize=1)
+        return dict(zip(file_paths, results))
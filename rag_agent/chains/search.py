@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from .bm25 import BM25Index
+
+logger = logging.getLogger(__name__)
+
+# 웹 검색 설정
+SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "tavily").strip().lower()  # tavily 또는 local
+SEARCH_LOCAL_DIR = os.getenv(
+    "SEARCH_LOCAL_DIR",
+    os.path.join(os.path.dirname(__file__), "../../data/search_fixtures"),
+)
+SEARCH_FAKE_LATENCY_MS = float(os.getenv("SEARCH_FAKE_LATENCY_MS", "0"))  # 부하 테스트용 인위적 지연
+SEARCH_CACHE_PATH = os.getenv(
+    "SEARCH_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "../vectorstore/search_cache.sqlite3"),
+)
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "86400"))
+SEARCH_CACHE_MAX_BYTES = int(os.getenv("SEARCH_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def normalize_query(query: str) -> str:
+    """대소문자, 전각/반각, 공백, 따옴표 차이로 캐시가 빗나가지 않도록 질의를 정규화한다."""
+    query = unicodedata.normalize("NFKC", query).lower().strip().strip("\"'“”‘’")
+    return " ".join(query.split())
+
+
+class SearchProvider(ABC):
+    """웹 검색 제공자 인터페이스. 결과는 {"url", "content"} dict의 리스트입니다."""
+
+    name = "base"
+
+    @abstractmethod
+    def search(self, query: str) -> list[dict]:
+        """질의 하나를 검색합니다. search를 구현하지 않은 제공자는 생성할 때 TypeError가 납니다."""
+
+    async def asearch(self, query: str) -> list[dict]:
+        return await asyncio.to_thread(self.search, query)
+
+
+class TavilySearchProvider(SearchProvider):
+    name = "tavily"
+
+    def __init__(self):
+        from langchain_community.tools import TavilySearchResults
+
+        self.tool = TavilySearchResults(
+            max_results=3,
+            search_depth="advanced",
+            include_answer=True,
+            include_raw_content=True,
+            include_images=False,
+        )
+
+    def search(self, query: str) -> list[dict]:
+        return self.tool.invoke({"query": query})
+
+    async def asearch(self, query: str) -> list[dict]:
+        return await self.tool.ainvoke({"query": query})
+
+
+class LocalFileSearchProvider(SearchProvider):
+    """
+    디렉토리의 텍스트 파일을 BM25로 검색하는 오프라인 검색 제공자입니다.
+    네트워크 없이 retrieve 경로를 벤치마크/부하 테스트할 때 Tavily 대신 사용합니다.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_results: int = 3,
+        latency_ms: Optional[float] = None,
+    ):
+        self.directory = os.path.abspath(directory or SEARCH_LOCAL_DIR)
+        self.max_results = max_results
+        self.latency_ms = SEARCH_FAKE_LATENCY_MS if latency_ms is None else latency_ms
+        ids, texts = [], []
+        if os.path.isdir(self.directory):
+            for fname in sorted(os.listdir(self.directory)):
+                with open(os.path.join(self.directory, fname), "r", encoding="utf-8", errors="ignore") as f:
+                    ids.append(fname)
+                    texts.append(f.read())
+        else:
+            logger.warning(f"Local search directory not found: {self.directory}")
+        self.index = BM25Index().build(
+            ids, texts, [{"url": f"file://{os.path.join(self.directory, i)}"} for i in ids]
+        )
+
+    def search(self, query: str) -> list[dict]:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return [
+            {"url": doc.metadata["url"], "content": doc.page_content, "score": score}
+            for doc, score in self.index.search(query, k=self.max_results)
+        ]
+
+    async def asearch(self, query: str) -> list[dict]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return [
+            {"url": doc.metadata["url"], "content": doc.page_content, "score": score}
+            for doc, score in self.index.search(query, k=self.max_results)
+        ]
+
+
+class CachedSearchProvider(SearchProvider):
+    """
+    검색 결과를 SQLite에 저장해 재사용하는 래퍼입니다.
+
+    키는 (제공자 이름, 정규화된 질의)이며, ttl_seconds가 지난 결과는 다시 검색합니다.
+    전체 크기가 max_bytes를 넘으면 오래된 결과부터 지웁니다.
+    """
+
+    def __init__(
+        self,
+        provider: SearchProvider,
+        cache_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ):
+        self.provider = provider
+        self.name = provider.name
+        self.cache_path = cache_path or SEARCH_CACHE_PATH
+        self.ttl_seconds = ttl_seconds or SEARCH_CACHE_TTL_SECONDS
+        self.max_bytes = max_bytes or SEARCH_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.cache_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS search_results (
+                key TEXT PRIMARY KEY,
+                query TEXT NOT NULL,
+                results TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS search_results_created_at ON search_results (created_at)"
+        )
+        self._conn.commit()
+
+    def _key(self, query: str) -> str:
+        return hashlib.sha256(f"{self.name}:{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def _get(self, key: str) -> Optional[list[dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, created_at FROM search_results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def _put(self, key: str, query: str, results: list[dict]):
+        if not isinstance(results, list):
+            # 도구가 오류 메시지 문자열을 반환한 경우는 저장하지 않는다.
+            return
+        payload = json.dumps(results, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_results (key, query, results, size, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, normalize_query(query), payload, len(payload.encode("utf-8")), time.time()),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        self._conn.execute(
+            "DELETE FROM search_results WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM search_results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # 오래된 결과부터 지워 max_bytes 아래로 맞춘다.
+        to_delete = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM search_results ORDER BY created_at"
+        ):
+            if total <= self.max_bytes:
+                break
+            to_delete.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM search_results WHERE key = ?", to_delete)
+
+    def search(self, query: str) -> list[dict]:
+        key = self._key(query)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        results = self.provider.search(query)
+        self._put(key, query, results)
+        return results
+
+    async def asearch(self, query: str) -> list[dict]:
+        key = self._key(query)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        results = await self.provider.asearch(query)
+        self._put(key, query, results)
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_results"
+            ).fetchone()
+        return {
+            "provider": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+def create_search_provider(provider: Optional[str] = None) -> SearchProvider:
+    """SEARCH_PROVIDER 환경 변수에 따라 디스크 캐시가 적용된 검색 제공자를 만든다."""
+    provider = (provider or SEARCH_PROVIDER).lower()
+    if provider == "local":
+        return CachedSearchProvider(LocalFileSearchProvider())
+    if provider == "tavily":
+        return CachedSearchProvider(TavilySearchProvider())
+    raise ValueError(f"Unknown SEARCH_PROVIDER: {provider}")
+
+
+_search_provider = None
+_search_provider_lock = threading.Lock()
+
+
+def get_search_provider() -> SearchProvider:
+    """검색 제공자를 처음 검색할 때 한 번만 만들어 재사용한다."""
+    global _search_provider
+    if _search_provider is None:
+        with _search_provider_lock:
+            if _search_provider is None:
+                _search_provider = create_search_provider()
+    return _search_provider
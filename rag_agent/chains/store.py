@@ -1,19 +1,31 @@
 import os
+import json
 import shutil
+import hashlib
 import logging
 from typing import Optional
 
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import OpenAIEmbeddings
-from langchain.docstore.document import Document
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+from langchain_core.documents import Document
+
+from .bm25 import BM25Index, reciprocal_rank_fusion
+from .chunking import get_chunker
+from .parsing import chunk_files, parse_file_to_text
+from .embeddings import CachedEmbeddings, EMBEDDING_BATCH_SIZE, create_embeddings, embed_in_batches
 
 logger = logging.getLogger(__name__)
 
 # RAG 벡터 스토어
-vectorstore: Optional[Chroma] = None
+vectorstore: Optional[VectorStore] = None
 vectorstore_retriever = None
+# 같은 청크에 대한 키워드(BM25) 역색인
+bm25_index: Optional[BM25Index] = None
+# 현재 인덱스의 코퍼스 버전 (manifest를 매번 읽지 않도록 보관)
+corpus_version: Optional[str] = None
+# EMBEDDING_PROVIDER로 선택한 임베딩 모델
+embeddings: Optional[Embeddings] = None
 
 # 영속 디렉토리 경로
 persist_directory = os.getenv(
@@ -21,6 +33,20 @@ persist_directory = os.getenv(
     os.path.join(os.path.dirname(__file__), "../vectorstore/chroma_db"),
 )
 
+# 벡터 스토어 종류: "chroma" (기본) 또는 mmap 인덱스를 사용하는 "faiss"
+VECTORSTORE_BACKEND = os.getenv("VECTORSTORE_BACKEND", "chroma").lower()
+
+# 검색 방식: "hybrid" (BM25 + 벡터, RRF로 결합) 또는 "vector"
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))  # 각 검색기에서 가져올 후보 수
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+# 한 번에 삭제 요청하는 청크 id 수 (벡터 스토어의 SQLite 변수 개수 제한을 넘지 않도록)
+DELETE_BATCH_SIZE = int(os.getenv("VECTORSTORE_DELETE_BATCH_SIZE", "900"))
+
+# 인덱싱된 파일의 내용 해시와 청크 id를 기록하는 manifest (인덱스와 같은 위치에 저장)
+MANIFEST_FILENAME = "manifest.json"
+
 # 프로젝트 루트 기준으로 base_dir 정의
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))  # => NLP-team-project
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
@@ -32,70 +58,233 @@ def get_vectorstore():
         raise ValueError("vectorstore has not been initialized yet.")
     return vectorstore
 
+def get_embeddings() -> Embeddings:
+    global embeddings
+    if embeddings is None:
+        embeddings = create_embeddings()
+    return embeddings
+
 def get_vectorstore_retriever():
     global vectorstore_retriever
     if vectorstore_retriever is None:
         raise ValueError("vectorstore_retriever has not been initialized yet.")
     return vectorstore_retriever
 
-# 로컬 파일 시스템에서 context와 회사 자료 자동 로딩
-def parse_file_to_text(file_path: str) -> str:
-    with open(file_path, "rb") as f:
-        content = f.read()
-    try:
-        return content.decode("utf-8")
-    except UnicodeDecodeError:
-        if file_path.lower().endswith(".pdf"):
-            loader = PyPDFLoader(file_path)
-            docs = loader.load()
-            return "\n".join(doc.page_content for doc in docs)
-        elif file_path.lower().endswith((".docx", ".doc", ".txt")):
-            loader = TextLoader(file_path)
-            docs = loader.load()
-            return "\n".join(doc.page_content for doc in docs)
-        else:
-            return content.decode("utf-8", errors="ignore")
-
 async def init_local_data():
-    """로컬 db를 모두 비운다"""
+    """로컬 db 디렉토리를 준비한다. 기존 인덱스는 manifest 기준으로 재사용한다."""
     global vectorstore
-    if os.path.exists(persist_directory):
-        shutil.rmtree(persist_directory)
     os.makedirs(persist_directory, exist_ok=True)
     vectorstore = None
-    logger.info("Vectorstore reset successfully.")
+    logger.info("Vectorstore directory ready.")
 
 def reset_vectorstore():
-    global vectorstore
+    global vectorstore, corpus_version
     if os.path.exists(persist_directory):
         shutil.rmtree(persist_directory)
     os.makedirs(persist_directory, exist_ok=True)
     vectorstore = None
+    corpus_version = None
     logger.info("Vectorstore reset successfully.")
 
+def _manifest_path() -> str:
+    return os.path.join(persist_directory, MANIFEST_FILENAME)
+
+def load_manifest() -> Optional[dict]:
+    """manifest를 읽는다. 없으면 None을 반환한다."""
+    try:
+        with open(_manifest_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_manifest(files: dict):
+    global corpus_version
+    manifest = {
+        "backend": VECTORSTORE_BACKEND,
+        "chunker": get_chunker().signature,
+        "files": files,
+        "corpus_version": compute_corpus_version(files),
+    }
+    tmp_path = _manifest_path() + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, _manifest_path())
+    corpus_version = manifest["corpus_version"]
+
+def compute_corpus_version(files: dict) -> str:
+    """파일별 해시와 청크 분할 설정을 합쳐 코퍼스 전체의 버전을 만든다."""
+    digest = hashlib.sha256(get_chunker().signature.encode("utf-8"))
+    for fname in sorted(files):
+        digest.update(f"{fname}:{files[fname]['hash']}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def get_corpus_version() -> Optional[str]:
+    global corpus_version
+    if corpus_version is None:
+        manifest = load_manifest()
+        corpus_version = manifest.get("corpus_version") if manifest else None
+    return corpus_version
+
+def file_content_hash(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _chunk_ids(fname: str, content_hash: str, count: int) -> list[str]:
+    prefix = hashlib.sha256(f"{fname}:{content_hash}".encode("utf-8")).hexdigest()[:16]
+    return [f"{prefix}-{i}" for i in range(count)]
+
+def create_vectorstore() -> VectorStore:
+    """VECTORSTORE_BACKEND에 따라 persist_directory에 저장되는 벡터 스토어를 연다."""
+    if VECTORSTORE_BACKEND == "faiss":
+        from .faiss_store import FaissVectorStore
+
+        return FaissVectorStore(
+            persist_directory=os.path.join(persist_directory, "faiss"),
+            embedding_function=get_embeddings(),
+        )
+    if VECTORSTORE_BACKEND == "chroma":
+        return Chroma(
+            persist_directory=persist_directory, embedding_function=get_embeddings()
+        )
+    raise ValueError(f"Unknown VECTORSTORE_BACKEND: {VECTORSTORE_BACKEND}")
+
+def delete_ids(store: VectorStore, ids: list[str]):
+    """청크 id를 DELETE_BATCH_SIZE개씩 나눠 삭제한다."""
+    for start in range(0, len(ids), DELETE_BATCH_SIZE):
+        store.delete(ids=ids[start:start + DELETE_BATCH_SIZE])
+
+def add_embeddings(
+    store: VectorStore,
+    texts: list[str],
+    vectors: list[list[float]],
+    metadatas: list[dict],
+    ids: list[str],
+):
+    """미리 계산한 임베딩으로 청크를 저장한다. 같은 id가 있으면 교체한다."""
+    if isinstance(store, Chroma):
+        # langchain Chroma에는 임베딩을 받는 추가 메서드가 없어 컬렉션에 직접 upsert한다.
+        store._collection.upsert(
+            ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas
+        )
+    else:
+        store.add_embeddings(zip(texts, vectors), metadatas=metadatas, ids=ids)
+
 def load_vectorstore_from_company_infos():
+    """
+    company_infos 디렉토리를 증분 인덱싱한다.
+    manifest의 파일 해시와 비교하여 변경되지 않은 파일은 건너뛰고,
+    변경된 파일은 기존 청크를 지운 뒤 다시 추가하며, 삭제된 파일의 청크는 제거한다.
+    """
     global vectorstore, vectorstore_retriever
-    base_dir = os.path.join(os.path.dirname(__file__), "data")
-    
-    # 회사 자료 로딩 및 인덱싱
-    docs = []
-    for fname in os.listdir(COMPANY_INFO_DIR):
-        text = parse_file_to_text(os.path.join(COMPANY_INFO_DIR, fname))
-        splitter = CharacterTextSplitter(chunk_size=512, chunk_overlap=50)
-        for chunk in splitter.split_text(text):
-            docs.append(Document(page_content=chunk, metadata={"filename": fname}))
-
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-    vectorstore = Chroma(
-        persist_directory=persist_directory, embedding_function=embeddings
-    )
+
+    vectorstore = create_vectorstore()
     vectorstore_retriever = vectorstore.as_retriever(search_kwargs={'k': 3})
 
-    if docs:
-        texts = [d.page_content for d in docs]
-        metadatas = [d.metadata for d in docs]
-        vectorstore.add_texts(texts=texts, metadatas=metadatas)
+    manifest = load_manifest()
+    if (
+        manifest is None
+        or manifest.get("backend", "chroma") != VECTORSTORE_BACKEND
+        or manifest.get("chunker") != get_chunker().signature
+    ):
+        # manifest 없이 남아있는 인덱스는 어떤 파일에서 왔는지 알 수 없으므로 비운다.
+        # 백엔드나 청크 분할 설정을 바꾼 경우에도 인덱스를 처음부터 다시 만든다.
+        stale_ids = vectorstore.get()["ids"]
+        if stale_ids:
+            delete_ids(vectorstore, stale_ids)
+        manifest = {"files": {}}
+    else:
+        stale_ids = []
+    indexed_files = manifest["files"]
+
+    current_files = {}
+    changed_files = []
+    skipped = 0
+    for fname in sorted(os.listdir(COMPANY_INFO_DIR)):
+        file_path = os.path.join(COMPANY_INFO_DIR, fname)
+        content_hash = file_content_hash(file_path)
+        previous = indexed_files.get(fname)
+        if previous and previous["hash"] == content_hash:
+            current_files[fname] = previous
+            skipped += 1
+            continue
+
+        # 새 파일이거나 내용이 바뀐 파일
+        if previous and previous["ids"]:
+            delete_ids(vectorstore, previous["ids"])
+        changed_files.append((fname, file_path, content_hash))
+
+    # 변경된 파일의 파싱과 청크 분할은 프로세스 풀에서 병렬로 처리
+    chunks_by_path = chunk_files([file_path for _, file_path, _ in changed_files])
+    pending_texts, pending_metadatas, pending_ids = [], [], []
+    for fname, file_path, content_hash in changed_files:
+        texts = chunks_by_path[file_path]
+        ids = _chunk_ids(fname, content_hash, len(texts))
+        pending_texts.extend(texts)
+        pending_metadatas.extend({"filename": fname} for _ in texts)
+        pending_ids.extend(ids)
+        current_files[fname] = {"hash": content_hash, "ids": ids}
+
+    if pending_texts:
+        # 배치 단위 병렬 임베딩 결과를 그대로 저장한다. (add_texts를 쓰면 같은 청크를 다시 임베딩한다)
+        pending_vectors = embed_in_batches(get_embeddings(), pending_texts)
+        for start in range(0, len(pending_texts), EMBEDDING_BATCH_SIZE):
+            end = start + EMBEDDING_BATCH_SIZE
+            add_embeddings(
+                vectorstore,
+                texts=pending_texts[start:end],
+                vectors=pending_vectors[start:end],
+                metadatas=pending_metadatas[start:end],
+                ids=pending_ids[start:end],
+            )
+    added_chunks = len(pending_texts)
+
+    # 디렉토리에서 삭제된 파일의 청크 제거
+    removed = [fname for fname in indexed_files if fname not in current_files]
+    for fname in removed:
+        if indexed_files[fname]["ids"]:
+            delete_ids(vectorstore, indexed_files[fname]["ids"])
+
+    if added_chunks or removed or stale_ids:
         vectorstore.persist()
-        logger.info("Vectorstore loaded and persisted from company_infos.")
+    save_manifest(current_files)
+    logger.info(
+        f"Vectorstore synced from company_infos: {skipped} unchanged, "
+        f"{len(current_files) - skipped} (re)indexed ({added_chunks} chunks), "
+        f"{len(removed)} removed."
+    )
+    rebuild_bm25_index()
+    if isinstance(get_embeddings(), CachedEmbeddings):
+        logger.info(f"Embedding cache: {get_embeddings().stats()}")
 
     return vectorstore
+
+def rebuild_bm25_index() -> BM25Index:
+    """벡터 스토어에 저장된 청크 전체로 BM25 색인을 다시 만든다."""
+    global bm25_index
+    stored = get_vectorstore().get()
+    bm25_index = BM25Index().build(stored["ids"], stored["documents"], stored["metadatas"])
+    return bm25_index
+
+def hybrid_search(query: str, k: int = 3) -> list[Document]:
+    """
+    벡터 검색과 BM25 키워드 검색 결과를 reciprocal rank fusion으로 합친다.
+    회사명이나 인재상 키워드처럼 임베딩으로는 놓치기 쉬운 정확한 단어 매칭을 보완한다.
+    """
+    store = get_vectorstore()
+    if RETRIEVAL_MODE != "hybrid" or not bm25_index:
+        return store.similarity_search(query, k=k)
+    vector_docs = store.similarity_search(query, k=HYBRID_FETCH_K)
+    keyword_docs = [doc for doc, _ in bm25_index.search(query, k=HYBRID_FETCH_K)]
+    return reciprocal_rank_fusion([vector_docs, keyword_docs], k=k, rrf_k=RRF_K)
+
+async def ahybrid_search(query: str, k: int = 3) -> list[Document]:
+    """hybrid_search의 비동기 버전입니다."""
+    store = get_vectorstore()
+    if RETRIEVAL_MODE != "hybrid" or not bm25_index:
+        return await store.asimilarity_search(query, k=k)
+    vector_docs = await store.asimilarity_search(query, k=HYBRID_FETCH_K)
+    keyword_docs = [doc for doc, _ in bm25_index.search(query, k=HYBRID_FETCH_K)]
+    return reciprocal_rank_fusion([vector_docs, keyword_docs], k=k, rrf_k=RRF_K)
@@ -1,10 +1,15 @@
 import json
-from langchain.prompts import PromptTemplate
-from typing import Literal, Optional, Self
+import time
+from typing import TYPE_CHECKING, Literal, Optional, Self
 from uuid import uuid4
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from datetime import datetime
-from ..chat_history.Singleton import Singleton
+
+from ..chains.chunking import count_tokens
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import PromptTemplate
+    from .HistoryMemory import HistoryMemory
 
 
 ContentType = Literal[
@@ -21,14 +26,51 @@ class ChatItem(BaseModel):
     related_chatting_id: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.now)
     persona: Optional[dict] = None
+    scores: Optional[dict] = None  # 답변 평가 점수 (logicScore, jobFitScore, ...)
+    _token_count: Optional[int] = PrivateAttr(default=None)  # 대화 내역 문자열 기준 토큰 수 (캐시)
+    _assessed: bool = PrivateAttr(default=False)  # evaluate/response 노드에서 답변으로 평가된 항목
+
+    def as_history_line(self) -> str:
+        return f"{self.speaker}({self.id}): {self.content}"
+
+    def token_count(self) -> int:
+        """as_history_line()의 토큰 수. 내용이 바뀌지 않으므로 처음 한 번만 계산합니다."""
+        if self._token_count is None:
+            self._token_count = count_tokens(self.as_history_line())
+        return self._token_count
+
 
+# ChatItem 1개당 고정으로 잡는 메모리 오버헤드 (pydantic 객체, id, datetime 등)
+CHAT_ITEM_OVERHEAD_BYTES = 512
 
-class ChatHistory(Singleton):
-    def __init__(self):
-        if hasattr(self, "_initialized"):
-            return
-        self._initialized = True
+
+class ChatHistory:
+    """
+    세션 1개의 면접 대화 내역입니다.
+    세션별 인스턴스는 SessionManager가 생성하고 관리합니다.
+    """
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id or uuid4().hex
         self.history = []
+        self._positions: dict[str, int] = {}  # ChatItem id -> history 내 위치
+        self.version = 0  # 대화 내역이 바뀔 때마다 증가 (ETag 계산용)
+        self.size_bytes = 0  # 대략적인 메모리 사용량
+        self.created_at = time.monotonic()
+        self.last_accessed = self.created_at
+        self._memory = None
+
+    def touch(self):
+        self.last_accessed = time.monotonic()
+
+    @property
+    def memory(self) -> "HistoryMemory":
+        """최근 대화 + 이전 대화 요약으로 프롬프트용 대화 내역을 만드는 메모리 (처음 사용할 때 생성)"""
+        if self._memory is None:
+            from .HistoryMemory import HistoryMemory
+
+            self._memory = HistoryMemory(self)
+        return self._memory
 
     def add(
         self,
@@ -49,8 +91,72 @@ class ChatHistory(Singleton):
                 persona=json.loads(persona_info) if persona_info else None,
             )
         )
+        self._positions[id] = len(self.history) - 1
+        self.version += 1
+        self.size_bytes += (
+            len(content.encode("utf-8"))
+            + len((persona_info or "").encode("utf-8"))
+            + CHAT_ITEM_OVERHEAD_BYTES
+        )
+        self.touch()
         return id
 
+    def set_scores(self, item_id: str, scores: dict) -> bool:
+        """답변 항목에 평가 점수를 저장합니다."""
+        item = self.get_item_by_id(item_id)
+        if item is None:
+            return False
+        item.scores = scores
+        self.version += 1
+        return True
+
+    def mark_assessed(self, item_id: str, scores: Optional[dict] = None) -> bool:
+        """
+        답변으로 평가된 사용자 항목을 표시합니다. /assessment는 이 항목만 집계합니다.
+        점수 계산에 실패해 scores가 없으면 /assessment에서 다시 계산합니다.
+        """
+        item = self.get_item_by_id(item_id)
+        if item is None:
+            return False
+        item._assessed = True
+        if scores:
+            item.scores = scores
+        self.version += 1
+        return True
+
+    def get_item_by_id(self, item_id: Optional[str]) -> Optional[ChatItem]:
+        position = self._positions.get(item_id)
+        return self.history[position] if position is not None else None
+
+    def get_history_after(self, item_id: Optional[str] = None) -> list[ChatItem]:
+        """
+        item_id 이후에 추가된 항목만 반환합니다.
+        item_id가 없거나 이 세션에 없는 id이면 전체 내역을 반환합니다.
+        """
+        position = self._positions.get(item_id)
+        if position is None:
+            return self.history
+        return self.history[position + 1 :]
+
+    def get_etag(self, item_id: Optional[str] = None) -> str:
+        """현재 버전과 커서(item_id)를 기준으로 응답의 ETag를 만듭니다."""
+        return f'W/"{self.session_id}-{self.version}-{item_id or ""}"'
+
+    def get_answer_turns(self) -> list[tuple[ChatItem, Optional[ChatItem]]]:
+        """
+        지원자 답변과 그 답변 직전의 질문을 (답변, 질문) 쌍으로 반환합니다.
+        evaluate/response 노드를 거친(mark_assessed) 항목만 답변으로 간주하므로
+        "모범답변 해줘" 같은 명령 입력은 type이 "answer"여도 포함되지 않습니다.
+        """
+        turns = []
+        last_question = None
+        for item in self.history:
+            if item.type == "question" and item.speaker == "agent":
+                last_question = item
+            elif item.speaker == "user" and (item._assessed or item.scores):
+                turns.append((item, last_question))
+        return turns
+
     def get_all_history(self) -> list[ChatItem]:
         return self.history
 
@@ -91,11 +197,11 @@ class ChatHistory(Singleton):
         )
 
     def get_all_history_as_string(self) -> str:
-        return "\n".join(
-            [f"{item.speaker}({item.id}): {item.content}" for item in self.history]
-        )
+        return "\n".join([item.as_history_line() for item in self.history])
+
+    def get_chat_history_context_prompt(self) -> "PromptTemplate":
+        from langchain_core.prompts import PromptTemplate
 
-    def get_chat_history_context_prompt(self) -> PromptTemplate:
         return PromptTemplate(
             template=f"""
             [상황]
@@ -0,0 +1,206 @@
+import os
+import asyncio
+import logging
+import threading
+from typing import TYPE_CHECKING, Optional
+
+from ..chains.chunking import count_tokens
+
+if TYPE_CHECKING:
+    from .ChatHistory import ChatHistory, ChatItem
+
+logger = logging.getLogger(__name__)
+
+# 요약 메모리 설정
+MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "3"))  # 그대로 유지하는 최근 턴 수
+MEMORY_SUMMARY_MIN_TOKENS = int(os.getenv("MEMORY_SUMMARY_MIN_TOKENS", "300"))  # 이만큼 쌓이면 요약에 반영
+MEMORY_SUMMARY_MAX_TOKENS = int(os.getenv("MEMORY_SUMMARY_MAX_TOKENS", "400"))  # 요약 길이 상한
+MEMORY_SUMMARY_MODEL = os.getenv("MEMORY_SUMMARY_MODEL", "gpt-4o-mini")
+
+# 노드별 대화 내역 토큰 예산
+HISTORY_TOKEN_BUDGETS = {
+    node: int(os.getenv(f"HISTORY_TOKEN_BUDGET_{node.upper()}", str(default)))
+    for node, default in {
+        "classify_input": 600,
+        "followup": 1500,
+        "evaluate": 2000,
+        "response": 2000,
+        "modelAnswer": 1500,
+    }.items()
+}
+DEFAULT_HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+
+SUMMARY_PROMPT = """
+다음은 AI 모의 면접의 [기존 요약]과 그 이후에 오간 [새 대화]입니다.
+[기존 요약]에 [새 대화]의 내용을 반영해 요약을 갱신하세요.
+
+- 면접관이 한 질문의 주제, 지원자 답변의 핵심(경험, 근거, 수치), 드러난 강점과 약점을 남깁니다.
+- 이미 다룬 질문 주제는 빠짐없이 남겨 같은 질문을 반복하지 않도록 합니다.
+- {max_tokens} 토큰 이내의 한국어 문장으로만 작성하고, 요약 외의 말은 하지 않습니다.
+
+[기존 요약]
+{summary}
+
+[새 대화]
+{new_lines}
+"""
+
+
+class HistoryMemory:
+    """
+    세션 대화 내역을 프롬프트에 넣을 때 사용하는 요약 메모리입니다.
+
+    최근 recent_turns개의 턴(사용자 입력 1개와 그 뒤의 에이전트 응답)은 그대로 두고,
+    그보다 오래된 항목은 요약(summary)에 점진적으로 반영합니다. 요약은 새로 밀려난 항목만 LLM에 보내 갱신하며,
+    render(budget)는 요약 + 최근 항목을 토큰 예산 안에서 최신 항목부터 채워 반환합니다.
+    """
+
+    def __init__(
+        self,
+        history: "ChatHistory",
+        recent_turns: Optional[int] = None,
+        summary_min_tokens: Optional[int] = None,
+    ):
+        self.history = history
+        self.recent_turns = recent_turns if recent_turns is not None else MEMORY_RECENT_TURNS
+        self.summary_min_tokens = (
+            summary_min_tokens if summary_min_tokens is not None else MEMORY_SUMMARY_MIN_TOKENS
+        )
+        self.summary = ""
+        self.summary_tokens = 0
+        self.summarized_upto = 0  # history.history[:summarized_upto]가 요약에 반영됨
+        self.summary_updates = 0
+        self._lock = threading.Lock()
+        self._updating = False
+        self._task: Optional[asyncio.Task] = None
+
+    def _recent_start(self) -> int:
+        """최근 recent_turns개 턴이 시작하는 위치. 턴은 사용자 항목에서 시작합니다."""
+        items = self.history.history
+        seen = 0
+        for position in range(len(items) - 1, -1, -1):
+            if items[position].speaker == "user":
+                seen += 1
+                if seen == self.recent_turns:
+                    return position
+        return 0
+
+    def pending_items(self) -> list["ChatItem"]:
+        """최근 턴 밖으로 밀려났지만 아직 요약에 반영되지 않은 항목"""
+        return self.history.history[self.summarized_upto : self._recent_start()]
+
+    def needs_summary(self) -> bool:
+        pending = self.pending_items()
+        return bool(pending) and sum(item.token_count() for item in pending) >= self.summary_min_tokens
+
+    def render(self, budget: Optional[int] = None) -> str:
+        """
+        요약 + 요약되지 않은 항목을 budget 토큰 이내로 만듭니다.
+        항목은 최신 것부터 채우며, 가장 최근 항목은 예산을 넘더라도 항상 포함합니다.
+        """
+        budget = budget or DEFAULT_HISTORY_TOKEN_BUDGET
+        with self._lock:
+            summary, summary_tokens, start = self.summary, self.summary_tokens, self.summarized_upto
+        items = self.history.history[start:]
+
+        remaining = budget - summary_tokens
+        lines = []
+        for item in reversed(items):
+            tokens = item.token_count()
+            if lines and tokens > remaining:
+                break
+            lines.append(item.as_history_line())
+            remaining -= tokens
+        lines.reverse()
+
+        if not summary:
+            return "\n".join(lines)
+        return f"[이전 대화 요약]\n{summary}\n\n[최근 대화]\n" + "\n".join(lines)
+
+    def _begin_update(self) -> Optional[tuple[str, int, list["ChatItem"]]]:
+        with self._lock:
+            if self._updating or not self.needs_summary():
+                return None
+            self._updating = True
+            end = self._recent_start()
+            return self.summary, end, self.history.history[self.summarized_upto : end]
+
+    def _finish_update(self, summary: Optional[str], end: int):
+        with self._lock:
+            self._updating = False
+            if summary is None:
+                return
+            self.summary = summary.strip()
+            self.summary_tokens = count_tokens(self.summary)
+            self.summarized_upto = end
+            self.summary_updates += 1
+
+    def _summary_chain(self):
+        from langchain_core.prompts import PromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+        from ..chains.llm import get_llm
+
+        prompt = PromptTemplate.from_template(SUMMARY_PROMPT).partial(
+            max_tokens=str(MEMORY_SUMMARY_MAX_TOKENS)
+        )
+        return prompt | get_llm(MEMORY_SUMMARY_MODEL, temperature=0) | StrOutputParser()
+
+    def update_summary(self) -> bool:
+        """밀려난 항목이 충분히 쌓였으면 요약을 갱신합니다. 갱신했으면 True를 반환합니다."""
+        job = self._begin_update()
+        if job is None:
+            return False
+        summary, end, items = job
+        result = None
+        try:
+            result = self._summary_chain().invoke(
+                {
+                    "summary": summary or "(없음)",
+                    "new_lines": "\n".join(item.as_history_line() for item in items),
+                }
+            )
+        except Exception as e:
+            logger.error(f"대화 요약 갱신 중 오류 발생: {e}")
+        finally:
+            self._finish_update(result, end)
+        return result is not None
+
+    async def aupdate_summary(self) -> bool:
+        """update_summary의 비동기 버전입니다."""
+        job = self._begin_update()
+        if job is None:
+            return False
+        summary, end, items = job
+        result = None
+        try:
+            result = await self._summary_chain().ainvoke(
+                {
+                    "summary": summary or "(없음)",
+                    "new_lines": "\n".join(item.as_history_line() for item in items),
+                }
+            )
+        except Exception as e:
+            logger.error(f"대화 요약 갱신 중 오류 발생: {e}")
+        finally:
+            self._finish_update(result, end)
+        return result is not None
+
+    def schedule_update(self) -> Optional[asyncio.Task]:
+        """
+        요약 갱신을 백그라운드 태스크로 시작합니다. 응답을 기다리게 하지 않고 다음 턴 전에 반영됩니다.
+        갱신할 필요가 없거나 이미 진행 중이면 None을 반환합니다.
+        """
+        if (self._task is not None and not self._task.done()) or not self.needs_summary():
+            return None
+        self._task = asyncio.create_task(self.aupdate_summary())
+        return self._task
+
+    def stats(self) -> dict:
+        items = self.history.history
+        return {
+            "items": len(items),
+            "summarized_items": self.summarized_upto,
+            "summary_tokens": self.summary_tokens,
+            "summary_updates": self.summary_updates,
+            "full_history_tokens": sum(item.token_count() for item in items),
+        }
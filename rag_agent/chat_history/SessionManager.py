@@ -0,0 +1,104 @@
+import os
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..chat_history.ChatHistory import ChatHistory
+from ..chat_history.Singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+
+class SessionManager(Singleton):
+    """
+    세션 ID별로 독립된 ChatHistory를 발급하는 관리자입니다.
+
+    - max_sessions: 동시에 유지하는 최대 세션 수 (초과 시 가장 오래 사용하지 않은 세션부터 제거)
+    - ttl_seconds: 마지막 사용 이후 이 시간이 지나면 세션을 제거
+    - max_memory_bytes: 전체 세션의 대략적인 메모리 사용량 상한 (0이면 제한 없음)
+    """
+
+    def __init__(
+        self,
+        max_sessions: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        max_memory_bytes: Optional[int] = None,
+    ):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+        self.max_sessions = max_sessions or int(os.getenv("MAX_SESSIONS", "100"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+        self.max_memory_bytes = (
+            max_memory_bytes
+            if max_memory_bytes is not None
+            else int(os.getenv("SESSION_MAX_MEMORY_BYTES", "0"))
+        )
+        # 최근에 사용한 세션이 뒤쪽에 오도록 유지 (LRU)
+        self.sessions: "OrderedDict[str, ChatHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_session(self, session_id: Optional[str] = None) -> ChatHistory:
+        """
+        세션을 조회하고, 없으면 새로 만듭니다. 조회할 때마다 만료 세션을 정리합니다.
+        클라이언트가 보낸 ID가 없는 세션이면 그 ID를 쓰지 않고 서버에서 새 ID를 발급합니다. (세션 고정 방지)
+        """
+        with self._lock:
+            self._evict_expired()
+            chat_history = self.sessions.get(session_id) if session_id else None
+            if chat_history is None:
+                chat_history = ChatHistory()
+                self.sessions[chat_history.session_id] = chat_history
+                logger.info(f"Session created: {chat_history.session_id}")
+            else:
+                self.sessions.move_to_end(chat_history.session_id)
+            chat_history.touch()
+            self._evict_over_capacity(keep=chat_history.session_id)
+            return chat_history
+
+    def delete_session(self, session_id: str) -> bool:
+        with self._lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            return self._evict_expired()
+
+    def memory_usage(self) -> int:
+        return sum(h.size_bytes for h in list(self.sessions.values()))
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self.sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_bytes": self.memory_usage(),
+            "max_memory_bytes": self.max_memory_bytes,
+        }
+
+    def _evict_expired(self) -> int:
+        # OrderedDict가 마지막 사용 순으로 정렬되어 있으므로 앞쪽만 확인하면 됩니다.
+        now = time.monotonic()
+        evicted = 0
+        while self.sessions:
+            session_id, chat_history = next(iter(self.sessions.items()))
+            if now - chat_history.last_accessed < self.ttl_seconds:
+                break
+            self.sessions.popitem(last=False)
+            evicted += 1
+            logger.info(f"Session expired: {session_id}")
+        return evicted
+
+    def _evict_over_capacity(self, keep: str):
+        usage = self.memory_usage() if self.max_memory_bytes else 0
+        while len(self.sessions) > self.max_sessions or (
+            self.max_memory_bytes and usage > self.max_memory_bytes
+        ):
+            session_id = next(iter(self.sessions))
+            if session_id == keep:
+                break
+            _, evicted = self.sessions.popitem(last=False)
+            usage -= evicted.size_bytes
+            logger.info(f"Session evicted: {session_id}")
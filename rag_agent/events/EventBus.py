@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Literal, Optional
+
+from ..chat_history.Singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+DropPolicy = Literal["drop_oldest", "drop_newest", "block"]
+
+
+def format_sse(data, event: Optional[str] = None) -> str:
+    """SSE(text/event-stream) 메시지 1개를 만듭니다. 문자열이 아닌 data는 JSON으로 직렬화합니다."""
+    if not isinstance(data, str):
+        data = json.dumps(data, ensure_ascii=False, default=str)
+    lines = [f"event: {event}"] if event else []
+    lines += [f"data: {line}" for line in data.split("\n")]
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """구독자 1명의 이벤트 큐입니다."""
+
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+
+class EventBus(Singleton):
+    """
+    세션(topic)별로 이벤트를 모든 구독자에게 전달하는 asyncio 기반 pub/sub 버스입니다.
+
+    - 구독자마다 크기가 제한된 큐를 가지며, 큐가 가득 차면 policy에 따라 처리합니다.
+      drop_oldest: 가장 오래된 이벤트를 버림 / drop_newest: 새 이벤트를 버림 /
+      block: apublish 호출자가 자리가 날 때까지 대기 (동기 publish는 drop_newest로 동작)
+    - 구독자가 없는 topic의 이벤트는 저장하지 않고 버립니다.
+    """
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        policy: Optional[DropPolicy] = None,
+        heartbeat_seconds: Optional[float] = None,
+    ):
+        if hasattr(self, "_initialized"):
+            return
+        self._initialized = True
+        self.queue_size = queue_size or int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+        self.policy: DropPolicy = policy or os.getenv("EVENT_DROP_POLICY", "drop_oldest")
+        self.heartbeat_seconds = heartbeat_seconds or float(
+            os.getenv("SSE_HEARTBEAT_SECONDS", "15")
+        )
+        self.subscribers: dict[str, set[Subscription]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(topic, self.queue_size)
+        with self._lock:
+            self.subscribers.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self.subscribers.get(subscription.topic)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.subscribers[subscription.topic]
+
+    def publish(self, topic: Optional[str], data, event: Optional[str] = None) -> int:
+        """
+        topic의 모든 구독자에게 이벤트를 보냅니다. 어느 스레드에서 호출해도 안전합니다.
+        전달 대상 구독자 수를 반환합니다.
+        """
+        if topic is None:
+            return 0
+        with self._lock:
+            subscribers = list(self.subscribers.get(topic, ()))
+        if not subscribers:
+            return 0
+
+        message = format_sse(data, event=event)
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if running_loop is self._loop:
+            self._deliver(subscribers, message)
+        elif self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, subscribers, message)
+        return len(subscribers)
+
+    async def apublish(self, topic: Optional[str], data, event: Optional[str] = None) -> int:
+        """publish의 비동기 버전입니다. block 정책이면 큐에 자리가 날 때까지 대기합니다."""
+        if self.policy != "block" or topic is None:
+            return self.publish(topic, data, event=event)
+        with self._lock:
+            subscribers = list(self.subscribers.get(topic, ()))
+        message = format_sse(data, event=event)
+        for subscription in subscribers:
+            await subscription.queue.put(message)
+        return len(subscribers)
+
+    def _deliver(self, subscribers: list[Subscription], message: str):
+        for subscription in subscribers:
+            queue = subscription.queue
+            if queue.full():
+                subscription.dropped += 1
+                if self.policy == "drop_oldest":
+                    queue.get_nowait()
+                else:
+                    continue
+            queue.put_nowait(message)
+
+    async def stream(
+        self,
+        topic: str,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        topic을 구독하여 SSE 메시지를 내보냅니다.
+        heartbeat_seconds 동안 이벤트가 없으면 keep-alive 주석을 보내고,
+        클라이언트 연결이 끊기면 구독을 해제합니다.
+        """
+        subscription = self.subscribe(topic)
+        logger.info(f"SSE subscribed: {topic}")
+        try:
+            while True:
+                if is_disconnected is not None and await is_disconnected():
+                    break
+                try:
+                    yield await asyncio.wait_for(
+                        subscription.queue.get(), timeout=self.heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscription)
+            logger.info(f"SSE unsubscribed: {topic} (dropped={subscription.dropped})")
@@ -4,19 +4,19 @@ from langchain_core.output_parsers import (
 )
 from typing import Literal, Optional
 
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
 import os
 
+from ..chains.llm import get_llm
+
 
 # .env 파일 로드
 load_dotenv()
 PersonaType = Literal["developer", "designer", "product_manager", "other"]
 
-llm = ChatOpenAI(
-    api_key=os.getenv("OPENAI_API_KEY"), temperature=0.7, model_name="gpt-4o"
-)
+# 페르소나 체인이 사용하는 LLM (클라이언트는 처음 호출할 때 생성)
+LLM_MODEL = "gpt-4o"
 
 
 class Persona:
@@ -85,7 +85,7 @@ class Persona:
             지원자의 자기소개서를 평가하고 있습니다.
             """,
         )
-        return self.get_base_prompt() | question_prompt | llm | StrOutputParser()
+        return self.get_base_prompt() | question_prompt | get_llm(LLM_MODEL) | StrOutputParser()
 
     def generate_model_answer(self):
         answer_prompt = PromptTemplate(
@@ -102,4 +102,4 @@ class Persona:
             
             """,
         )
-        return self.get_base_prompt() | answer_prompt | llm | StrOutputParser()
+        return self.get_base_prompt() | answer_prompt | get_llm(LLM_MODEL) | StrOutputParser()
@@ -6,14 +6,18 @@ from ..chat_history.Singleton import Singleton
 
 # rag_agent.chat_history.ChatHistory는 이 예제에서 직접 사용되지 않지만, 필요시 통합 가능
 # from rag_agent.chat_history.ChatHistory import ChatHistory
-from .Persona import Persona, PersonaType, llm  # Persona 클래스와 LLM 임포트
+from .Persona import Persona, PersonaType, LLM_MODEL  # Persona 클래스와 LLM 설정 임포트
+from ..chains.llm import get_llm
 from dotenv import load_dotenv
-from langchain.prompts import PromptTemplate
-from langchain.agents import AgentExecutor, create_react_agent
+from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnableLambda
 from langchain_core.output_parsers import StrOutputParser, JsonOutputParser
 
 import json  # JSON 직렬화를 위해 필요
+import os
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
 
 # .env 파일 로드 (이미 위에서 로드됨)
 load_dotenv()
@@ -54,7 +58,59 @@ AGENT_BASE_PROMPT = PromptTemplate.from_template(
     """
 )
 
-chat_history = ChatHistory.get_instance()
+# --- 페르소나 선택 프롬프트 ---
+PERSONA_SELECTION_PROMPT = PromptTemplate(
+    template="""     
+You are an AI agent responsible for selecting the most appropriate persona for a job applicant based on the provided context.
+
+Instructions:
+- Analyze the applicant's resume, job description (JD) and applicant's interview answer.
+- Evaluate all available personas.
+- Select the single most appropriate persona based on similarity of interests, communication style, and role type.
+- From the provided persona list, choose the single most appropriate **persona ID**.
+- Do not explain your reasoning unless asked.
+- Return ONLY the selected persona's ID in the format: Action Input: <persona_id>
+
+---
+resume:
+{resume}
+
+job description:
+{jd}
+
+applicant's interview response or input:
+{applicant_answer}
+
+available_personas_json: 
+{available_personas_json}
+
+---
+You must follow the process below exactly:
+
+Thought: your internal reasoning 
+Final Answer: persona_id (or null if no persona is available)       
+
+You must always end your response with a valid Final Answer.
+Failure to do so will cause the system to fail.
+Do not respond with "I don't know" or "I can't answer that". Always choose the best matching persona from the list.
+ONLY return the <persona_id> as output.
+
+Follow the Output Format:
+<persona_id>
+
+---
+
+Begin:
+
+Question: What is the ID of the most appropriate persona for this applicant?
+            """,
+    input_variables=[
+        "resume",
+        "jd",
+        "applicant_answer",
+        "available_personas_json",
+    ],
+)
 
 
 class PersonaInput(BaseModel):
@@ -71,21 +127,34 @@ tools = [
     # 필요시 다른 도구 추가
 ]
 
-# 2. ReAct Agent를 생성합니다.
+# 2. ReAct Agent와 AgentExecutor는 처음 사용할 때 생성합니다.
 # create_react_agent는 LLM, 도구들, 프롬프트 템플릿을 받아 Agent 체인을 생성합니다.
-agent = create_react_agent(llm, tools, AGENT_BASE_PROMPT)
-
-# 3. AgentExecutor를 생성합니다.
 # AgentExecutor는 Agent를 실행하고, 도구 실행 루프를 관리합니다.
 # verbose=True로 설정하면 Agent의 Thought/Action/Observation 과정을 콘솔에 출력합니다.
 # handle_parsing_errors=True는 LLM이 유효하지 않은 Action/Action Input을 생성했을 때 처리합니다.
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    verbose=True,
-    handle_parsing_errors=True,  # 파싱 에러 발생 시 처리
-    # memory=ConversationBufferMemory(memory_key="chat_history", return_messages=True) # 다중 턴 대화 시
-)
+@lru_cache(maxsize=1)
+def get_agent_executor():
+    from langchain.agents import AgentExecutor, create_react_agent
+
+    agent = create_react_agent(get_llm(LLM_MODEL), tools, AGENT_BASE_PROMPT)
+    return AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True,
+        handle_parsing_errors=True,  # 파싱 에러 발생 시 처리
+        # memory=ConversationBufferMemory(memory_key="chat_history", return_messages=True) # 다중 턴 대화 시
+    )
+
+
+def __getattr__(name: str):
+    # 기존 코드의 `PersonaService.agent_executor` 접근 호환
+    if name == "agent_executor":
+        return get_agent_executor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# 페르소나 선택 결과 캐시 크기
+PERSONA_DECISION_CACHE_SIZE = int(os.getenv("PERSONA_DECISION_CACHE_SIZE", "256"))
 
 
 class PersonaService(Singleton):
@@ -94,6 +163,44 @@ class PersonaService(Singleton):
             return
         self._initialized = True
         self.persona_list: List[Persona] = []
+        # 페르소나 목록이 바뀔 때마다 증가하여 이전 선택 결과를 무효화합니다.
+        self.roster_version = 0
+        # (session_id, 사용자 턴 항목 id, 답변 해시, roster_version) -> persona_id
+        self._decision_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+    def _invalidate_decisions(self):
+        self.roster_version += 1
+        self._decision_cache.clear()
+
+    def _decision_key(
+        self, chat_history: Optional[ChatHistory], applicant_answer: Optional[str]
+    ) -> Optional[tuple]:
+        """
+        같은 턴(마지막 사용자 입력 항목)에서의 호출끼리만 결과를 공유하도록 키를 만듭니다.
+        "꼬리질문 해줘"처럼 매 턴 같은 입력이라도 턴이 바뀌면 질문이 달라지므로 다시 선택합니다.
+        """
+        if chat_history is None:
+            return None
+        turn_id = next(
+            (item.id for item in reversed(chat_history.history) if item.speaker == "user"),
+            None,
+        )
+        answer_hash = hashlib.sha256((applicant_answer or "").encode("utf-8")).hexdigest()
+        return (chat_history.session_id, turn_id, answer_hash, self.roster_version)
+
+    def _get_cached_decision(self, key: Optional[tuple]) -> Optional[str]:
+        if key is None or key not in self._decision_cache:
+            return None
+        self._decision_cache.move_to_end(key)
+        return self._decision_cache[key]
+
+    def _cache_decision(self, key: Optional[tuple], persona_id: str):
+        # 호출 도중 페르소나 목록이 바뀌었다면 저장하지 않습니다.
+        if key is None or key[-1] != self.roster_version:
+            return
+        self._decision_cache[key] = persona_id
+        while len(self._decision_cache) > PERSONA_DECISION_CACHE_SIZE:
+            self._decision_cache.popitem(last=False)
 
     def add_persona(self, persona: PersonaInput):
         new_persona = Persona(
@@ -103,6 +210,7 @@ class PersonaService(Singleton):
             communication_style=persona.communicationStyle,
         )
         self.persona_list.append(new_persona)
+        self._invalidate_decisions()
         return new_persona
 
     def get_persona_list(self) -> List[Persona]:
@@ -110,6 +218,7 @@ class PersonaService(Singleton):
 
     def delete_persona(self, persona_id: str):
         self.persona_list = [p for p in self.persona_list if p.id != persona_id]
+        self._invalidate_decisions()
 
     def get_persona_by_id(self, persona_id: str) -> Optional[Persona]:
         for persona in self.persona_list:
@@ -126,6 +235,29 @@ class PersonaService(Singleton):
     def get_all_persona_info(self) -> str:
         return [p.get_persona_info() if p else None for p in self.persona_list]
     
+    def _persona_selection_inputs(
+        self,
+        resume: str,
+        jd: str,
+        applicant_answer: Optional[str],
+        interviewer_question: Optional[str],
+        chat_history: Optional[ChatHistory] = None,
+    ) -> dict:
+        if interviewer_question is None and chat_history is not None:
+            latest_question = chat_history.get_question_by_id(
+                chat_history.get_latest_question_id()
+            )
+            interviewer_question = latest_question.content if latest_question else None
+        available_personas_json = [p.get_persona_info() for p in self.persona_list]
+        print("available_personas_json", available_personas_json)
+        return {
+            "resume": resume,
+            "jd": jd,
+            "applicant_answer": applicant_answer,
+            "available_personas_json": available_personas_json,
+            "interviewer_question": interviewer_question,
+        }
+
     def invoke_agent(
         self,
         resume: str,
@@ -133,68 +265,47 @@ class PersonaService(Singleton):
         company_infos: Optional[str] = None,
         applicant_answer: Optional[str] = None,
         interviewer_question: Optional[str] = None,  # 지원자가 받은 질문
+        chat_history: Optional[ChatHistory] = None,  # 현재 세션의 대화 내역
     ) -> str:
-        available_personas_json = [p.get_persona_info() for p in self.persona_list]
-        print("available_personas_json", available_personas_json)
-        template = PromptTemplate(
-            template="""     
-You are an AI agent responsible for selecting the most appropriate persona for a job applicant based on the provided context.
-
-Instructions:
-- Analyze the applicant's resume, job description (JD) and applicant's interview answer.
-- Evaluate all available personas.
-- Select the single most appropriate persona based on similarity of interests, communication style, and role type.
-- From the provided persona list, choose the single most appropriate **persona ID**.
-- Do not explain your reasoning unless asked.
-- Return ONLY the selected persona's ID in the format: Action Input: <persona_id>
-
----
-resume:
-{resume}
-
-job description:
-{jd}
-
-applicant's interview response or input:
-{applicant_answer}
-
-available_personas_json: 
-{available_personas_json}
-            
----
-You must follow the process below exactly:
-
-Thought: your internal reasoning 
-Final Answer: persona_id (or null if no persona is available)       
-
-You must always end your response with a valid Final Answer.
-Failure to do so will cause the system to fail.
-Do not respond with "I don't know" or "I can't answer that". Always choose the best matching persona from the list.
-ONLY return the <persona_id> as output.
-
-Follow the Output Format:
-<persona_id>
-
----
-
-Begin:
+        """
+        지원자에게 가장 적합한 페르소나 ID를 선택합니다.
+        chat_history가 주어지면 같은 세션의 같은 턴, 같은 답변, 같은 페르소나 목록에 대한
+        선택 결과를 재사용합니다.
+        """
+        key = self._decision_key(chat_history, applicant_answer)
+        cached = self._get_cached_decision(key)
+        if cached is not None:
+            return cached
+
+        chain = PERSONA_SELECTION_PROMPT | get_llm(LLM_MODEL) | StrOutputParser()
+        persona_id = chain.invoke(
+            self._persona_selection_inputs(
+                resume, jd, applicant_answer, interviewer_question, chat_history
+            )
+        )
+        self._cache_decision(key, persona_id)
+        return persona_id
 
-Question: What is the ID of the most appropriate persona for this applicant?
-            """,
-            input_variables=[
-                "resume",
-                "jd",
-                "applicant_answer",
-                "available_personas_json",
-            ],
+    async def ainvoke_agent(
+        self,
+        resume: str,
+        jd: str,
+        company_infos: Optional[str] = None,
+        applicant_answer: Optional[str] = None,
+        interviewer_question: Optional[str] = None,  # 지원자가 받은 질문
+        chat_history: Optional[ChatHistory] = None,  # 현재 세션의 대화 내역
+    ) -> str:
+        """invoke_agent의 비동기 버전입니다."""
+        key = self._decision_key(chat_history, applicant_answer)
+        cached = self._get_cached_decision(key)
+        if cached is not None:
+            return cached
+
+        chain = PERSONA_SELECTION_PROMPT | get_llm(LLM_MODEL) | StrOutputParser()
+        persona_id = await chain.ainvoke(
+            self._persona_selection_inputs(
+                resume, jd, applicant_answer, interviewer_question, chat_history
+            )
         )
-        chain = template | llm | StrOutputParser()
-        return chain.invoke(
-            {
-                "resume": resume,
-                "jd": jd,
-                "applicant_answer": applicant_answer,
-                "available_personas_json": available_personas_json,
-                "interviewer_question": interviewer_question,
-            }
-        )
\ No newline at end of file
+        self._cache_decision(key, persona_id)
+        return persona_id
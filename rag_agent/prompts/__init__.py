@@ -0,0 +1,3 @@
+from .registry import get_prompt, verify_prompts, refresh_prompts
+
+__all__ = ["get_prompt", "verify_prompts", "refresh_prompts"]
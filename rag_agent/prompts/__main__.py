@@ -0,0 +1,51 @@
+"""
+패키지에 포함된 프롬프트를 관리하는 CLI.
+
+    python -m rag_agent.prompts list
+    python -m rag_agent.prompts verify
+    python -m rag_agent.prompts refresh [hwchase17/react ...]   # 네트워크 필요
+"""
+import sys
+import argparse
+
+from .registry import is_from_hub, load_manifest, refresh_prompts, verify_prompts
+
+
+def _warn_non_hub(manifest: dict):
+    """hub에서 받지 않은 프롬프트를 경고한다. (refresh로 실제 hub 사본을 받아야 함)"""
+    names = [name for name, entry in manifest.items() if not is_from_hub(entry)]
+    for name in names:
+        print(
+            f"WARN {name}: source is '{manifest[name].get('source')}', not a LangChain Hub copy",
+            file=sys.stderr,
+        )
+    if names:
+        print("WARN run `python -m rag_agent.prompts refresh` to pin the hub versions", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m rag_agent.prompts")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="등록된 프롬프트 목록")
+    subparsers.add_parser("verify", help="checksum 확인")
+    refresh = subparsers.add_parser("refresh", help="LangChain Hub에서 다시 받아 갱신")
+    refresh.add_argument("names", nargs="*")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        manifest = load_manifest()
+        for name, entry in manifest.items():
+            print(f"{name:45} {entry['source']:14} {entry['updated_at']}  {entry['sha256'][:12]}")
+        _warn_non_hub(manifest)
+    elif args.command == "verify":
+        results = verify_prompts()
+        for name, ok in results.items():
+            print(f"{'OK  ' if ok else 'FAIL'} {name}")
+        _warn_non_hub(load_manifest())
+        sys.exit(0 if all(results.values()) else 1)
+    else:
+        refresh_prompts(args.names or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROMPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(PROMPTS_DIR, "manifest.json")
+# refresh로 LangChain Hub에서 받은 프롬프트의 source 값
+HUB_SOURCE = "hub"
+
+_prompts: dict = {}
+_lock = threading.Lock()
+
+
+def _prompt_filename(name: str) -> str:
+    """hub 이름(owner/repo)을 파일 이름으로 바꾼다."""
+    return name.replace("/", "__") + ".json"
+
+
+def load_manifest() -> dict:
+    with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: dict):
+    tmp_path = MANIFEST_PATH + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def is_from_hub(entry: dict) -> bool:
+    """manifest 항목이 LangChain Hub에서 받은 사본인지 확인한다."""
+    return entry.get("source") == HUB_SOURCE
+
+
+def _read_verified(name: str, manifest: dict) -> str:
+    """프롬프트 파일을 읽고 manifest에 고정된 sha256과 같은지 확인한다."""
+    entry = manifest.get(name)
+    if entry is None:
+        raise KeyError(f"Unknown prompt: {name}")
+    with open(os.path.join(PROMPTS_DIR, entry["file"]), "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if digest != entry["sha256"]:
+        raise ValueError(
+            f"Prompt checksum mismatch for {name}: expected {entry['sha256']}, got {digest}"
+        )
+    return data.decode("utf-8")
+
+
+def get_prompt(name: str):
+    """
+    패키지에 포함된 프롬프트를 처음 사용할 때 한 번만 읽어 반환한다. (네트워크 호출 없음)
+    파일 내용이 manifest의 sha256과 다르면 ValueError를 발생시키고, hub에서 받은 사본이 아니면 경고를 남긴다.
+    """
+    prompt = _prompts.get(name)
+    if prompt is not None:
+        return prompt
+    with _lock:
+        if name not in _prompts:
+            from langchain_core.load import loads
+
+            manifest = load_manifest()
+            text = _read_verified(name, manifest)
+            if not is_from_hub(manifest[name]):
+                logger.warning(
+                    f"Prompt {name} is not a LangChain Hub copy (source: {manifest[name].get('source')}). "
+                    f"Run `python -m rag_agent.prompts refresh {name}` to pin the hub version."
+                )
+            _prompts[name] = loads(text, allowed_objects="core", secrets_from_env=False)
+        return _prompts[name]
+
+
+def verify_prompts() -> dict[str, bool]:
+    """모든 프롬프트 파일의 checksum을 확인한다."""
+    manifest = load_manifest()
+    results = {}
+    for name in manifest:
+        try:
+            _read_verified(name, manifest)
+            results[name] = True
+        except (OSError, ValueError) as e:
+            logger.warning(str(e))
+            results[name] = False
+    return results
+
+
+def refresh_prompts(names: Optional[list[str]] = None) -> dict:
+    """
+    LangChain Hub에서 프롬프트를 다시 받아 파일과 manifest(sha256)를 갱신한다.
+    서버 실행 중에는 호출되지 않으며, 프롬프트를 업데이트할 때만 CLI로 실행한다.
+    """
+    from langchain_core.load import dumps
+    from langsmith import Client
+
+    manifest = load_manifest()
+    client = Client()
+    for name in names or list(manifest):
+        prompt = client.pull_prompt(name, dangerously_pull_public_prompt=True)
+        text = dumps(prompt, pretty=True) + "\n"
+        filename = _prompt_filename(name)
+        with open(os.path.join(PROMPTS_DIR, filename), "w", encoding="utf-8") as f:
+            f.write(text)
+        manifest[name] = {
+            "file": filename,
+            "sha256": hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            "source": "hub",
+            "updated_at": time.strftime("%Y-%m-%d"),
+        }
+        print(f"refreshed {name} -> {filename}")
+    save_manifest(manifest)
+    with _lock:
+        _prompts.clear()
+    return manifest